@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Comment, Like, Save
+from .models import Post, Comment, Like, Save, Follow
 
 
 @admin.register(Post)
@@ -7,15 +7,18 @@ class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'likes_count', 'comments_count', 'created_at')
     search_fields = ('title', 'content', 'author__email')
     ordering = ('-created_at',)
-
-    def likes_count(self, obj):
-        return obj.likes.count()
-
-    def comments_count(self, obj):
-        return obj.comments.count()
+    readonly_fields = ('likes_count', 'comments_count')
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('post', 'author', 'created_at')
+    list_display = ('post', 'author', 'depth', 'reply_count', 'is_deleted', 'created_at')
+    list_filter = ('is_deleted',)
     search_fields = ('content', 'author__email')
+    readonly_fields = ('parent', 'path', 'depth', 'reply_count')
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('user', 'author', 'created_at')
+    search_fields = ('user__email', 'author__email')
@@ -0,0 +1,141 @@
+"""
+Personalized for_you timelines, materialized in TimelineEntry.
+
+Fan-out on write: once a post commits, a background job inserts one
+TimelineEntry per follower of its author (plus the author), in chunks of
+FANOUT_BATCH_SIZE with bulk_create. Reading the tab is then a single range
+scan of timeline_user_created_idx for the viewer.
+
+Authors with more than COMMUNITY_FANOUT_MAX_FOLLOWERS followers are not
+fanned out — one post would mean a huge write burst. Their posts are
+pulled at read time instead: when a reader opens the first page of the
+tab, recent posts of the high-follower authors they follow (flagged
+`fan_out_skipped`, under a small partial index) are inserted into *that
+reader's* timeline (`pull_high_follower_posts`), so the read itself stays
+the same per-user range scan.
+
+Following an author backfills their recent posts into the follower's
+timeline; unfollowing removes them.
+
+The fan-out job runs in an in-process thread pool, so a worker restart
+can lose it. A finished job stamps `Post.fanned_out_at`; run
+`manage.py fan_out_pending` on a schedule to redo the posts still
+missing it (fan_out is idempotent).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Follow, Post, TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+FANOUT_BATCH_SIZE = 1000
+FOLLOW_BACKFILL_POSTS = 50
+PULL_WINDOW = timedelta(days=14)
+PULL_MAX_POSTS = 200
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='timeline-fanout')
+
+
+def max_fanout_followers():
+    return getattr(settings, 'COMMUNITY_FANOUT_MAX_FOLLOWERS', 10000)
+
+
+def has_many_followers(author_id):
+    """True if fanning out `author_id`'s posts on write would be too expensive (bounded COUNT)."""
+    limit = max_fanout_followers()
+    return Follow.objects.filter(author_id=author_id)[:limit + 1].count() > limit
+
+
+def _entries(post, user_ids):
+    return [TimelineEntry(user_id=user_id, post_id=post.pk, created_at=post.created_at) for user_id in user_ids]
+
+
+def fan_out(post_id):
+    """Write `post_id` into its author's and followers' timelines (safe to re-run)."""
+    post = Post.objects.filter(pk=post_id).only('id', 'author_id', 'created_at').first()
+    if post is None:
+        return 0
+    TimelineEntry.objects.bulk_create(_entries(post, [post.author_id]), ignore_conflicts=True)
+    if has_many_followers(post.author_id):
+        Post.objects.filter(pk=post.pk).update(fan_out_skipped=True, fanned_out_at=timezone.now())
+        return 1
+
+    written, batch = 1, []
+    follower_ids = Follow.objects.filter(author_id=post.author_id).order_by('pk').values_list('user_id', flat=True)
+    for user_id in follower_ids.iterator(chunk_size=FANOUT_BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            written += _write(post, batch)
+            batch = []
+    written += _write(post, batch)
+    Post.objects.filter(pk=post.pk).update(fanned_out_at=timezone.now())
+    return written
+
+
+def _write(post, user_ids):
+    if user_ids:
+        TimelineEntry.objects.bulk_create(_entries(post, user_ids), ignore_conflicts=True)
+    return len(user_ids)
+
+
+def schedule_fan_out(post):
+    """Queue the fan-out of `post` once the current transaction commits."""
+    if getattr(settings, 'COMMUNITY_FANOUT_SYNC', False):
+        transaction.on_commit(lambda: fan_out(post.pk))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, post.pk))
+
+
+def _run_in_background(post_id):
+    try:
+        fan_out(post_id)
+    except Exception:
+        logger.exception('Failed to fan out Post %s', post_id)
+    finally:
+        connections.close_all()  # only this worker thread's connections
+
+
+def pull_high_follower_posts(user):
+    """Fan-out on read: copy recent skipped posts of authors `user` follows into their timeline."""
+    posts = (
+        Post.objects.filter(
+            fan_out_skipped=True,
+            created_at__gte=timezone.now() - PULL_WINDOW,
+            author_id__in=Follow.objects.filter(user=user).values('author_id'),
+        )
+        .order_by('-created_at')
+        .only('id', 'created_at')[:PULL_MAX_POSTS]
+    )
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user=user, post_id=post.pk, created_at=post.created_at) for post in posts],
+        ignore_conflicts=True,
+    )
+
+
+def follow_changed(user, author_id, following):
+    """Backfill or remove `author_id`'s posts in `user`'s timeline after a follow toggle."""
+    if not following:
+        TimelineEntry.objects.filter(user=user, post__author_id=author_id).delete()
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by('-created_at').only('id', 'created_at')
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user=user, post_id=post.pk, created_at=post.created_at)
+         for post in posts[:FOLLOW_BACKFILL_POSTS]],
+        ignore_conflicts=True,
+    )
+
+
+def timeline_posts(user):
+    """The viewer's for_you posts, newest first, as a keyset-paginatable Post queryset."""
+    return (
+        Post.objects.filter(timeline_entries__user=user)
+        .annotate(feed_at=F('timeline_entries__created_at'))
+        .order_by('-feed_at', '-id')
+    )
@@ -0,0 +1,47 @@
+"""
+Redo timeline fan-out for posts whose background job never finished.
+
+Usage:
+    venv\Scripts\python manage.py fan_out_pending
+    venv\Scripts\python manage.py fan_out_pending --days 14 --min-age 5
+
+Fan-out runs in an in-process thread pool after a post commits (see
+community/feed.py), so a deploy or crash can drop queued jobs. Every
+finished job stamps Post.fanned_out_at; this command re-runs fan_out for
+the posts still missing it. fan_out is idempotent, so a post whose job is
+merely slow is safe to redo — `--min-age` just avoids doing the work
+twice. Run it on a schedule; the first run also catches up posts created
+before fanned_out_at existed.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.feed import fan_out
+from community.models import Post
+
+
+class Command(BaseCommand):
+    help = "Fan out community posts that never reached their followers' timelines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=10,
+            help='Skip posts created in the last N minutes (their job may still be queued).',
+        )
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Only fan out posts created in the last N days (default: all).',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        posts = Post.objects.filter(fanned_out_at__isnull=True, created_at__lte=now - timedelta(minutes=options['min_age']))
+        if options['days'] is not None:
+            posts = posts.filter(created_at__gte=now - timedelta(days=options['days']))
+
+        post_ids = list(posts.order_by('created_at').values_list('pk', flat=True))
+        entries = sum(fan_out(post_id) for post_id in post_ids)
+        self.stdout.write(self.style.SUCCESS(f'  ✔ {len(post_ids)} post(s) fanned out ({entries} timeline entries)'))
@@ -0,0 +1,95 @@
+"""
+Recompute the denormalized likes_count / comments_count columns on Post,
+and reply_count on Comment.
+
+Usage:
+    venv\Scripts\python manage.py repair_post_counters
+    venv\Scripts\python manage.py repair_post_counters --dry-run
+
+Only posts whose stored counters differ from the real Like / live Comment
+row counts (and comments whose reply_count differs from their live direct
+replies) are rewritten, so the command is cheap to run on a schedule.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, F
+from django.db.models.functions import Coalesce
+
+from community.models import Post, Like, Comment
+from community.ranking import hot_score
+
+
+def count_subquery(model, field='post', **filters):
+    """Correlated COUNT(*) of `model` rows whose `field` points at the outer row."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}, **filters)
+            .order_by()
+            .values(field)
+            .annotate(c=Count('pk'))
+            .values('c'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Repair drifted like/comment counters on community posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report drifted posts without writing anything.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of posts rewritten per bulk_update.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = (
+            Post.objects.annotate(
+                actual_likes=count_subquery(Like),
+                actual_comments=count_subquery(Comment, is_deleted=False),
+            )
+            .filter(~Q(likes_count=F('actual_likes')) | ~Q(comments_count=F('actual_comments')))
+            .only('id', 'likes_count', 'comments_count', 'created_at')
+            .order_by('pk')
+        )
+
+        batch, repaired = [], 0
+        for post in drifted.iterator(chunk_size=options['batch_size']):
+            post.likes_count = post.actual_likes
+            post.comments_count = post.actual_comments
+            post.hot_score = hot_score(post.likes_count, post.comments_count, post.created_at)
+            batch.append(post)
+            if len(batch) >= options['batch_size']:
+                repaired += self._flush(batch, options['dry_run'])
+                batch = []
+        repaired += self._flush(batch, options['dry_run'])
+
+        verb = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'  ✔ {repaired} post counter(s) {verb}'))
+
+        drifted_comments = (
+            Comment.objects.annotate(actual_replies=count_subquery(Comment, 'parent', is_deleted=False))
+            .filter(~Q(reply_count=F('actual_replies')))
+            .only('id', 'reply_count')
+            .order_by('pk')
+        )
+        comments = []
+        for comment in drifted_comments.iterator(chunk_size=options['batch_size']):
+            comment.reply_count = comment.actual_replies
+            comments.append(comment)
+        if comments and not options['dry_run']:
+            with transaction.atomic():
+                Comment.objects.bulk_update(comments, ['reply_count'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'  ✔ {len(comments)} comment reply count(s) {verb}'))
+
+    def _flush(self, batch, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, ['likes_count', 'comments_count', 'hot_score'])
+        return len(batch)
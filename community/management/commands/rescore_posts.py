@@ -0,0 +1,41 @@
+"""
+Recompute Post.hot_score (the trending rank) from the stored counters.
+
+Usage:
+    venv\Scripts\python manage.py rescore_posts
+    venv\Scripts\python manage.py rescore_posts --days 30
+
+Likes and comments already move hot_score incrementally; run this on a
+schedule to fold away accumulated float error, and after changing
+COMMUNITY_HOT_HALF_LIFE_HOURS or the weights in community/ranking.py.
+Only rows whose score actually changes are written.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from community.models import Post
+from community.ranking import rescore
+
+
+class Command(BaseCommand):
+    help = 'Recompute the time-decayed trending score of community posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Only rescore posts created in the last N days (default: all).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Posts written per bulk_update.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.all()
+        if options['days'] is not None:
+            posts = posts.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        changed = rescore(posts, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'  ✔ {changed} post score(s) updated'))
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:41
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(model, field='post'):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(c=Count('pk'))
+            .values('c'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('community', 'Post')
+    Like = apps.get_model('community', 'Like')
+    Comment = apps.get_model('community', 'Comment')
+    Post.objects.update(
+        likes_count=_count_subquery(Like),
+        comments_count=_count_subquery(Comment),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+from community.ranking import rescore
+
+
+def backfill_hot_scores(apps, schema_editor):
+    rescore(apps.get_model('community', 'Post').objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_post_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score', '-id'], name='post_hot_score_idx'),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+    ]
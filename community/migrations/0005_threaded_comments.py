@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def segment(pk, width=8):
+    digits = ''
+    while pk:
+        pk, remainder = divmod(pk, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[remainder] + digits
+    return digits.rjust(width, '0')
+
+
+def backfill_paths(apps, schema_editor):
+    # Every existing comment is top-level: its path is just its own segment.
+    Comment = apps.get_model('community', 'Comment')
+    batch = []
+    for comment in Comment.objects.only('id').order_by('pk').iterator(chunk_size=1000):
+        comment.path = segment(comment.pk)
+        batch.append(comment)
+        if len(batch) >= 1000:
+            Comment.objects.bulk_update(batch, ['path'])
+            batch = []
+    Comment.objects.bulk_update(batch, ['path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0004_follows_and_timeline'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['path']},
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='is_deleted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='community.comment'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=88),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'depth', 'path'], name='comment_post_depth_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from . import ranking
 
 
 class Post(models.Model):
@@ -9,39 +12,102 @@ class Post(models.Model):
     )
     title = models.CharField(max_length=300)
     content = models.TextField()
+    # Denormalized counters, maintained with F() updates by the like/comment views.
+    # Run `manage.py repair_post_counters` if they ever drift.
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    # Trending rank — see community/ranking.py. Rebuild with `manage.py rescore_posts`.
+    hot_score = models.FloatField(default=0, editable=False)
+    # Set when the author had too many followers to fan out on write (community/feed.py).
+    fan_out_skipped = models.BooleanField(default=False, editable=False)
+    # Set once the post's fan-out job has finished; `manage.py fan_out_pending` redoes lost jobs.
+    fanned_out_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-hot_score', '-id'], name='post_hot_score_idx'),
+            models.Index(
+                fields=['created_at'], condition=models.Q(fan_out_skipped=True),
+                name='post_fan_out_skipped_idx',
+            ),
+            models.Index(
+                fields=['created_at'], condition=models.Q(fanned_out_at__isnull=True),
+                name='post_fan_out_pending_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def likes_count(self):
-        return self.likes.count()
-
-    @property
-    def comments_count(self):
-        return self.comments.count()
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.hot_score = ranking.hot_score(self.likes_count, self.comments_count, timezone.now())
+        super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
-    """A comment on a community post."""
+    """
+    A comment on a community post, or a reply to another comment.
+
+    Threads use a materialized path: `path` is the fixed-width base36 id of
+    every ancestor followed by the comment's own, so a whole subtree is one
+    `path` range on comment_post_path_idx and sorting by `path` gives
+    depth-first thread order. Deleting leaves a tombstone (`is_deleted`,
+    content blanked) so paths never have to be rewritten.
+    """
+    PATH_SEGMENT_LENGTH = 8
+    MAX_DEPTH = 10
+
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='comments'
     )
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies'
+    )
+    path = models.CharField(max_length=(MAX_DEPTH + 1) * PATH_SEGMENT_LENGTH, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Denormalized count of live direct replies, maintained by the comment views.
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    is_deleted = models.BooleanField(default=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['created_at']
+        ordering = ['path']
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+            models.Index(fields=['post', 'depth', 'path'], name='comment_post_depth_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.email} on '{self.post.title}'"
 
+    @classmethod
+    def path_segment(cls, pk):
+        digits = ''
+        while pk:
+            pk, remainder = divmod(pk, 36)
+            digits = '0123456789abcdefghijklmnopqrstuvwxyz'[remainder] + digits
+        return digits.rjust(cls.PATH_SEGMENT_LENGTH, '0')
+
+    @staticmethod
+    def subtree_upper_bound(path):
+        """Smallest string sorting after every path that starts with `path` ([0-9a-z] only, so collation-safe)."""
+        alphabet = '0123456789abcdefghijklmnopqrstuvwxyz'
+        while path and path[-1] == alphabet[-1]:
+            path = path[:-1]
+        return path[:-1] + alphabet[alphabet.index(path[-1]) + 1] if path else None
+
+    def assign_path(self):
+        """Set `path` from the parent's once the comment has a pk."""
+        prefix = self.parent.path if self.parent_id else ''
+        self.path = prefix + self.path_segment(self.pk)
+        self.depth = self.parent.depth + 1 if self.parent_id else 0
+
 
 class Like(models.Model):
     """A like on a post — one per user per post."""
@@ -65,3 +131,35 @@ class Save(models.Model):
 
     class Meta:
         unique_together = ('post', 'user')
+
+
+class Follow(models.Model):
+    """`user` follows `author` — drives the personalized for_you timeline."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='following'
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='followers'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'author')
+
+
+class TimelineEntry(models.Model):
+    """
+    A post materialized into a user's for_you timeline (see community/feed.py).
+    `created_at` is the post's, so the timeline reads in post order.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline'
+    )
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_created_idx'),
+        ]
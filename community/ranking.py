@@ -0,0 +1,78 @@
+"""
+Time-decayed "hot" score for the trending feed.
+
+    hot_score = log2(1 + LIKE_WEIGHT·likes + COMMENT_WEIGHT·comments)
+                + (created_at − EPOCH) / half_life
+
+This is the log of engagement × 2^(age / half_life) relative to a fixed
+epoch: every half_life a post ages, it needs twice the engagement to keep
+its place. Because the age term is fixed at creation, scores of different
+posts stay comparable without touching every row as time passes, so
+trending is a plain `ORDER BY hot_score DESC, id DESC` over
+post_hot_score_idx.
+
+A like or comment moves the score in the same UPDATE as its counter,
+computed from the row's own values (`counter_update`). The
+`rescore_posts` command recomputes every score from the counters — run it
+after changing COMMUNITY_HOT_HALF_LIFE_HOURS or the weights, and on a
+schedule to fold away float drift.
+"""
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Log
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+WEIGHTS = {'likes_count': LIKE_WEIGHT, 'comments_count': COMMENT_WEIGHT}
+
+
+def half_life_seconds():
+    return getattr(settings, 'COMMUNITY_HOT_HALF_LIFE_HOURS', 24) * 3600
+
+
+def hot_score(likes, comments, created_at):
+    engagement = 1 + LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments
+    return math.log2(engagement) + (created_at - EPOCH).total_seconds() / half_life_seconds()
+
+
+def _engagement(delta_field=None, delta=0):
+    expression = Value(1.0)
+    for field, weight in WEIGHTS.items():
+        count = F(field) + delta if field == delta_field else F(field)
+        expression = expression + Value(weight) * Greatest(count, 0)
+    return expression
+
+
+def counter_update(field, delta):
+    """`.update()` kwargs adding `delta` to a Post counter and shifting hot_score to match."""
+    return {
+        field: Greatest(F(field) + delta, 0),
+        'hot_score': F('hot_score') + Log(2, _engagement(field, delta)) - Log(2, _engagement()),
+    }
+
+
+def rescore(queryset, batch_size=1000):
+    """Recompute hot_score for every post in `queryset`; returns how many changed."""
+    changed, batch = 0, []
+    posts = queryset.only('id', 'likes_count', 'comments_count', 'created_at', 'hot_score').order_by('pk')
+    for post in posts.iterator(chunk_size=batch_size):
+        score = hot_score(post.likes_count, post.comments_count, post.created_at)
+        if not math.isclose(score, post.hot_score, rel_tol=0, abs_tol=1e-9):
+            post.hot_score = score
+            batch.append(post)
+        if len(batch) >= batch_size:
+            changed += _save_scores(queryset.model, batch)
+            batch = []
+    return changed + _save_scores(queryset.model, batch)
+
+
+def _save_scores(model, batch):
+    if batch:
+        with transaction.atomic():
+            model.objects.bulk_update(batch, ['hot_score'])
+    return len(batch)
@@ -1,27 +1,140 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Post, Comment, Like, Save
 
 
-class CommentSerializer(serializers.ModelSerializer):
+def time_ago(created_at):
+    """Relative age shown on posts ("5m", "3h", "2d", then the date); part of the detail ETag."""
+    diff = timezone.now() - created_at
+    if diff < timedelta(hours=1):
+        return f"{int(diff.seconds / 60)}m"
+    elif diff < timedelta(days=1):
+        return f"{int(diff.seconds / 3600)}h"
+    elif diff < timedelta(weeks=1):
+        return f"{diff.days}d"
+    else:
+        return created_at.strftime('%b %d')
+
+
+def get_viewer_post_ids(context, model, post_ids):
+    """
+    Return the subset of `post_ids` the requesting user has a `model` row
+    (Like or Save) for.
+
+    Memoised in the serializer context per model, so a page of posts costs
+    one query per model however many serializers ask.
+    """
+    request = context.get('request')
+    if not (request and request.user.is_authenticated):
+        return set()
+    resolved, found = context.setdefault('_viewer_posts', {}).setdefault(model, (set(), set()))
+    missing = set(post_ids) - resolved
+    if missing:
+        found.update(
+            model.objects.filter(user=request.user, post_id__in=missing)
+            .values_list('post_id', flat=True)
+        )
+        resolved.update(missing)
+    return found
+
+
+def load_authors(context, author_ids):
+    """Fetch the given users once into the context's author cache (shared by post and comment serializers)."""
+    authors = context.setdefault('_authors', {})
+    missing = set(author_ids) - set(authors)
+    if missing:
+        authors.update(
+            get_user_model().objects.only('id', 'email', 'name', 'avatar').in_bulk(missing)
+        )
+    return authors
+
+
+def get_author(context, obj):
+    """`obj.author`, from the row already loaded on `obj` or the per-page author cache."""
+    if type(obj).author.is_cached(obj):
+        return obj.author
+    return load_authors(context, [obj.author_id])[obj.author_id]
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """Lets the child batch-load viewer state and authors for the whole page before serializing."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.prime(items)
+        return super().to_representation(items)
+
+
+class AuthorMixin:
+    """`author_name` / `author_avatar` resolved through the shared author cache."""
+
+    def prime(self, items):
+        load_authors(self.context, [
+            item.author_id for item in items if not type(item).author.is_cached(item)
+        ])
+
+    def get_author_name(self, obj):
+        author = get_author(self.context, obj)
+        return author.name or author.email
+
+    def get_author_avatar(self, obj):
+        author = get_author(self.context, obj)
+        request = self.context.get('request')
+        if author.avatar and request:
+            return request.build_absolute_uri(author.avatar.url)
+        return None
+
+
+class CommentSerializer(AuthorMixin, serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
     author_avatar = serializers.SerializerMethodField()
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Comment.objects.all(), required=False, allow_null=True,
+    )
 
     class Meta:
         model = Comment
-        fields = ('id', 'author_name', 'author_avatar', 'content', 'created_at')
-        read_only_fields = ('id', 'author_name', 'author_avatar', 'created_at')
+        fields = (
+            'id', 'parent', 'depth', 'author_name', 'author_avatar', 'content',
+            'reply_count', 'is_deleted', 'created_at',
+        )
+        read_only_fields = (
+            'id', 'depth', 'author_name', 'author_avatar', 'reply_count',
+            'is_deleted', 'created_at',
+        )
+        list_serializer_class = ViewerStateListSerializer
+
+    def validate_parent(self, parent):
+        if parent is None:
+            return None
+        if parent.post_id != self.context['view'].kwargs['pk']:
+            raise serializers.ValidationError('Parent comment belongs to another post.')
+        if parent.is_deleted:
+            raise serializers.ValidationError('Cannot reply to a deleted comment.')
+        if parent.depth >= Comment.MAX_DEPTH:
+            raise serializers.ValidationError('This thread is nested too deeply to reply to.')
+        return parent
 
     def get_author_name(self, obj):
-        return obj.author.name or obj.author.email
+        return None if obj.is_deleted else super().get_author_name(obj)
 
     def get_author_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.author.avatar and request:
-            return request.build_absolute_uri(obj.author.avatar.url)
-        return None
+        return None if obj.is_deleted else super().get_author_avatar(obj)
 
 
-class PostSerializer(serializers.ModelSerializer):
+class CommentWithRepliesSerializer(CommentSerializer):
+    """A top-level comment with its first replies (depth-first, flat; `depth`/`parent` give the nesting)."""
+    replies = CommentSerializer(many=True, read_only=True, source='first_replies')
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('replies',)
+
+
+class PostSerializer(AuthorMixin, serializers.ModelSerializer):
     author_name = serializers.SerializerMethodField()
     author_avatar = serializers.SerializerMethodField()
     likes_count = serializers.IntegerField(read_only=True)
@@ -41,41 +154,22 @@ class PostSerializer(serializers.ModelSerializer):
             'id', 'author_name', 'author_avatar', 'likes_count',
             'comments_count', 'is_liked', 'is_saved', 'time_ago', 'created_at',
         )
+        list_serializer_class = ViewerStateListSerializer
 
-    def get_author_name(self, obj):
-        return obj.author.name or obj.author.email
-
-    def get_author_avatar(self, obj):
-        request = self.context.get('request')
-        if obj.author.avatar and request:
-            return request.build_absolute_uri(obj.author.avatar.url)
-        return None
+    def prime(self, items):
+        super().prime(items)
+        post_ids = [item.pk for item in items]
+        get_viewer_post_ids(self.context, Like, post_ids)
+        get_viewer_post_ids(self.context, Save, post_ids)
 
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
-        return False
+        return obj.pk in get_viewer_post_ids(self.context, Like, [obj.pk])
 
     def get_is_saved(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.saves.filter(user=request.user).exists()
-        return False
+        return obj.pk in get_viewer_post_ids(self.context, Save, [obj.pk])
 
     def get_time_ago(self, obj):
-        from django.utils import timezone
-        from datetime import timedelta
-        now = timezone.now()
-        diff = now - obj.created_at
-        if diff < timedelta(hours=1):
-            return f"{int(diff.seconds / 60)}m"
-        elif diff < timedelta(days=1):
-            return f"{int(diff.seconds / 3600)}h"
-        elif diff < timedelta(weeks=1):
-            return f"{diff.days}d"
-        else:
-            return obj.created_at.strftime('%b %d')
+        return time_ago(obj.created_at)
 
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
@@ -0,0 +1,327 @@
+import io
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from hector25_backend.toggles import toggle
+
+from . import threads
+from .models import Comment, Follow, Like, Post, Save, TimelineEntry
+
+User = get_user_model()
+
+
+class PostDetailConditionalTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user(username='author', email='author@example.com', password='pw')
+        self.post = Post.objects.create(author=author, title='Hello', content='First post')
+        self.url = f'/api/community/posts/{self.post.pk}/'
+        self.client = APIClient()
+
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_time_ago(self):
+        etag = self.client.get(self.url)['ETag']
+        later = timezone.now() + timedelta(minutes=2)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['time_ago'], '2m')
+
+
+class ViewerStateQueryCountTests(TestCase):
+    """Post and comment pages batch authors and viewer state per page, not per row."""
+
+    def setUp(self):
+        cache.clear()
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def make_user(self, name):
+        return User.objects.create_user(username=name, email=f'{name}@example.com', password='pw')
+
+    def make_thread(self, replies):
+        post = Post.objects.create(author=self.make_user('op'), title='Thread', content='-')
+        root = self.client.post(f'/api/community/posts/{post.pk}/comments/', {'content': 'root'}, format='json')
+        for i in range(replies):
+            client = APIClient()
+            client.force_authenticate(self.make_user(f'replier{i}'))
+            client.post(
+                f'/api/community/posts/{post.pk}/comments/', {'content': f'reply {i}', 'parent': root.data['id']},
+                format='json',
+            )
+        return post, root.data['id']
+
+    def assert_post_list_queries(self, count):
+        for i in range(count):
+            post = Post.objects.create(author=self.make_user(f'author{i}'), title=f'Post {i}', content='-')
+            Like.objects.create(user=self.viewer, post=post)
+            if i % 2:
+                Save.objects.create(user=self.viewer, post=post)
+        # follow check, COUNT, page, authors, likes and saves for the page
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/community/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), count)
+        self.assertTrue(all(row['is_liked'] for row in response.data['results']))
+        self.assertEqual(sum(row['is_saved'] for row in response.data['results']), count // 2)
+
+    def assert_thread_queries(self, replies):
+        post, root = self.make_thread(replies)
+        # the root's path, COUNT, page of the subtree with authors
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/community/posts/{post.pk}/comments/{root}/thread/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), replies + 1)
+
+        # COUNT, page of roots, their first replies
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/community/posts/{post.pk}/comments/?replies=20')
+        self.assertEqual(len(response.data['results'][0]['replies']), replies)
+
+    def test_post_list_one(self):
+        self.assert_post_list_queries(1)
+
+    def test_post_list_twenty(self):
+        self.assert_post_list_queries(20)
+
+    def test_comment_thread_one(self):
+        self.assert_thread_queries(1)
+
+    def test_comment_thread_twenty(self):
+        self.assert_thread_queries(19)  # root + 19 replies: one full page
+
+
+class ThreadedCommentTests(TestCase):
+    """
+    Materialized-path threads. Tree (roots in order A, B, C):
+    A > a1 > a1x, A > a2, a3, a4; B has no replies; C > c1, c2.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='commenter', email='commenter@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(author=self.user, title='Thread', content='-')
+        other = Post.objects.create(author=self.user, title='Other', content='-')
+        self.ids = {}
+        for name, parent in [
+            ('A', None), ('a1', 'A'), ('B', None), ('a1x', 'a1'), ('C', None), ('c1', 'C'),
+            ('a2', 'A'), ('c2', 'C'), ('a3', 'A'), ('a4', 'A'),
+        ]:
+            self.comment(name, parent)
+            self.comment('noise', post=other)  # another post's paths interleave with this one's
+
+    def comment(self, name, parent=None, post=None):
+        post = post or self.post
+        data = {'content': name, 'parent': self.ids.get(parent)}
+        response = self.client.post(f'/api/community/posts/{post.pk}/comments/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        if post == self.post:
+            self.ids[name] = response.data['id']
+        return response.data['id']
+
+    def get(self, name):
+        return Comment.objects.get(pk=self.ids[name])
+
+    def delete(self, name):
+        return self.client.delete(f'/api/community/posts/{self.post.pk}/comments/{self.ids[name]}/')
+
+    def thread_contents(self, name):
+        return [comment.content for comment in threads.thread(self.get(name))]
+
+    def test_thread_is_one_query_in_display_order(self):
+        root = self.get('A')
+        with self.assertNumQueries(1):
+            rows = list(threads.thread(root))
+        self.assertEqual([row.content for row in rows], ['A', 'a1', 'a1x', 'a2', 'a3', 'a4'])
+        self.assertEqual([row.depth for row in rows], [0, 1, 2, 1, 1, 1])
+        self.assertEqual(self.thread_contents('B'), ['B'])
+
+    def test_first_replies_per_root_across_a_page(self):
+        roots = list(Comment.objects.filter(post=self.post, depth=0).order_by('path'))
+        with self.assertNumQueries(1):
+            threads.attach_first_replies(self.post.pk, roots, 2)
+        replies = {root.content: [reply.content for reply in root.first_replies] for root in roots}
+        self.assertEqual(replies, {'A': ['a1', 'a1x'], 'B': [], 'C': ['c1', 'c2']})
+
+        response = self.client.get(f'/api/community/posts/{self.post.pk}/comments/', {'replies': 3})
+        replies = {row['content']: [reply['content'] for reply in row['replies']] for row in response.data['results']}
+        self.assertEqual(replies, {'A': ['a1', 'a1x', 'a2'], 'B': [], 'C': ['c1', 'c2']})
+
+    def test_reply_count_follows_replies_and_tombstones(self):
+        self.assertEqual([self.get(name).reply_count for name in ('A', 'a1', 'B', 'C')], [4, 1, 0, 2])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 10)
+
+        self.assertEqual(self.delete('a2').status_code, 204)
+        self.assertEqual(self.get('A').reply_count, 3)
+        self.assertEqual(self.delete('a2').status_code, 404)  # already a tombstone
+        self.assertEqual(self.get('A').reply_count, 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 9)
+
+    def test_tombstone_keeps_its_subtree(self):
+        self.assertEqual(self.delete('a1').status_code, 204)
+        self.assertEqual(self.thread_contents('A'), ['A', '', 'a1x', 'a2', 'a3', 'a4'])
+        response = self.client.get(f'/api/community/posts/{self.post.pk}/comments/{self.ids["a1"]}/thread/')
+        tombstone, reply = response.data['results']
+        self.assertEqual((tombstone['is_deleted'], tombstone['author_name'], tombstone['content']), (True, None, ''))
+        self.assertEqual(reply['content'], 'a1x')
+
+        response = self.client.post(
+            f'/api/community/posts/{self.post.pk}/comments/', {'content': 'late', 'parent': self.ids['a1']},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_subtree_upper_bound(self):
+        self.assertEqual(Comment.subtree_upper_bound('0000000z'), '0000001')
+        self.assertEqual(Comment.subtree_upper_bound('0000000a0000000z'), '0000000a0000001')
+        self.assertIsNone(Comment.subtree_upper_bound('zzzzzzzz'))
+
+
+@override_settings(COMMUNITY_FANOUT_SYNC=True)  # no background fan-out racing teardown
+class ConcurrentToggleTests(TransactionTestCase):
+    """
+    Many threads toggle likes at once (released together by a barrier);
+    Post.likes_count must still equal the number of Like rows. On SQLite
+    writers are serialized, so this mostly checks correctness; run the
+    suite against PostgreSQL to exercise real row locking.
+    """
+    THREADS = 8
+    ROUNDS = 10
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'toggler{i}', email=f'toggler{i}@example.com', password='pw')
+            for i in range(self.THREADS)
+        ]
+        self.post = Post.objects.create(author=self.users[0], title='Toggle race', content='-')
+
+    def hammer(self, users):
+        barrier = threading.Barrier(len(users))
+        results, errors = [], []
+        lock = threading.Lock()
+
+        def worker(user):
+            try:
+                barrier.wait()
+                for _ in range(self.ROUNDS):
+                    result = toggle(Like, user, 'post', self.post.pk, counter='likes_count')
+                    with lock:
+                        results.append(result)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+        return results
+
+    def assert_counter_matches_rows(self):
+        self.post.refresh_from_db(fields=['likes_count'])
+        self.assertEqual(self.post.likes_count, Like.objects.filter(post=self.post).count())
+
+    def test_same_user_double_taps(self):
+        user = self.users[1]
+        results = self.hammer([user] * self.THREADS)
+        self.assert_counter_matches_rows()
+        changes = sum(result.changed for result in results)
+        self.assertEqual(changes % 2 == 1, Like.objects.filter(post=self.post, user=user).exists())
+
+    def test_many_users_same_post(self):
+        self.hammer(self.users)
+        self.assert_counter_matches_rows()
+
+
+@override_settings(COMMUNITY_FANOUT_SYNC=True, COMMUNITY_FANOUT_MAX_FOLLOWERS=2)
+class TimelineTests(TestCase):
+    """for_you timelines: fan-out on write, pull on read, follow backfill, and the lost-job sweep."""
+
+    def setUp(self):
+        self.author = self.make_user('author')
+        self.readers = [self.make_user(f'reader{i}') for i in range(2)]
+        for reader in self.readers:
+            Follow.objects.create(user=reader, author=self.author)
+
+    def make_user(self, name):
+        return User.objects.create_user(username=name, email=f'{name}@example.com', password='pw')
+
+    def publish(self, author, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(author=author, title=title, content='-')
+
+    def for_you(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/community/posts/')
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+    def follow(self, user, author):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(f'/api/community/users/{author.pk}/follow/')
+
+    def test_fan_out_on_write(self):
+        post = self.publish(self.author, 'Fanned')
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(post=post).values_list('user_id', flat=True)),
+            {self.author.pk, *(reader.pk for reader in self.readers)},
+        )
+        post.refresh_from_db()
+        self.assertFalse(post.fan_out_skipped)
+        self.assertIsNotNone(post.fanned_out_at)
+        self.assertEqual(self.for_you(self.readers[0]), ['Fanned'])
+
+    def test_high_follower_posts_are_pulled_on_read(self):
+        Follow.objects.create(user=self.make_user('reader2'), author=self.author)  # over the limit of 2
+        post = self.publish(self.author, 'Pulled')
+        post.refresh_from_db()
+        self.assertTrue(post.fan_out_skipped)
+        self.assertFalse(TimelineEntry.objects.filter(post=post, user=self.readers[0]).exists())
+        self.assertEqual(self.for_you(self.readers[0]), ['Pulled'])
+        self.assertTrue(TimelineEntry.objects.filter(post=post, user=self.readers[0]).exists())
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        other = self.make_user('other')
+        self.publish(other, 'Older')
+        self.publish(self.author, 'Newer')
+        reader = self.readers[0]
+        self.assertEqual(self.for_you(reader), ['Newer'])
+
+        self.assertEqual(self.follow(reader, other).status_code, 201)
+        self.assertEqual(self.for_you(reader), ['Newer', 'Older'])
+
+        self.assertEqual(self.follow(reader, other).status_code, 200)
+        self.assertEqual(self.for_you(reader), ['Newer'])
+        self.assertFalse(TimelineEntry.objects.filter(user=reader, post__author=other).exists())
+
+    def test_fan_out_pending_redoes_lost_jobs(self):
+        lost = Post.objects.create(author=self.author, title='Lost', content='-')  # on_commit never ran
+        self.publish(self.author, 'Delivered')
+        self.assertEqual(self.for_you(self.readers[0]), ['Delivered'])
+
+        call_command('fan_out_pending', min_age=0, stdout=io.StringIO())
+        lost.refresh_from_db()
+        self.assertIsNotNone(lost.fanned_out_at)
+        self.assertEqual(self.for_you(self.readers[0]), ['Delivered', 'Lost'])
@@ -0,0 +1,94 @@
+"""
+Threaded comments over the materialized `Comment.path`.
+
+Because a comment's path is its ancestors' path plus its own fixed-width
+id segment, every subtree is a contiguous `path` range within its post:
+
+* a whole thread (a comment and all its replies) is one range query on
+  comment_post_path_idx, already in depth-first display order;
+* a page of top-level comments is a keyset page on comment_post_depth_idx
+  (depth = 0), and the first N replies of *every* comment on that page come
+  from one more range query spanning the page, cut to N per top-level
+  comment by a ROW_NUMBER window.
+
+Paths are written once, right after the insert, and never change: deleting
+a comment only tombstones it. Each comment's live direct replies are
+counted in `reply_count`, moved in the same transaction as the reply
+(the views move Post.comments_count alongside).
+"""
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Greatest, RowNumber, Substr
+
+from .models import Comment
+
+DEFAULT_REPLIES = 3
+MAX_REPLIES = 20
+
+
+def create_comment(serializer, author, post, parent=None):
+    """Save a comment or reply, assign its path and bump the parent's reply_count."""
+    with transaction.atomic():
+        comment = serializer.save(author=author, post=post, parent=parent)
+        comment.assign_path()
+        Comment.objects.filter(pk=comment.pk).update(path=comment.path, depth=comment.depth)
+        if parent is not None:
+            Comment.objects.filter(pk=parent.pk).update(reply_count=F('reply_count') + 1)
+    return comment
+
+
+def tombstone(comment):
+    """Blank a comment in place (its replies stay attached); False if it already was."""
+    with transaction.atomic():
+        updated = Comment.objects.filter(pk=comment.pk, is_deleted=False).update(is_deleted=True, content='')
+        if not updated:
+            return False
+        if comment.parent_id:
+            Comment.objects.filter(pk=comment.parent_id).update(
+                reply_count=Greatest(F('reply_count') - 1, 0),
+            )
+    comment.is_deleted, comment.content = True, ''
+    return True
+
+
+def subtree_filter(path):
+    """Lookup kwargs selecting the comment at `path` and everything below it."""
+    lookups = {'path__gte': path}
+    upper = Comment.subtree_upper_bound(path)
+    if upper is not None:
+        lookups['path__lt'] = upper
+    return lookups
+
+
+def thread(comment):
+    """`comment` and all of its replies, in display order."""
+    return Comment.objects.filter(post_id=comment.post_id, **subtree_filter(comment.path)).order_by('path')
+
+
+def attach_first_replies(post_id, roots, limit):
+    """Set `first_replies` on each top-level comment of a path-ordered page: its first `limit` replies."""
+    for root in roots:
+        root.first_replies = []
+    if not roots or limit <= 0:
+        return roots
+
+    segment = Comment.PATH_SEGMENT_LENGTH
+    by_root = {root.path: root for root in roots}
+    span = {'path__gt': roots[0].path}
+    upper = Comment.subtree_upper_bound(roots[-1].path)
+    if upper is not None:
+        span['path__lt'] = upper
+    replies = (
+        Comment.objects.filter(post_id=post_id, depth__gt=0, **span)
+        .select_related('author')
+        .annotate(thread_rank=Window(
+            RowNumber(), partition_by=[Substr('path', 1, segment)], order_by=F('path').asc(),
+        ))
+        .filter(thread_rank__lte=limit)
+        .order_by('path')
+    )
+    for reply in replies:
+        root = by_root.get(reply.path[:segment])
+        if root is not None:
+            root.first_replies.append(reply)
+    return roots
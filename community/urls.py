@@ -4,7 +4,9 @@ from .views import (
     PostDetailView,
     PostLikeToggleView,
     PostSaveToggleView,
+    FollowToggleView,
     CommentListCreateView,
+    CommentThreadView,
     CommentDeleteView,
 )
 
@@ -13,6 +15,8 @@ urlpatterns = [
     path('posts/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
     path('posts/<int:pk>/like/', PostLikeToggleView.as_view(), name='post-like-toggle'),
     path('posts/<int:pk>/save/', PostSaveToggleView.as_view(), name='post-save-toggle'),
+    path('users/<int:pk>/follow/', FollowToggleView.as_view(), name='user-follow-toggle'),
     path('posts/<int:pk>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
     path('posts/<int:pk>/comments/<int:cid>/', CommentDeleteView.as_view(), name='comment-delete'),
+    path('posts/<int:pk>/comments/<int:cid>/thread/', CommentThreadView.as_view(), name='comment-thread'),
 ]
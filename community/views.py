@@ -1,10 +1,22 @@
 from rest_framework import generics, status, permissions
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Count
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.shortcuts import get_object_or_404
 
-from .models import Post, Comment, Like, Save
-from .serializers import PostSerializer, CommentSerializer
+from hector25_backend.conditional import ConditionalRetrieveMixin, weak_etag
+from hector25_backend.pagination import KeysetPagination
+from hector25_backend.toggles import toggle
+from notifications import coalesce
+
+from . import feed, ranking, threads
+from .models import Post, Comment, Like, Save, Follow
+from .serializers import PostSerializer, CommentSerializer, CommentWithRepliesSerializer, time_ago
+
+User = get_user_model()
 
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -15,16 +27,24 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         return obj.author == request.user
 
 
+def adjust_post_counter(post_id, field, delta):
+    """Atomically add `delta` to a denormalized Post counter (never below zero) and re-rank it."""
+    Post.objects.filter(pk=post_id).update(**ranking.counter_update(field, delta))
+
+
 class PostListCreateView(generics.ListCreateAPIView):
     """
     GET  /api/community/posts/         — list posts
     POST /api/community/posts/         — create post (authenticated)
 
     Query params:
-      ?tab=trending   — order by likes count desc
-      ?tab=for_you    — default chronological
+      ?tab=trending   — order by time-decayed hot_score (likes, comments, age)
+      ?tab=for_you    — default; the viewer's timeline of followed authors
+                        (global chronological when anonymous or following nobody)
+      ?paginate=cursor — keyset pagination for infinite scroll
     """
     serializer_class = PostSerializer
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -33,36 +53,54 @@ class PostListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         tab = self.request.query_params.get('tab', 'for_you')
-        qs = Post.objects.annotate(
-            likes_count=Count('likes', distinct=True),
-            comments_count=Count('comments', distinct=True),
-        )
+        user = self.request.user
+        qs = Post.objects.all()
         if tab == 'trending':
-            qs = qs.order_by('-likes_count', '-created_at')
+            qs = qs.order_by('-hot_score', '-id')
+        elif tab == 'for_you' and user.is_authenticated and user.following.exists():
+            if 'cursor' not in self.request.query_params:
+                feed.pull_high_follower_posts(user)
+            qs = feed.timeline_posts(user)
         else:
             qs = qs.order_by('-created_at')
         return qs
 
 
-class PostDetailView(generics.RetrieveDestroyAPIView):
+class PostDetailView(ConditionalRetrieveMixin, generics.RetrieveDestroyAPIView):
     """
-    GET    /api/community/posts/{id}/  — post detail
+    GET    /api/community/posts/{id}/  — post detail (supports If-None-Match)
     DELETE /api/community/posts/{id}/  — delete (author only)
     """
     serializer_class = PostSerializer
     permission_classes = [IsAuthorOrReadOnly]
 
-    def get_queryset(self):
-        return Post.objects.annotate(
-            likes_count=Count('likes', distinct=True),
-            comments_count=Count('comments', distinct=True),
-        )
+    queryset = Post.objects.select_related('author')
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated(), IsAuthorOrReadOnly()]
 
+    def get_conditional_state(self, request):
+        # Likes/comments move the stored counters without touching updated_at,
+        # so the ETag covers them and no Last-Modified is sent. The rendered
+        # `time_ago` changes with the clock alone, so it is part of the ETag too.
+        qs = Post.objects.filter(pk=self.kwargs['pk'])
+        fields = [
+            'updated_at', 'created_at', 'likes_count', 'comments_count',
+            'author__name', 'author__email', 'author__avatar',
+        ]
+        if request.user.is_authenticated:
+            qs = qs.annotate(
+                viewer_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=request.user)),
+                viewer_saved=Exists(Save.objects.filter(post=OuterRef('pk'), user=request.user)),
+            )
+            fields += ['viewer_liked', 'viewer_saved']
+        row = qs.values_list(*fields).first()
+        if row is None:
+            return None, None
+        return weak_etag(*row, time_ago(row[1])), None
+
 
 class PostLikeToggleView(APIView):
     """POST /api/community/posts/{id}/like/ — toggle like on a post."""
@@ -70,15 +108,19 @@ class PostLikeToggleView(APIView):
 
     def post(self, request, pk):
         try:
-            post = Post.objects.get(pk=pk)
+            result = toggle(
+                Like, request.user, 'post', pk, counter='likes_count',
+                counter_update=lambda delta: ranking.counter_update('likes_count', delta),
+            )
         except Post.DoesNotExist:
             return Response({'detail': 'Post not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        like, created = Like.objects.get_or_create(post=post, user=request.user)
-        if not created:
-            like.delete()
-            return Response({'liked': False, 'likes_count': post.likes.count()})
-        return Response({'liked': True, 'likes_count': post.likes.count()}, status=status.HTTP_201_CREATED)
+        if not result.active:
+            return Response({'liked': False, 'likes_count': result.count})
+        if result.changed:
+            post = Post.objects.only('id', 'author_id', 'title').get(pk=pk)
+            coalesce.record(post.author_id, request.user, 'post_liked', 'post', post.pk, post.title)
+        return Response({'liked': True, 'likes_count': result.count}, status=status.HTTP_201_CREATED)
 
 
 class PostSaveToggleView(APIView):
@@ -87,48 +129,118 @@ class PostSaveToggleView(APIView):
 
     def post(self, request, pk):
         try:
-            post = Post.objects.get(pk=pk)
+            result = toggle(Save, request.user, 'post', pk)
         except Post.DoesNotExist:
             return Response({'detail': 'Post not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        save, created = Save.objects.get_or_create(post=post, user=request.user)
-        if not created:
-            save.delete()
+        if not result.active:
             return Response({'saved': False})
         return Response({'saved': True}, status=status.HTTP_201_CREATED)
 
 
+class FollowToggleView(APIView):
+    """POST /api/community/users/{id}/follow/ — follow or unfollow an author."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        if pk == request.user.pk:
+            return Response({'detail': 'You cannot follow yourself.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = toggle(Follow, request.user, 'author', pk)
+        except User.DoesNotExist:
+            return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        if result.changed:
+            feed.follow_changed(request.user, pk, result.active)
+        if not result.active:
+            return Response({'following': False})
+        return Response({'following': True}, status=status.HTTP_201_CREATED)
+
+
 class CommentListCreateView(generics.ListCreateAPIView):
     """
-    GET  /api/community/posts/{id}/comments/  — list comments
-    POST /api/community/posts/{id}/comments/  — add comment (authenticated)
+    GET  /api/community/posts/{id}/comments/  — top-level comments, each with its first replies
+    POST /api/community/posts/{id}/comments/  — add comment, or reply with `parent` (authenticated)
+
+    Query params:
+      ?replies=N       — replies inlined per top-level comment (default 3, max 20)
+      ?paginate=cursor — keyset pagination over the top-level comments
     """
-    serializer_class = CommentSerializer
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return CommentSerializer
+        return CommentWithRepliesSerializer
+
     def get_queryset(self):
-        return Comment.objects.filter(post_id=self.kwargs['pk']).select_related('author')
+        return (
+            Comment.objects.filter(post_id=self.kwargs['pk'], depth=0)
+            .select_related('author')
+            .order_by('path')
+        )
+
+    def paginate_queryset(self, queryset):
+        try:
+            limit = int(self.request.query_params.get('replies', threads.DEFAULT_REPLIES))
+        except ValueError:
+            raise ValidationError({'replies': 'Must be an integer.'})
+        if not 0 <= limit <= threads.MAX_REPLIES:
+            raise ValidationError({'replies': f'Must be between 0 and {threads.MAX_REPLIES}.'})
+        page = super().paginate_queryset(queryset)
+        return threads.attach_first_replies(self.kwargs['pk'], page, limit)
 
     def perform_create(self, serializer):
         try:
             post = Post.objects.get(pk=self.kwargs['pk'])
         except Post.DoesNotExist:
-            from rest_framework.exceptions import NotFound
             raise NotFound('Post not found.')
-        serializer.save(author=self.request.user, post=post)
+        parent = serializer.validated_data.pop('parent', None)
+        with transaction.atomic():
+            threads.create_comment(serializer, self.request.user, post, parent)
+            adjust_post_counter(post.pk, 'comments_count', 1)
+            if parent is not None:
+                coalesce.record(parent.author_id, self.request.user, 'comment_replied', 'post', post.pk, post.title)
+            if parent is None or parent.author_id != post.author_id:
+                coalesce.record(post.author_id, self.request.user, 'post_commented', 'post', post.pk, post.title)
+
+
+class CommentThreadView(generics.ListAPIView):
+    """
+    GET /api/community/posts/{pk}/comments/{cid}/thread/ — a comment and all of its replies
+
+    Depth-first order, flat; each row's `depth` and `parent` give the nesting.
+    Supports ?paginate=cursor.
+    """
+    serializer_class = CommentSerializer
+    pagination_class = KeysetPagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        comment = get_object_or_404(
+            Comment.objects.only('id', 'post_id', 'path'), pk=self.kwargs['cid'], post_id=self.kwargs['pk'],
+        )
+        return threads.thread(comment).select_related('author')
 
 
 class CommentDeleteView(generics.DestroyAPIView):
-    """DELETE /api/community/posts/{pk}/comments/{cid}/ — delete comment (author only)."""
+    """
+    DELETE /api/community/posts/{pk}/comments/{cid}/ — delete comment (author only)
+
+    Leaves a tombstone: the content is blanked but replies keep their place.
+    """
     permission_classes = [permissions.IsAuthenticated, IsAuthorOrReadOnly]
+    lookup_url_kwarg = 'cid'
 
     def get_queryset(self):
-        return Comment.objects.filter(post_id=self.kwargs['pk'])
+        return Comment.objects.filter(post_id=self.kwargs['pk'], is_deleted=False)
 
-    def get_object(self):
-        from django.shortcuts import get_object_or_404
-        return get_object_or_404(Comment, pk=self.kwargs['cid'], post_id=self.kwargs['pk'])
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            if threads.tombstone(instance):
+                adjust_post_counter(instance.post_id, 'comments_count', -1)
@@ -1,6 +1,58 @@
-"""ASGI config for hector25_backend project."""
+"""
+ASGI config for hector25_backend project.
+
+Two entry points:
+
+* `stream_application` — only the notification stream
+  (/api/notifications/stream/, SSE or WebSocket — see
+  notifications/streaming.py), a plain ASGI app so idle connections stay
+  cheap. Production runs it as its own service next to the WSGI `web`
+  service that serves the REST API; the two share events through
+  NOTIFICATIONS_BROKER_URL (see Deployment below).
+* `application` — the stream plus the whole Django app, for running
+  everything from one uvicorn in development. Don't serve the API from it
+  in production: Django 4.2's ASGI handler drains sync
+  StreamingHttpResponse iterators into a list before sending, so
+  /api/properties/export/ would hold the whole inventory in memory.
+
+Deployment: platforms only route public traffic to the `web` process of a
+Procfile, so the `stream` line is a start command, not a route. On
+Railway, add a second service from this repo with that line as its
+custom start command, generate a public domain for it, give it the web
+service's variables (SECRET_KEY, DATABASE_URL, NOTIFICATIONS_BROKER_URL)
+with the stream domain in ALLOWED_HOSTS, and set NOTIFICATIONS_STREAM_URL
+on the web service to that domain so the API root hands clients the right
+URL. (On Heroku, the same means a second app whose `web` runs that
+command.) Alternatively keep one domain and route
+/api/notifications/stream/ to the stream service at your proxy.
+"""
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hector25_backend.settings')
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from notifications.streaming import NotificationStreamApp  # noqa: E402  (needs Django set up)
+
+notification_stream = NotificationStreamApp()
+
+
+async def stream_application(scope, receive, send):
+    if scope['type'] in ('http', 'websocket') and scope['path'] == notification_stream.path:
+        return await notification_stream(scope, receive, send)
+    if scope['type'] == 'websocket':
+        await receive()
+        return await send({'type': 'websocket.close'})
+    if scope['type'] == 'http':
+        await send({'type': 'http.response.start', 'status': 404, 'headers': [(b'content-type', b'text/plain')]})
+        return await send({'type': 'http.response.body', 'body': b'Not found.'})
+    return await django_application(scope, receive, send)  # lifespan
+
+
+async def application(scope, receive, send):
+    if scope['type'] in ('http', 'websocket') and scope['path'] == notification_stream.path:
+        return await notification_stream(scope, receive, send)
+    if scope['type'] == 'websocket':
+        await receive()
+        return await send({'type': 'websocket.close'})
+    return await django_application(scope, receive, send)
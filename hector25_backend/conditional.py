@@ -0,0 +1,41 @@
+"""
+Conditional GET (ETag / Last-Modified) support for DRF detail views.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def weak_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before serialization.
+
+    Views implement `get_conditional_state(request)` returning
+    `(etag, last_modified)` from one cheap query (either may be None, and
+    both None means "unknown object" — the normal 404 path then runs).
+    Headers are set on both the 304 and the full response.
+    """
+
+    def get_conditional_state(self, request):
+        raise NotImplementedError
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_state(request)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
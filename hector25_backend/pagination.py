@@ -0,0 +1,137 @@
+"""
+Shared pagination classes for the Hector25 API.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination, page-number pagination otherwise.
+
+    Clients opt in with `?paginate=cursor` and then follow the `next` link.
+    Pages are fetched with a `WHERE (ordering columns) > last row` condition
+    instead of OFFSET, and no COUNT(*) is run, so every page costs the same
+    however deep the client scrolls.
+
+    The keyset is the queryset's effective ordering (after OrderingFilter or
+    any view-level order_by) plus an `id` tiebreak, so every `ordering=` a
+    view allows gets its own stable cursor. Cursors are opaque base64 tokens
+    bound to that ordering; a malformed or tampered cursor, or one replayed
+    against another ordering, is a 400. Ordering columns are expected to be
+    non-null.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    mode_query_param = 'paginate'
+    mode_query_value = 'cursor'
+    fallback_class = PageNumberPagination
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if not self.is_cursor_mode(request):
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        self.fallback = None
+
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        values = self.decode_cursor(request)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.keyset_condition(values))
+            except (DjangoValidationError, TypeError, ValueError):
+                # A value the column can't take (lookups prepare their values eagerly).
+                raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return self.fallback_class().get_paginated_response_schema(schema)
+
+    def is_cursor_mode(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == self.mode_query_value
+            or self.cursor_query_param in params
+        )
+
+    def get_ordering(self, queryset):
+        """The queryset's order_by (or Meta.ordering) with an `id` tiebreak appended."""
+        ordering = [
+            field for field in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(field, str) and field != '?'
+        ]
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def keyset_condition(self, values):
+        """Expand `(a, b, id) > (va, vb, vid)` into an OR-chain honouring each column's direction."""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{field.lstrip("-")}__{lookup}': values[index]})
+            for previous, value in zip(self.ordering[:index], values[:index]):
+                clause &= Q(**{previous.lstrip('-'): value})
+            condition |= clause
+        return condition
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def encode_cursor(self, row):
+        values = [_to_json(getattr(row, field.lstrip('-'))) for field in self.ordering]
+        payload = json.dumps({'o': self.ordering, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = payload['v']
+            if payload['o'] != self.ordering or len(values) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise ValidationError({self.cursor_query_param: self.invalid_cursor_message})
+        return values
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
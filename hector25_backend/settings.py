@@ -1,6 +1,8 @@
 """
 Django settings for hector25_backend project.
 """
+import warnings
+
 import environ
 import dj_database_url
 from pathlib import Path
@@ -81,6 +83,21 @@ DATABASES = {
     )
 }
 
+# Cache
+# Set CACHE_URL (e.g. redis://host:6379/1) in production so every worker shares
+# the cache; falls back to per-process local memory in development.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://hector25'),
+}
+if not DEBUG and not env('CACHE_URL', default=''):
+    # List caches are invalidated by bumping a generation counter in the cache;
+    # with per-process caches other workers keep serving stale lists until the TTL.
+    warnings.warn(
+        'CACHE_URL is not set with DEBUG off: falling back to a per-process cache, '
+        'so cache invalidation will not reach other workers.',
+        RuntimeWarning,
+    )
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -134,9 +151,37 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Community — trending decay (see community/ranking.py; run `rescore_posts` after changing)
+COMMUNITY_HOT_HALF_LIFE_HOURS = env.float('COMMUNITY_HOT_HALF_LIFE_HOURS', default=24)
+# Authors above this follower count are merged into timelines on read, not fanned out on write.
+COMMUNITY_FANOUT_MAX_FOLLOWERS = env.int('COMMUNITY_FANOUT_MAX_FOLLOWERS', default=10000)
+
+# Notifications — broker that carries new notifications to every worker's open
+# streams (notifications/realtime.py); empty = in-process, redis://... to share.
+# Production needs a shared one: the `web` service writes notifications and the
+# separate `stream` service holds the connections (see hector25_backend/asgi.py).
+NOTIFICATIONS_BROKER_URL = env('NOTIFICATIONS_BROKER_URL', default='')
+# Public origin of the stream service (e.g. https://<stream>.up.railway.app);
+# the API root advertises the stream URL there. Empty = same host as the API.
+NOTIFICATIONS_STREAM_URL = env('NOTIFICATIONS_STREAM_URL', default='').rstrip('/')
+if not DEBUG and not NOTIFICATIONS_BROKER_URL:
+    warnings.warn(
+        'NOTIFICATIONS_BROKER_URL is not set with DEBUG off: notifications created by the web '
+        'service will not reach streams held by the stream service.',
+        RuntimeWarning,
+    )
+# Users notified per transaction by broadcasts (notifications/broadcast.py).
+NOTIFICATIONS_BROADCAST_BATCH_SIZE = env.int('NOTIFICATIONS_BROADCAST_BATCH_SIZE', default=1000)
+# Likes/comments/favorites on the same target within this window share one
+# notification row; verbs listed in DIGEST_VERBS wait for `send_notification_digests`
+# instead (notifications/coalesce.py).
+NOTIFICATIONS_COALESCE_WINDOW_MINUTES = env.int('NOTIFICATIONS_COALESCE_WINDOW_MINUTES', default=60)
+NOTIFICATIONS_DIGEST_VERBS = env.list('NOTIFICATIONS_DIGEST_VERBS', default=[])
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[])
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Allow all in dev, restrict in prod
+CORS_EXPOSE_HEADERS = ['X-Cache']  # Cache hit/miss on property list responses
 
 # ── Production Security (auto-applied when DEBUG=False) ───────────────────────
 if not DEBUG:
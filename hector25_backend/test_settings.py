@@ -0,0 +1,11 @@
+"""
+Settings for `manage.py test` (selected automatically by manage.py).
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # A file rather than the default shared in-memory database, so threaded tests
+    # (e.g. community's concurrent toggles) wait on SQLite's lock instead of
+    # failing with "database table is locked".
+    DATABASES['default']['TEST'] = {'NAME': BASE_DIR / 'test_db.sqlite3'}
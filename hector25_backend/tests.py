@@ -0,0 +1,76 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from community.models import Post
+
+User = get_user_model()
+
+
+def encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor walks over /api/community/posts/, whose sort columns have many ties."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author', email='author@example.com', password='pw')
+        Post.objects.bulk_create([Post(author=author, title=f'Post {i}', content='-') for i in range(47)])
+        posts = list(Post.objects.order_by('id'))
+        for i, post in enumerate(posts):
+            # Five distinct scores and three distinct timestamps across 47 rows.
+            Post.objects.filter(pk=post.pk).update(
+                hot_score=float(i % 5), created_at=posts[i % 3].created_at,
+            )
+
+    def walk(self, params):
+        client, ids, pages = APIClient(), [], 0
+        response = client.get('/api/community/posts/', {**params, 'paginate': 'cursor'})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = client.get(response.data['next'])
+
+    def test_trending_ties_on_hot_score(self):
+        ids, pages = self.walk({'tab': 'trending'})
+        self.assertEqual(ids, list(Post.objects.order_by('-hot_score', '-id').values_list('id', flat=True)))
+        self.assertEqual(pages, 3)
+
+    def test_latest_ties_on_created_at(self):
+        ids, _ = self.walk({'tab': 'latest'})
+        self.assertEqual(ids, list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_bad_cursors_are_400(self):
+        client = APIClient()
+        cursors = [
+            'not base64!',
+            encode(['not', 'an', 'object']),
+            encode({'o': ['-hot_score', '-id'], 'v': [1.0, 5]}),          # other ordering
+            encode({'o': ['-created_at', '-id'], 'v': ['yesterday', 5]}),  # tampered value
+            encode({'o': ['-created_at', '-id'], 'v': [None, 5]}),
+            encode({'o': ['-created_at', '-id'], 'v': ['2026-01-01T00:00:00+00:00', {'id': 5}]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = client.get('/api/community/posts/', {'tab': 'latest', 'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+
+
+class ApiRootTests(TestCase):
+    def stream(self):
+        return APIClient().get('/api/').data['endpoints']['notifications']['stream']
+
+    def test_stream_on_api_host_by_default(self):
+        self.assertEqual(self.stream(), 'http://testserver/api/notifications/stream/')
+
+    @override_settings(NOTIFICATIONS_STREAM_URL='https://stream.example.com')
+    def test_stream_on_its_own_service(self):
+        self.assertEqual(self.stream(), 'https://stream.example.com/api/notifications/stream/')
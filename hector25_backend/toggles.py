@@ -0,0 +1,94 @@
+"""
+Race-free on/off toggles for per-user membership rows (likes, saves, favorites).
+
+A toggle is one DELETE of the (user, parent) row; only if that removed
+nothing does a single INSERT ... SELECT ... WHERE EXISTS(parent) follow,
+with the backend's ignore-conflicts clause. Row counts tell us what really
+happened, so concurrent double-taps can't raise IntegrityError on the
+unique constraint or move a denormalized counter twice: whichever request
+loses the race simply reports the state the winner produced.
+"""
+from typing import NamedTuple, Optional
+
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.db.models.constants import OnConflict
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+class ToggleResult(NamedTuple):
+    active: bool             # the row exists after the toggle
+    changed: bool            # this call inserted or deleted it (False if a concurrent call won)
+    count: Optional[int]     # the parent's counter afterwards, when one is maintained
+
+
+def toggle(model, user, parent_field, parent_id, counter=None, counter_update=None):
+    """
+    Flip `model`'s row for (`user`, `parent_field`=`parent_id`).
+
+    `counter` names a field on the parent model kept equal to the number of
+    rows; it is adjusted in the same transaction and its new value
+    returned. `counter_update(delta)` may supply the parent's `.update()`
+    kwargs instead of the plain clamped increment (e.g. to move a derived
+    score along with it). Raises the parent model's DoesNotExist if there
+    is no parent.
+    """
+    parent_model = model._meta.get_field(parent_field).related_model
+    using = router.db_for_write(model)
+
+    with transaction.atomic(using=using):
+        deleted, _ = model.objects.using(using).filter(
+            user=user, **{f'{parent_field}_id': parent_id}
+        ).delete()
+        if deleted:
+            active, changed = False, True
+        else:
+            changed = _insert_ignore(model, using, user, parent_field, parent_model, parent_id)
+            if not changed and not parent_model.objects.using(using).filter(pk=parent_id).exists():
+                raise parent_model.DoesNotExist
+            active = True
+
+        count = None
+        if counter:
+            parents = parent_model.objects.using(using).filter(pk=parent_id)
+            if changed:
+                delta = 1 if active else -1
+                if counter_update:
+                    parents.update(**counter_update(delta))
+                else:
+                    parents.update(**{counter: Greatest(F(counter) + delta, 0)})
+            count = parents.values_list(counter, flat=True).first()
+
+    return ToggleResult(active, changed, count)
+
+
+def _insert_ignore(model, using, user, parent_field, parent_model, parent_id):
+    """INSERT the row if the parent exists and it isn't there yet; True if a row was written."""
+    connection = connections[using]
+    ops = connection.ops
+    meta = model._meta
+    user_field = meta.get_field('user')
+    parent = meta.get_field(parent_field)
+
+    columns = [user_field.column, parent.column]
+    values = [user.pk, parent_id]
+    for field in meta.concrete_fields:
+        if getattr(field, 'auto_now_add', False):
+            columns.append(field.column)
+            values.append(field.get_db_prep_save(timezone.now(), connection))
+
+    sql = '{insert} {table} ({columns}) SELECT {placeholders} WHERE EXISTS (SELECT 1 FROM {parent} WHERE {pk} = %s) {suffix}'.format(
+        insert=ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        table=ops.quote_name(meta.db_table),
+        columns=', '.join(ops.quote_name(column) for column in columns),
+        placeholders=', '.join(['%s'] * len(values)),
+        parent=ops.quote_name(parent_model._meta.db_table),
+        pk=ops.quote_name(parent_model._meta.pk.column),
+        suffix=ops.on_conflict_suffix_sql(
+            [user_field, parent], OnConflict.IGNORE, update_fields=None, unique_fields=None,
+        ) or '',
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*values, parent_id])
+        return cursor.rowcount == 1
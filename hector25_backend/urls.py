@@ -10,11 +10,20 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 
+from notifications.streaming import STREAM_PATH
+
 admin.site.site_header = "Hector25 Admin"
 admin.site.site_title = "Hector25 Admin Portal"
 admin.site.index_title = "Welcome to Hector25 Admin"
 
 
+def stream_url(request):
+    """The notification stream lives on its own service in production (see asgi.py)."""
+    if settings.NOTIFICATIONS_STREAM_URL:
+        return settings.NOTIFICATIONS_STREAM_URL + STREAM_PATH
+    return request.build_absolute_uri(STREAM_PATH)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_root(request, format=None):
@@ -39,8 +48,14 @@ def api_root(request, format=None):
             'properties': {
                 'list_create':   reverse('property-list-create', request=request),
                 'featured':      reverse('property-featured',    request=request),
+                'facets':        reverse('property-facets',      request=request),
+                'market_stats':  reverse('property-stats',       request=request),
+                'bulk_import':   reverse('property-import',      request=request),
+                'export':        reverse('property-export',      request=request),
                 'my_favorites':  reverse('property-favorites',   request=request),
+                'saved_searches': reverse('saved-search-list-create', request=request),
                 'detail':        request.build_absolute_uri('/api/properties/{id}/'),
+                'similar':       request.build_absolute_uri('/api/properties/{id}/similar/'),
                 'toggle_fav':    request.build_absolute_uri('/api/properties/{id}/favorite/'),
             },
             'community': {
@@ -49,11 +64,16 @@ def api_root(request, format=None):
                 'like':          request.build_absolute_uri('/api/community/posts/{id}/like/'),
                 'save':          request.build_absolute_uri('/api/community/posts/{id}/save/'),
                 'comments':      request.build_absolute_uri('/api/community/posts/{id}/comments/'),
+                'comment_thread': request.build_absolute_uri('/api/community/posts/{id}/comments/{cid}/thread/'),
+                'follow':        request.build_absolute_uri('/api/community/users/{id}/follow/'),
             },
             'notifications': {
                 'list':          reverse('notification-list',  request=request),
+                'unread_count':  reverse('notification-unread-count', request=request),
                 'mark_all_read': reverse('notification-read-all', request=request),
                 'mark_read':     request.build_absolute_uri('/api/notifications/{id}/read/'),
+                'stream':        stream_url(request),
+                'broadcasts':    reverse('broadcast-list-create', request=request),
             },
             'admin_panel':       request.build_absolute_uri('/admin/'),
         },
@@ -1,9 +1,28 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Broadcast, DigestEntry, Notification
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('user', 'message', 'is_read', 'created_at')
-    list_filter = ('is_read',)
+    list_display = ('user', 'message', 'verb', 'actor_count', 'is_read', 'created_at')
+    list_filter = ('is_read', 'verb')
+    raw_id_fields = ('user', 'actor', 'previous_actor')
     list_editable = ('is_read',)
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    """Read-only progress view; send and resume with the API or `broadcast_notifications`."""
+    list_display = ('message', 'audience', 'status', 'sent_count', 'created_at', 'finished_at')
+    list_filter = ('status', 'audience')
+    readonly_fields = [field.name for field in Broadcast._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DigestEntry)
+class DigestEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'verb', 'target_label', 'count', 'last_at')
+    list_filter = ('verb',)
+    raw_id_fields = ('user',)
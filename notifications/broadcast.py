@@ -0,0 +1,137 @@
+"""
+Broadcast notifications: one message to every user of an audience.
+
+A Broadcast is written chunk by chunk. Each chunk reads the next
+`batch_size` user ids after the checkpoint (`id > last_user_id ORDER BY
+id`, a keyset range on the user primary key, so memory and per-chunk
+cost stay flat however many users there are), bulk-creates their
+Notification rows and advances the checkpoint — all in one short
+transaction. A crash or restart therefore loses at most the chunk in
+flight, which is rolled back, and `run()` resumes exactly where the last
+committed chunk ended.
+
+Advancing the checkpoint is conditional on it not having moved, so two
+runners on the same broadcast can never write the same chunk twice: the
+loser's chunk rolls back and it stops.
+
+Broadcasts started from the API (or for a new-launch listing) run on a
+background thread once the creating transaction commits; the
+`broadcast_notifications` command runs or resumes one in the foreground.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Broadcast, Notification
+from .signals import notifications_created
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-broadcast')
+
+
+class CheckpointMoved(Exception):
+    """Another runner advanced the broadcast's checkpoint first."""
+
+
+def audience_queryset(broadcast):
+    """Users `broadcast` goes to (unordered)."""
+    users = get_user_model().objects.filter(is_active=True)
+    if broadcast.audience == 'agents':
+        users = users.filter(is_agent=True)
+    elif broadcast.audience == 'buyers':
+        users = users.filter(is_agent=False)
+    if broadcast.property_id:
+        users = users.exclude(properties__pk=broadcast.property_id)
+    return users
+
+
+def send_chunk(broadcast):
+    """Notify the next chunk of users and advance the checkpoint; returns how many were notified."""
+    user_ids = list(
+        audience_queryset(broadcast)
+        .filter(pk__gt=broadcast.last_user_id)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:broadcast.batch_size]
+    )
+    if not user_ids:
+        return 0
+    notifications = [Notification(user_id=user_id, message=broadcast.message) for user_id in user_ids]
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        advanced = Broadcast.objects.filter(pk=broadcast.pk, last_user_id=broadcast.last_user_id).update(
+            last_user_id=user_ids[-1], sent_count=F('sent_count') + len(user_ids),
+        )
+        if not advanced:
+            raise CheckpointMoved
+        notifications_created(notifications)
+    broadcast.last_user_id = user_ids[-1]
+    broadcast.sent_count += len(user_ids)
+    return len(user_ids)
+
+
+def run(broadcast, on_chunk=None):
+    """
+    Send (or resume) `broadcast` to completion. `on_chunk(broadcast, sent,
+    seconds)` is called after every committed chunk.
+    """
+    Broadcast.objects.filter(pk=broadcast.pk, started_at__isnull=True).update(started_at=timezone.now())
+    Broadcast.objects.filter(pk=broadcast.pk).update(status='running', error='')
+    broadcast.refresh_from_db()
+    try:
+        while True:
+            started = time.perf_counter()
+            sent = send_chunk(broadcast)
+            if not sent:
+                break
+            if on_chunk:
+                on_chunk(broadcast, sent, time.perf_counter() - started)
+    except CheckpointMoved:
+        logger.warning('Broadcast %s is being sent by another runner; stopping this one', broadcast.pk)
+        return broadcast
+    except Exception as exc:
+        Broadcast.objects.filter(pk=broadcast.pk).update(status='failed', error=repr(exc))
+        raise
+    now = timezone.now()
+    Broadcast.objects.filter(pk=broadcast.pk).update(status='done', finished_at=now)
+    broadcast.status, broadcast.finished_at = 'done', now
+    return broadcast
+
+
+def schedule(broadcast):
+    """Send `broadcast` in the background once the current transaction commits."""
+    if getattr(settings, 'NOTIFICATIONS_BROADCAST_SYNC', False):
+        transaction.on_commit(lambda: run(broadcast))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, broadcast.pk))
+
+
+def _run_in_background(broadcast_id):
+    try:
+        run(Broadcast.objects.get(pk=broadcast_id))
+    except Exception:
+        logger.exception('Failed to send Broadcast %s', broadcast_id)
+    finally:
+        connections.close_all()  # only this worker thread's connections
+
+
+def announce_new_launch(listing):
+    """Broadcast a newly published new-launch listing to every other user."""
+    broadcast = Broadcast.objects.create(
+        message=f'New launch: {listing.title} — {listing.location}'[:500],
+        audience='all',
+        property=listing,
+        batch_size=default_batch_size(),
+    )
+    schedule(broadcast)
+    return broadcast
+
+
+def default_batch_size():
+    return getattr(settings, 'NOTIFICATIONS_BROADCAST_BATCH_SIZE', 1000)
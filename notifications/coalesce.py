@@ -0,0 +1,212 @@
+"""
+Coalesced activity notifications ("Raj and 41 others liked your post").
+
+`record()` is called for every like, comment, reply and favorite. Instead
+of inserting a Notification per event it keeps one row per
+(recipient, verb, target, time window), named by the row's `group_key`:
+
+    INSERT INTO notification ... ON CONFLICT (user_id, group_key) WHERE group_key > '' DO NOTHING
+    INSERT INTO notification_actor (notification, actor) ... ON CONFLICT DO NOTHING
+    -- only if that added a row:
+    UPDATE notification SET actor_count = actor_count + 1, previous_actor = actor,
+                             actor = <actor>, is_read = false, created_at = now
+
+so `actor_count` counts distinct actors, however often each of them
+likes and unlikes, and there is no read-modify-write for concurrent
+events to race on. The row keeps the two latest actors for the "Raj and
+Priya" / "Raj and 41 others" text, is marked unread again and floats back
+to the top of the list. Windows are fixed
+NOTIFICATIONS_COALESCE_WINDOW_MINUTES buckets of wall-clock time.
+
+Verbs listed in NOTIFICATIONS_DIGEST_VERBS are low-priority: they are
+counted into a DigestEntry per (recipient, verb, target) with the same
+kind of upsert and delivered as one summary notification per user by the
+periodic `send_notification_digests` command.
+
+The upserts use ON CONFLICT, so they need PostgreSQL or SQLite 3.24+.
+"""
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import realtime, unread
+from .models import DigestEntry, Notification, NotificationActor
+from .signals import notifications_created
+
+# verb: (predicate shown after the actors, singular noun, plural noun) — nouns are for digests.
+VERBS = {
+    'post_liked': ('liked your post “{label}”', 'like', 'likes'),
+    'post_commented': ('commented on your post “{label}”', 'comment', 'comments'),
+    'comment_replied': ('replied to your comment on “{label}”', 'reply', 'replies'),
+    'property_favorited': ('saved your listing “{label}”', 'save', 'saves'),
+}
+LABEL_LENGTH = 120
+
+
+def window_minutes():
+    return getattr(settings, 'NOTIFICATIONS_COALESCE_WINDOW_MINUTES', 60)
+
+
+def digest_verbs():
+    return set(getattr(settings, 'NOTIFICATIONS_DIGEST_VERBS', ()))
+
+
+def group_key(verb, target_type, target_id, when):
+    bucket = int(when.timestamp() // (window_minutes() * 60))
+    return f'{verb}:{target_type}:{target_id}:{bucket}'
+
+
+def record(recipient_id, actor, verb, target_type, target_id, label):
+    """Notify `recipient_id` that `actor` did `verb` to the target (no-op for self-actions)."""
+    if recipient_id is None or recipient_id == actor.pk:
+        return
+    label = label if len(label) <= LABEL_LENGTH else label[:LABEL_LENGTH - 1] + '…'
+    if verb in digest_verbs():
+        _upsert_digest_entry(recipient_id, verb, target_type, target_id, label)
+    else:
+        _upsert_notification(recipient_id, actor, verb, target_type, target_id, label)
+
+
+def _upsert_notification(recipient_id, actor, verb, target_type, target_id, label):
+    using = router.db_for_write(Notification)
+    connection = connections[using]
+    now = timezone.now()
+    key = group_key(verb, target_type, target_id, now)
+    values = {
+        'user': recipient_id,
+        'message': VERBS[verb][0].format(label=label),
+        'is_read': False,
+        'created_at': now,
+        'verb': verb,
+        'target_type': target_type,
+        'target_id': target_id,
+        'group_key': key,
+        'actor_count': 0,
+    }
+    q = _columns(Notification, connection)
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(q[name] for name in values)}) '
+                f'VALUES ({", ".join(["%s"] * len(values))}) '
+                f"ON CONFLICT ({q['user']}, {q['group_key']}) WHERE {q['group_key']} > '' DO NOTHING",
+                _prep(Notification, connection, values),
+            )
+        groups = Notification.objects.using(using).filter(user_id=recipient_id, group_key=key)
+        notification_id = groups.values_list('pk', flat=True).get()
+        if not _add_actor(connection, notification_id, actor.pk):
+            return  # this actor is already counted in the group
+        groups.update(
+            actor_count=F('actor_count') + 1,
+            previous_actor=F('actor'),
+            actor=actor.pk,
+            message=values['message'],
+            is_read=False,
+            created_at=now,
+        )
+        unread.invalidate(recipient_id)
+        transaction.on_commit(lambda: _push(recipient_id, key), using=using)
+
+
+def _add_actor(connection, notification_id, actor_id):
+    """Record `actor_id` on the notification; False if it was already there."""
+    q = _columns(NotificationActor, connection)
+    table = connection.ops.quote_name(NotificationActor._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({q['notification']}, {q['actor']}) VALUES (%s, %s) "
+            f"ON CONFLICT ({q['notification']}, {q['actor']}) DO NOTHING",
+            [notification_id, actor_id],
+        )
+        return cursor.rowcount == 1
+
+
+def _push(recipient_id, key):
+    if realtime.get_broker().may_deliver(recipient_id):
+        realtime.publish(list(
+            Notification.objects.filter(user_id=recipient_id, group_key=key)
+            .select_related('actor', 'previous_actor')
+        ))
+
+
+def _upsert_digest_entry(recipient_id, verb, target_type, target_id, label):
+    using = router.db_for_write(DigestEntry)
+    connection = connections[using]
+    now = timezone.now()
+    values = {
+        'user': recipient_id,
+        'verb': verb,
+        'target_type': target_type,
+        'target_id': target_id,
+        'target_label': label,
+        'count': 1,
+        'first_at': now,
+        'last_at': now,
+    }
+    q = _columns(DigestEntry, connection)
+    table = connection.ops.quote_name(DigestEntry._meta.db_table)
+    sql = (
+        f'INSERT INTO {table} ({", ".join(q[name] for name in values)}) '
+        f'VALUES ({", ".join(["%s"] * len(values))}) '
+        f"ON CONFLICT ({q['user']}, {q['verb']}, {q['target_type']}, {q['target_id']}) DO UPDATE SET "
+        f"{q['count']} = {table}.{q['count']} + 1, "
+        f"{q['target_label']} = EXCLUDED.{q['target_label']}, "
+        f"{q['last_at']} = EXCLUDED.{q['last_at']}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, _prep(DigestEntry, connection, values))
+
+
+def _columns(model, connection):
+    return {
+        field.name: connection.ops.quote_name(field.column)
+        for field in model._meta.concrete_fields
+    }
+
+
+def _prep(model, connection, values):
+    return [model._meta.get_field(name).get_db_prep_save(value, connection) for name, value in values.items()]
+
+
+def send_digest_chunk(after_user_id, batch_size):
+    """
+    Roll up the pending DigestEntry rows of the next `batch_size` users
+    after `after_user_id` into one notification each. Returns (last user
+    id, notifications created) — (None, 0) when no user is left.
+    """
+    user_ids = list(
+        DigestEntry.objects.filter(user_id__gt=after_user_id)
+        .order_by('user_id').values_list('user_id', flat=True).distinct()[:batch_size]
+    )
+    if not user_ids:
+        return None, 0
+    with transaction.atomic():
+        # Locked so an event counted meanwhile waits for this chunk and starts a fresh entry.
+        entries = list(DigestEntry.objects.select_for_update().filter(user_id__in=user_ids))
+        DigestEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+        by_user = {}
+        for entry in entries:
+            by_user.setdefault(entry.user_id, []).append(entry)
+        notifications = [
+            Notification(user_id=user_id, verb='digest', message=digest_message(pending))
+            for user_id, pending in by_user.items()
+        ]
+        Notification.objects.bulk_create(notifications)
+        notifications_created(notifications)
+    return user_ids[-1], len(notifications)
+
+
+def digest_message(entries):
+    """One summary line for a user's pending DigestEntry rows, largest first, within 500 characters."""
+    parts = []
+    for entry in sorted(entries, key=lambda entry: -entry.count):
+        _, singular, plural = VERBS.get(entry.verb, ('', 'update', 'updates'))
+        parts.append(f'{entry.count} {singular if entry.count == 1 else plural} on “{entry.target_label}”')
+    shown = len(parts)
+    message = 'Your activity digest: ' + ', '.join(parts)
+    while len(message) > 500 and shown > 1:
+        shown -= 1
+        message = f'Your activity digest: {", ".join(parts[:shown])} and {len(parts) - shown} more'
+    return message[:500]
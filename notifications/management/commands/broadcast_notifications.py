@@ -0,0 +1,96 @@
+"""
+Send a notification to every user of an audience, or resume a broadcast.
+
+Usage:
+    venv\Scripts\python manage.py broadcast_notifications --message "Scheduled maintenance tonight"
+    venv\Scripts\python manage.py broadcast_notifications --message "..." --audience agents --batch-size 5000
+    venv\Scripts\python manage.py broadcast_notifications --resume 12
+    venv\Scripts\python manage.py broadcast_notifications --pending
+
+Runs in the foreground, one transaction per chunk of --batch-size users
+(see notifications/broadcast.py), and prints progress with throughput.
+Interrupting it is safe: the last committed chunk is the checkpoint, and
+`--resume <id>` carries on from there. `--pending` lists broadcasts that
+haven't finished (e.g. ones whose background worker died with its process).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications import broadcast
+from notifications.models import Broadcast
+
+AUDIENCES = [value for value, _ in Broadcast.AUDIENCE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Broadcast a notification in resumable chunks and report throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--message', help='Notification text (max 500 characters).')
+        parser.add_argument('--audience', choices=AUDIENCES, default='all', help='Who receives it.')
+        parser.add_argument('--batch-size', type=int, help='Users notified per transaction.')
+        parser.add_argument('--resume', type=int, metavar='ID', help='Resume an unfinished broadcast.')
+        parser.add_argument('--pending', action='store_true', help='List unfinished broadcasts and exit.')
+        parser.add_argument('--progress-every', type=int, default=10, help='Print progress every N chunks.')
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            return self._list_pending()
+
+        if options['resume']:
+            try:
+                target = Broadcast.objects.get(pk=options['resume'])
+            except Broadcast.DoesNotExist:
+                raise CommandError(f'Broadcast {options["resume"]} does not exist.')
+            if target.status == 'done':
+                raise CommandError(f'Broadcast {target.pk} already finished ({target.sent_count} sent).')
+            if options['batch_size']:
+                Broadcast.objects.filter(pk=target.pk).update(batch_size=options['batch_size'])
+            self.stdout.write(f'Resuming broadcast {target.pk} after user {target.last_user_id} '
+                              f'({target.sent_count} already sent)')
+        else:
+            if not options['message']:
+                raise CommandError('--message is required (or use --resume / --pending).')
+            if len(options['message']) > 500:
+                raise CommandError('--message is longer than 500 characters.')
+            batch_size = options['batch_size'] or broadcast.default_batch_size()
+            if batch_size < 1:
+                raise CommandError('--batch-size must be positive.')
+            target = Broadcast.objects.create(
+                message=options['message'], audience=options['audience'], batch_size=batch_size,
+            )
+            self.stdout.write(f'Broadcast {target.pk} to {target.audience}')
+
+        chunks, session_sent, started = 0, 0, time.perf_counter()
+
+        def on_chunk(current, sent, seconds):
+            nonlocal chunks, session_sent
+            chunks += 1
+            session_sent += sent
+            if chunks % options['progress_every'] == 0:
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'  {current.sent_count} sent (user {current.last_user_id}) — '
+                    f'{session_sent / elapsed:,.0f}/s overall, last chunk {sent / seconds:,.0f}/s'
+                )
+
+        result = broadcast.run(target, on_chunk=on_chunk)
+        elapsed = time.perf_counter() - started
+        if result.status != 'done':
+            raise CommandError(f'Broadcast {target.pk} is being sent by another process; stopped.')
+        rate = session_sent / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ broadcast {target.pk}: {session_sent} notification(s) in {elapsed:.1f}s '
+            f'({rate:,.0f}/s, {chunks} chunk(s)); {result.sent_count} in total'
+        ))
+
+    def _list_pending(self):
+        pending = Broadcast.objects.exclude(status='done').order_by('pk')
+        for item in pending:
+            self.stdout.write(
+                f'  {item.pk}: {item.status}, {item.sent_count} sent, checkpoint user {item.last_user_id} '
+                f'— {item.message[:60]}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'  ✔ {len(pending)} unfinished broadcast(s)'))
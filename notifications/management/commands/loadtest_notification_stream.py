@@ -0,0 +1,215 @@
+"""
+Load test for the notification stream (notifications/streaming.py).
+
+Usage:
+    venv\Scripts\python manage.py loadtest_notification_stream
+    venv\Scripts\python manage.py loadtest_notification_stream --connections 10000 --users 500 --idle 30
+    venv\Scripts\python manage.py loadtest_notification_stream --url http://127.0.0.1:8000 --connections 5000
+
+Opens many concurrent SSE connections (spread over throwaway users), holds
+them idle for --idle seconds, then creates one notification per user and
+times how long each connection takes to receive it. Reports connect time,
+connections still open after the idle period, delivery latency
+(p50/p99/max) and, in-process, memory held per idle connection.
+
+By default the streams are driven through hector25_backend.asgi in this
+process (no sockets), which measures the per-connection cost of the app
+itself. With --url the connections are real TCP connections to a running
+stream server, e.g. the `stream` service
+(`hector25_backend.asgi:stream_application`); the notifications are
+created here, so the server must share a broker with this process
+(NOTIFICATIONS_BROKER_URL) for deliveries to be seen. Raise
+the open-file limit (`ulimit -n`) on both sides for large runs. The
+throwaway users and their notifications are deleted afterwards.
+"""
+
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from notifications.models import Notification
+from notifications.realtime import hub
+from notifications.streaming import STREAM_PATH
+
+User = get_user_model()
+
+CONNECT_BATCH = 500
+
+
+class Command(BaseCommand):
+    help = 'Hold thousands of idle notification streams open and time a notification push to all of them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=5000, help='Concurrent streams to open.')
+        parser.add_argument('--users', type=int, default=100, help='Throwaway users the streams are spread over.')
+        parser.add_argument('--idle', type=float, default=5, help='Seconds to hold the streams idle.')
+        parser.add_argument('--url', default='', help='Base URL of a running ASGI server (default: in-process).')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for deliveries.')
+
+    def handle(self, *args, **options):
+        if options['connections'] < 1 or options['users'] < 1:
+            raise CommandError('--connections and --users must be positive.')
+        tag = uuid.uuid4().hex[:8]
+        User.objects.bulk_create([
+            User(username=f'stream_{tag}_{i}', email=f'stream_{tag}_{i}@hector25.invalid', password='!')
+            for i in range(options['users'])
+        ])
+        users = list(User.objects.filter(email__startswith=f'stream_{tag}_'))
+        try:
+            asyncio.run(self._run(users, options))
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    async def _run(self, users, options):
+        tokens = {user.pk: str(AccessToken.for_user(user)) for user in users}
+        streams = [Stream(users[i % len(users)].pk) for i in range(options['connections'])]
+        in_process = not options['url']
+        if in_process:
+            from hector25_backend.asgi import application
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        for offset in range(0, len(streams), CONNECT_BATCH):
+            batch = streams[offset:offset + CONNECT_BATCH]
+            if in_process:
+                for stream in batch:
+                    stream.open_in_process(application, tokens[stream.user_id])
+            else:
+                await asyncio.gather(*(stream.open_tcp(options['url'], tokens[stream.user_id]) for stream in batch))
+        await self._until(lambda: all(stream.connected or stream.failed for stream in streams), options['timeout'])
+        connect_seconds = time.perf_counter() - started
+        failed = sum(stream.failed for stream in streams)
+        if failed:
+            raise CommandError(f'{failed} of {len(streams)} stream(s) failed to open')
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ {len(streams)} streams open in {connect_seconds:.2f}s over {len(users)} users'
+        ))
+        if in_process:
+            held = tracemalloc.get_traced_memory()[0] - baseline
+            self.stdout.write(self.style.SUCCESS(
+                f'  ✔ {held / len(streams) / 1024:.1f} KiB per idle stream '
+                f'({held / 1024 / 1024:.1f} MiB total, {hub.connection_count()} in the hub)'
+            ))
+            tracemalloc.stop()
+
+        await asyncio.sleep(options['idle'])
+        open_after_idle = sum(not stream.closed for stream in streams)
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ {open_after_idle} of {len(streams)} still open after {options["idle"]:g}s idle'
+        ))
+
+        published = time.perf_counter()
+        for stream in streams:
+            stream.published_at = published
+        await sync_to_async(self._notify)(users)
+        await self._until(lambda: all(stream.delivered_at for stream in streams), options['timeout'])
+        latencies = sorted(
+            (stream.delivered_at - published) * 1000 for stream in streams if stream.delivered_at
+        )
+        for stream in streams:
+            stream.close()
+        await asyncio.gather(*(stream.task for stream in streams if stream.task), return_exceptions=True)
+
+        if not latencies:
+            raise CommandError('No notification was delivered (does the server share this process\'s broker?)')
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ delivered to {len(latencies)} of {len(streams)} streams — '
+            f'p50 {statistics.median(latencies):.1f}ms, p99 {p99:.1f}ms, max {latencies[-1]:.1f}ms'
+        ))
+        if in_process:
+            self.stdout.write(self.style.SUCCESS(f'  ✔ {hub.connection_count()} streams left in the hub after disconnect'))
+
+    def _notify(self, users):
+        # One create() per user, so each goes through the post_save push path.
+        for user in users:
+            Notification.objects.create(user=user, message='Stream load test')
+
+    @staticmethod
+    async def _until(condition, timeout):
+        deadline = time.perf_counter() + timeout
+        while not condition() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+
+class Stream:
+    """One client connection and what it has seen."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.task = None
+        self.connected = self.failed = self.closed = False
+        self.published_at = self.delivered_at = None
+        self._disconnect = asyncio.Event()
+        self._writer = None
+
+    def _received(self, chunk):
+        if b'event: notification' in chunk and self.published_at and not self.delivered_at:
+            self.delivered_at = time.perf_counter()
+
+    def open_in_process(self, application, token):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': STREAM_PATH, 'raw_path': STREAM_PATH.encode(),
+            'query_string': f'token={token}'.encode(), 'headers': [], 'server': ('testserver', 80),
+        }
+
+        async def receive():
+            await self._disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                self.connected = message['status'] == 200
+                self.failed = not self.connected
+            elif message['type'] == 'http.response.body':
+                self._received(message.get('body', b''))
+                if not message.get('more_body'):
+                    self.closed = True
+
+        self.task = asyncio.ensure_future(application(scope, receive, send))
+
+    async def open_tcp(self, base_url, token):
+        url = urlsplit(base_url)
+        try:
+            reader, self._writer = await asyncio.open_connection(
+                url.hostname, url.port or (443 if url.scheme == 'https' else 80),
+                ssl=url.scheme == 'https' or None,
+            )
+            self._writer.write(
+                f'GET {STREAM_PATH}?token={token} HTTP/1.1\r\nHost: {url.netloc}\r\n'
+                f'Accept: text/event-stream\r\n\r\n'.encode()
+            )
+            await self._writer.drain()
+            status = await reader.readline()
+            self.connected = b' 200 ' in status
+            self.failed = not self.connected
+        except OSError:
+            self.failed = True
+            return
+        self.task = asyncio.ensure_future(self._read_tcp(reader))
+
+    async def _read_tcp(self, reader):
+        try:
+            while not self._disconnect.is_set():
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                self._received(chunk)
+        except OSError:
+            pass
+        self.closed = True
+
+    def close(self):
+        self._disconnect.set()
+        if self._writer is not None:
+            self._writer.close()
@@ -0,0 +1,41 @@
+"""
+Deliver pending activity digests (NOTIFICATIONS_DIGEST_VERBS).
+
+Usage:
+    venv\Scripts\python manage.py send_notification_digests
+    venv\Scripts\python manage.py send_notification_digests --batch-size 500
+
+Run it periodically (e.g. hourly from cron or the platform scheduler).
+Every user with held-back DigestEntry rows gets one summary notification
+("Your activity digest: 42 likes on “…”, 3 saves on “…”") and the rows
+are cleared, one transaction per chunk of --batch-size users (see
+notifications/coalesce.py). Interrupting it is safe: the next run picks
+up whatever is still pending.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications import coalesce
+
+
+class Command(BaseCommand):
+    help = 'Roll pending low-priority activity into one digest notification per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users digested per transaction.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        started = time.perf_counter()
+        after, sent = 0, 0
+        while True:
+            after, created = coalesce.send_digest_chunk(after, options['batch_size'])
+            if after is None:
+                break
+            sent += created
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ {sent} digest(s) sent in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_saved_searches'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0002_unread_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.CharField(max_length=500)),
+                ('audience', models.CharField(choices=[('all', 'All users'), ('agents', 'Agents'), ('buyers', 'Buyers (non-agents)')], default='all', max_length=20)),
+                ('batch_size', models.PositiveIntegerField(default=1000)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('last_user_id', models.BigIntegerField(default=0, editable=False)),
+                ('sent_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('error', models.TextField(blank=True, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('property', models.ForeignKey(blank=True, help_text='Listing being announced; its owner is not notified', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='broadcasts', to='properties.property')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
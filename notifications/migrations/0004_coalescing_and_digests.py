@@ -0,0 +1,77 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0003_broadcasts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verb', models.CharField(max_length=30)),
+                ('target_type', models.CharField(max_length=30)),
+                ('target_id', models.BigIntegerField()),
+                ('target_label', models.CharField(blank=True, max_length=200)),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='actor',
+            field=models.ForeignKey(blank=True, help_text='Most recent actor of a coalesced notification', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='actor_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='previous_actor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='target_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='target_type',
+            field=models.CharField(blank=True, default='', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='verb',
+            field=models.CharField(blank=True, default='', max_length=30),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('group_key__gt', '')), fields=('user', 'group_key'), name='notification_group_unique'),
+        ),
+        migrations.AddField(
+            model_name='digestentry',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='digestentry',
+            constraint=models.UniqueConstraint(fields=('user', 'verb', 'target_type', 'target_id'), name='digest_entry_unique'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_actors(apps, schema_editor):
+    """Record the actors already stored on coalesced rows (earlier ones weren't kept)."""
+    Notification = apps.get_model('notifications', 'Notification')
+    NotificationActor = apps.get_model('notifications', 'NotificationActor')
+    rows = Notification.objects.filter(group_key__gt='').values_list('pk', 'actor_id', 'previous_actor_id')
+    NotificationActor.objects.bulk_create(
+        [
+            NotificationActor(notification_id=pk, actor_id=actor_id)
+            for pk, *actor_ids in rows.iterator()
+            for actor_id in set(actor_ids) - {None}
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0004_coalescing_and_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationActor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actor_links', to='notifications.notification')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='notificationactor',
+            constraint=models.UniqueConstraint(fields=('notification', 'actor'), name='notification_actor_unique'),
+        ),
+        migrations.RunPython(backfill_actors, migrations.RunPython.noop),
+    ]
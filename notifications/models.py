@@ -1,18 +1,162 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Notification(models.Model):
-    """In-app notification for a user."""
+    """
+    In-app notification for a user.
+
+    Activity notifications (likes, comments, favorites — see
+    notifications/coalesce.py) carry a `verb` and target and are coalesced:
+    every event for the same (user, verb, target) in one time window bumps
+    a single row, keyed by `group_key`, instead of adding one, and
+    `actor_count` counts the distinct actors (NotificationActor). For those
+    rows `message` holds only the predicate ("liked your post “…”"); the
+    actors are prepended when serialized. Digests have verb `digest` and
+    no actors.
+    """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications'
     )
     message = models.CharField(max_length=500)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    verb = models.CharField(max_length=30, blank=True, default='')
+    target_type = models.CharField(max_length=30, blank=True, default='')
+    target_id = models.BigIntegerField(null=True, blank=True)
+    group_key = models.CharField(max_length=100, blank=True, default='', editable=False)
+    actor_count = models.PositiveIntegerField(default=0)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        help_text='Most recent actor of a coalesced notification',
+    )
+    previous_actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unread count and mark-all-read; the list pages on the second.
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_unread_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+        ]
+        constraints = [
+            # Conflict target of the coalescing upsert.
+            models.UniqueConstraint(
+                fields=['user', 'group_key'], condition=models.Q(group_key__gt=''),
+                name='notification_group_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.email}: {self.message[:50]}"
+
+    def latest_actors(self):
+        return [user for user in (self.actor, self.previous_actor) if user]
+
+    def actor_phrase(self):
+        """Who did it, for a coalesced notification: `Raj`, `Raj and Priya` or `Raj and 41 others`."""
+        names = [user.name or user.email for user in self.latest_actors()] or ['Someone']
+        others = self.actor_count - 1
+        if others <= 0:
+            return names[0]
+        if others == 1 and len(names) == 2:
+            return f'{names[0]} and {names[1]}'
+        return f'{names[0]} and {others} {"other" if others == 1 else "others"}'
+
+
+class NotificationActor(models.Model):
+    """
+    One distinct actor of a coalesced notification. The unique pair is the
+    conflict target that decides whether an event adds to `actor_count`.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='actor_links')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'actor'], name='notification_actor_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_id} on notification {self.notification_id}"
+
+
+class DigestEntry(models.Model):
+    """
+    A low-priority activity event held back for the user's next digest
+    (`send_notification_digests`), coalesced per (user, verb, target).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='digest_entries'
+    )
+    verb = models.CharField(max_length=30)
+    target_type = models.CharField(max_length=30)
+    target_id = models.BigIntegerField()
+    target_label = models.CharField(max_length=200, blank=True)
+    count = models.PositiveIntegerField(default=1)
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'verb', 'target_type', 'target_id'], name='digest_entry_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.count} × {self.verb} for {self.user_id}"
+
+
+class Broadcast(models.Model):
+    """
+    One message sent to a whole audience, written in resumable chunks
+    (see notifications/broadcast.py). `last_user_id` is the checkpoint:
+    every user up to it has been notified.
+    """
+    AUDIENCE_CHOICES = [
+        ('all', 'All users'),
+        ('agents', 'Agents'),
+        ('buyers', 'Buyers (non-agents)'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    message = models.CharField(max_length=500)
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES, default='all')
+    property = models.ForeignKey(
+        'properties.Property', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='broadcasts', help_text='Listing being announced; its owner is not notified',
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+',
+    )
+    batch_size = models.PositiveIntegerField(default=1000)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    last_user_id = models.BigIntegerField(default=0, editable=False)
+    sent_count = models.PositiveIntegerField(default=0, editable=False)
+    error = models.TextField(blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Broadcast to {self.audience}: {self.message[:50]}"
+
+    def notifications_per_second(self):
+        """Throughput since the broadcast started (None before it has)."""
+        if not self.started_at:
+            return None
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.sent_count / elapsed, 1) if elapsed > 0 else None
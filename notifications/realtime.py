@@ -0,0 +1,204 @@
+"""
+Real-time delivery of new notifications to connected clients.
+
+Every process serving the stream endpoint (notifications/streaming.py)
+keeps one `Hub`: the open connections of that process, keyed by user.
+Notifications reach the hubs through a broker:
+
+* `LocalBroker` (default) hands events straight to this process's hub —
+  enough for a single ASGI worker, and for development.
+* `RedisBroker` (NOTIFICATIONS_BROKER_URL=redis://...) publishes on a
+  Redis channel that every worker subscribes to, so a notification
+  created anywhere reaches a client connected to any worker. Needs the
+  `redis` package.
+
+Another transport only has to implement `Broker.publish` and
+`Broker.start`; point NOTIFICATIONS_BROKER at its dotted path.
+
+Events are published once the creating transaction commits, through
+`signals.notifications_created` (post_save, or called after bulk_create,
+which sends no signals).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+REDIS_CHANNEL = 'hector25:notifications'
+
+
+class Subscription:
+    """One open stream: a bounded queue owned by the event loop serving it."""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def push(self, event):
+        # Runs on self.loop. A client this far behind is told to resync instead.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Hub:
+    """The streams open in this process, and fan-out of events to them."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def deliver(self, event):
+        """Queue `event` on its user's streams; safe to call from any thread."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event['user_id'], ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:  # the loop has shut down
+                self.unsubscribe(subscription)
+
+    def is_subscribed(self, user_id):
+        with self._lock:
+            return user_id in self._subscriptions
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def start_listening(self):
+        """Subscribe this process to the broker (first stream connection only)."""
+        with self._lock:
+            if self._listening:
+                return
+            self._listening = True
+        get_broker().start(self.deliver)
+
+
+class Broker:
+    """Carries events from the process that created a notification to every hub."""
+
+    def publish(self, event):
+        raise NotImplementedError
+
+    def may_deliver(self, user_id):
+        """False if no stream anywhere can be waiting for `user_id`'s events (lets publish skip them)."""
+        return True
+
+    def start(self, deliver):
+        """Begin passing events published by any process to `deliver(event)`."""
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """Single-process broker: events go straight to this process's hub."""
+
+    def publish(self, event):
+        hub.deliver(event)
+
+    def may_deliver(self, user_id):
+        return hub.is_subscribed(user_id)
+
+    def start(self, deliver):
+        pass
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub broker shared by every worker."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, event):
+        self.client.publish(REDIS_CHANNEL, json.dumps(event))
+
+    def start(self, deliver):
+        thread = threading.Thread(target=self._listen, args=(deliver,), name='notification-broker', daemon=True)
+        thread.start()
+
+    def _listen(self, deliver):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                for message in pubsub.listen():
+                    deliver(json.loads(message['data']))
+            except Exception:
+                logger.exception('Notification broker connection lost; resubscribing')
+                time.sleep(1)
+
+
+hub = Hub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, 'NOTIFICATIONS_BROKER_URL', '')
+            broker_path = getattr(settings, 'NOTIFICATIONS_BROKER', '')
+            if broker_path:
+                _broker = import_string(broker_path)()
+            elif url.startswith(('redis://', 'rediss://')):
+                _broker = RedisBroker(url)
+            else:
+                _broker = LocalBroker()
+        return _broker
+
+
+def events_for(notifications):
+    """Stream events for `notifications`, serialized in one pass (large broadcasts publish thousands)."""
+    return [
+        {'user_id': notification.user_id, 'id': notification.pk, 'notification': data}
+        for notification, data in zip(notifications, NotificationSerializer(notifications, many=True).data)
+    ]
+
+
+def publish(notifications):
+    """Push `notifications` to their users' open streams now."""
+    broker = get_broker()
+    notifications = [notification for notification in notifications if broker.may_deliver(notification.user_id)]
+    for event in events_for(notifications):
+        try:
+            broker.publish(event)
+        except Exception:
+            logger.exception('Failed to publish Notification %s', event['id'])
+
+
+def publish_on_commit(notifications):
+    """Push `notifications` once the current transaction commits (e.g. after bulk_create)."""
+    notifications = [notification for notification in notifications if notification.pk]
+    if notifications:
+        transaction.on_commit(lambda: publish(notifications))
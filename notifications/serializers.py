@@ -1,9 +1,46 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Broadcast, Notification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
+    message = serializers.SerializerMethodField()
+    actors = serializers.SerializerMethodField()
+
     class Meta:
         model = Notification
-        fields = ('id', 'message', 'is_read', 'created_at')
-        read_only_fields = ('id', 'message', 'created_at')
+        fields = (
+            'id', 'message', 'verb', 'target_type', 'target_id', 'actor_count', 'actors',
+            'is_read', 'created_at',
+        )
+        read_only_fields = (
+            'id', 'message', 'verb', 'target_type', 'target_id', 'actor_count', 'actors',
+            'created_at',
+        )
+
+    def get_message(self, obj):
+        if not obj.actor_count:
+            return obj.message
+        return f'{obj.actor_phrase()} {obj.message}'
+
+    def get_actors(self, obj):
+        """The latest actors of a coalesced notification, newest first."""
+        if not obj.verb:
+            return []
+        return [{'id': user.pk, 'name': user.name or user.email} for user in obj.latest_actors()]
+
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    notifications_per_second = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = (
+            'id', 'message', 'audience', 'property', 'batch_size', 'status',
+            'sent_count', 'last_user_id', 'notifications_per_second', 'error',
+            'created_at', 'started_at', 'finished_at',
+        )
+        read_only_fields = (
+            'id', 'status', 'sent_count', 'last_user_id', 'notifications_per_second',
+            'error', 'created_at', 'started_at', 'finished_at',
+        )
+        extra_kwargs = {'batch_size': {'required': False, 'min_value': 1, 'max_value': 10000}}
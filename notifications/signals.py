@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import realtime, unread
+from .models import Notification
+
+
+def notifications_created(notifications):
+    """
+    Push new notifications to open streams and count them as unread once
+    they commit. post_save does this for save(); call it after bulk_create.
+    """
+    realtime.publish_on_commit(notifications)
+    unread.record_created(notifications)
+
+
+@receiver(post_save, sender=Notification)
+def notification_created(sender, instance, created, **kwargs):
+    if created:
+        notifications_created([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        unread.adjust(instance.user_id, -1)
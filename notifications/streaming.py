@@ -0,0 +1,222 @@
+"""
+GET /api/notifications/stream/ — push new notifications to the client as they are created.
+
+A plain ASGI application (routed in hector25_backend/asgi.py) rather than
+a Django view, so an idle connection costs one coroutine and one queue —
+no thread, no request/response cycle — and client disconnects are seen
+immediately. The same path speaks two protocols:
+
+* Server-Sent Events for plain HTTP GET (`EventSource`). Each
+  notification is an `event: notification` whose `id` is the notification
+  id; on reconnect the browser sends `Last-Event-ID` and anything created
+  in between is replayed first. A comment line is sent every
+  HEARTBEAT_SECONDS to keep proxies from closing the idle connection.
+* WebSocket: one JSON text frame per notification,
+  `{"type": "notification", "notification": {...}}`.
+
+Coalesced activity notifications (notifications/coalesce.py) are re-sent
+under the same id each time they are bumped, so clients should upsert by
+id. Bumps of older rows that happen while a client is disconnected are
+not replayed; those rows are back at the top of GET /api/notifications/.
+
+Both authenticate with a SimpleJWT access token, from the
+`Authorization: Bearer <token>` header or — since neither `EventSource`
+nor browser WebSockets can set headers — a `?token=` query parameter.
+
+A client that falls QUEUE_SIZE events behind gets a `resync` event and is
+disconnected; it should reload GET /api/notifications/ and reconnect.
+
+In production the stream runs as its own ASGI service
+(`hector25_backend.asgi:stream_application`, Procfile `stream`) while the
+REST API stays on WSGI; clients find its host through
+NOTIFICATIONS_STREAM_URL in the API root (CORS is handled here), or the
+proxy routes /api/notifications/stream/ to it — see hector25_backend/asgi.py.
+It only sees notifications created by the web service through a shared
+broker (NOTIFICATIONS_BROKER_URL).
+
+`runserver` is WSGI-only and never reaches this endpoint; in development
+serve the project with `venv\Scripts\python -m uvicorn hector25_backend.asgi:application --reload`.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .models import Notification
+from .realtime import hub, events_for
+
+STREAM_PATH = '/api/notifications/stream/'
+HEARTBEAT_SECONDS = 20
+RETRY_MILLISECONDS = 3000
+REPLAY_LIMIT = 100
+
+HEARTBEAT, RESYNC, DISCONNECTED = object(), object(), object()
+
+
+def _raw_token(scope):
+    headers = dict(scope.get('headers') or [])
+    header = headers.get(b'authorization', b'').decode('latin-1').split()
+    if len(header) == 2 and header[0] in settings.SIMPLE_JWT.get('AUTH_HEADER_TYPES', ('Bearer',)):
+        return header[1]
+    tokens = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('token')
+    return tokens[0] if tokens else None
+
+
+def _authenticate(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+authenticate = sync_to_async(_authenticate)
+
+
+@sync_to_async
+def missed_events(user_id, last_id):
+    """Notifications created after `last_id` (oldest first), for a reconnecting SSE client."""
+    return events_for(list(
+        Notification.objects.filter(user_id=user_id, pk__gt=last_id)
+        .select_related('actor', 'previous_actor')
+        .order_by('pk')[:REPLAY_LIMIT]
+    ))
+
+
+def _allowed_origin(scope):
+    origin = dict(scope.get('headers') or []).get(b'origin', b'').decode('latin-1')
+    if origin and (getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or origin in settings.CORS_ALLOWED_ORIGINS):
+        return origin
+    return None
+
+
+class NotificationStreamApp:
+    path = STREAM_PATH
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'websocket':
+            await self.websocket(scope, receive, send)
+        else:
+            await self.event_stream(scope, receive, send)
+
+    async def event_stream(self, scope, receive, send):
+        cors = []
+        origin = _allowed_origin(scope)
+        if origin:
+            cors.append((b'access-control-allow-origin', origin.encode('latin-1')))
+        if scope['method'] != 'GET':
+            return await self._reject(send, 405, 'Method not allowed.', cors)
+
+        raw_token = _raw_token(scope)
+        user = await authenticate(raw_token) if raw_token else None
+        if user is None:
+            return await self._reject(send, 401, 'Authentication credentials were not provided or are invalid.', cors)
+
+        hub.start_listening()
+        subscription = hub.subscribe(user.pk)
+        disconnect = asyncio.ensure_future(self._wait_for(receive, 'http.disconnect'))
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'), *cors,
+            ]})
+            await self._send_sse(send, f'retry: {RETRY_MILLISECONDS}\n\n')
+
+            last_id = dict(scope.get('headers') or []).get(b'last-event-id', b'').decode('latin-1')
+            replayed = set()
+            if last_id.isdigit():
+                for event in await missed_events(user.pk, int(last_id)):
+                    await self._send_sse(send, self._format_sse(event))
+                    replayed.add(event['id'])
+
+            while True:
+                event = await self._next_event(subscription, disconnect)
+                if event is DISCONNECTED:
+                    return
+                if event is HEARTBEAT:
+                    await self._send_sse(send, ': keepalive\n\n')
+                elif event is RESYNC:
+                    await self._send_sse(send, 'event: resync\ndata: {}\n\n')
+                    break
+                elif event['id'] in replayed:
+                    replayed.discard(event['id'])  # published while the replay was being read
+                else:
+                    await self._send_sse(send, self._format_sse(event))
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except OSError:
+            pass  # client went away mid-write
+        finally:
+            disconnect.cancel()
+            hub.unsubscribe(subscription)
+
+    async def websocket(self, scope, receive, send):
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+        raw_token = _raw_token(scope)
+        user = await authenticate(raw_token) if raw_token else None
+        if user is None:
+            return await send({'type': 'websocket.close', 'code': 4401})
+
+        hub.start_listening()
+        subscription = hub.subscribe(user.pk)
+        disconnect = asyncio.ensure_future(self._wait_for(receive, 'websocket.disconnect'))
+        try:
+            await send({'type': 'websocket.accept'})
+            while True:
+                event = await self._next_event(subscription, disconnect)
+                if event is DISCONNECTED:
+                    return
+                if event is HEARTBEAT:
+                    continue  # the server answers WebSocket pings itself
+                if event is RESYNC:
+                    await send({'type': 'websocket.send', 'text': json.dumps({'type': 'resync'})})
+                    await send({'type': 'websocket.close', 'code': 4000})
+                    return
+                await send({'type': 'websocket.send', 'text': json.dumps(
+                    {'type': 'notification', 'notification': event['notification']}
+                )})
+        except OSError:
+            pass
+        finally:
+            disconnect.cancel()
+            hub.unsubscribe(subscription)
+
+    @staticmethod
+    async def _next_event(subscription, disconnect):
+        """The next queued event, or HEARTBEAT after HEARTBEAT_SECONDS idle, RESYNC or DISCONNECTED."""
+        if disconnect.done():
+            return DISCONNECTED
+        if subscription.overflowed:
+            return RESYNC
+        getter = asyncio.ensure_future(subscription.queue.get())
+        done, _ = await asyncio.wait({getter, disconnect}, timeout=HEARTBEAT_SECONDS,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            return getter.result()
+        getter.cancel()
+        return DISCONNECTED if disconnect in done else HEARTBEAT
+
+    @staticmethod
+    async def _wait_for(receive, message_type):
+        while (await receive())['type'] != message_type:
+            pass
+
+    @staticmethod
+    def _format_sse(event):
+        return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event['notification'])}\n\n"
+
+    @staticmethod
+    async def _send_sse(send, text):
+        await send({'type': 'http.response.body', 'body': text.encode(), 'more_body': True})
+
+    @staticmethod
+    async def _reject(send, status, detail, headers):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'), *headers]})
+        await send({'type': 'http.response.body', 'body': json.dumps({'detail': detail}).encode()})
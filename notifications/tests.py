@@ -0,0 +1,180 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from community.models import Post
+from properties.models import Property
+
+from . import broadcast, unread
+from .models import Broadcast, Notification
+
+User = get_user_model()
+
+
+class CoalescedNotificationTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pw')
+        self.post = Post.objects.create(author=self.author, title='Hello', content='-')
+
+    def make_user(self, name):
+        user = User.objects.create_user(username=name, email=f'{name}@example.com', password='pw', name=name)
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def like(self, client):
+        return client.post(f'/api/community/posts/{self.post.pk}/like/')
+
+    def message(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        return client.get('/api/notifications/').data['results'][0]['message']
+
+    def test_likes_merge_into_one_row(self):
+        for i in range(5):
+            self.like(self.make_user(f'fan{i}'))
+        notification = Notification.objects.get(user=self.author)
+        self.assertEqual(notification.actor_count, 5)
+        self.assertEqual(self.message(), 'fan4 and 4 others liked your post “Hello”')
+
+    def test_actors_are_counted_once(self):
+        raj, priya = self.make_user('Raj'), self.make_user('Priya')
+        for _ in range(3):
+            for client in (raj, priya):
+                self.like(client)  # like
+                self.like(client)  # unlike
+        notification = Notification.objects.get(user=self.author)
+        self.assertEqual(notification.actor_count, 2)
+        self.assertEqual(self.message(), 'Priya and Raj liked your post “Hello”')
+
+    def test_own_likes_do_not_notify(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        self.like(client)
+        self.assertFalse(Notification.objects.exists())
+
+
+class UnreadCountTests(TestCase):
+    """The cached badge count stays equal to the unread rows through every kind of write."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', email='reader@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def notify(self, count=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [Notification.objects.create(user=self.user, message=f'n{i}') for i in range(count)]
+
+    def badge(self):
+        return self.client.get('/api/notifications/unread-count/').data['unread_count']
+
+    def assert_badge(self, expected):
+        self.assertEqual(self.badge(), expected)
+        self.assertEqual(Notification.objects.filter(user=self.user, is_read=False).count(), expected)
+        self.assertEqual(cache.get(unread.cache_key(self.user.pk)), expected)
+
+    def test_create(self):
+        self.notify()
+        self.assert_badge(1)  # seeded by the read
+        self.notify(2)
+        self.assert_badge(3)  # incremented
+
+    def test_mark_read(self):
+        first, _ = self.notify(2)
+        self.assert_badge(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/notifications/{first.pk}/read/')
+            self.client.post(f'/api/notifications/{first.pk}/read/')
+        self.assert_badge(1)
+
+    def test_mark_all_read(self):
+        self.notify(3)
+        self.assert_badge(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/notifications/read-all/')
+        self.assert_badge(0)
+
+    def test_delete(self):
+        first, second, _ = self.notify(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/notifications/{second.pk}/read/')
+        self.assert_badge(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+            Notification.objects.get(pk=second.pk).delete()  # already read: no change
+        self.assert_badge(1)
+
+    def test_write_between_count_and_seed(self):
+        self.notify()
+        real_add = cache.add
+
+        def add_after_a_write(key, value, timeout):
+            if key == unread.cache_key(self.user.pk):
+                self.notify()  # commits after the reader's COUNT; its increment finds no key
+            return real_add(key, value, timeout)
+
+        with mock.patch.object(unread.cache, 'add', side_effect=add_after_a_write):
+            self.assertEqual(self.badge(), 1)  # this read raced the write
+        self.assert_badge(2)  # but its stale seed was not kept
+
+
+class BroadcastTests(TestCase):
+    """Chunked, resumable broadcasts (notifications/broadcast.py)."""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='pw')
+            for i in range(7)
+        ]
+        User.objects.filter(pk=self.users[3].pk).update(is_active=False)
+        self.audience = [user.pk for user in self.users if user.pk != self.users[3].pk]
+        self.broadcast = Broadcast.objects.create(message='Hello', batch_size=4)
+
+    def notified(self):
+        return sorted(Notification.objects.filter(message='Hello').values_list('user_id', flat=True))
+
+    def test_send_chunk_advances_the_checkpoint(self):
+        self.assertEqual(broadcast.send_chunk(self.broadcast), 4)
+        self.assertEqual(self.notified(), self.audience[:4])
+        self.broadcast.refresh_from_db()
+        self.assertEqual((self.broadcast.last_user_id, self.broadcast.sent_count), (self.audience[3], 4))
+
+        self.assertEqual(broadcast.send_chunk(self.broadcast), 2)
+        self.assertEqual(broadcast.send_chunk(self.broadcast), 0)
+        self.assertEqual(self.notified(), self.audience)
+
+    def test_run_resumes_from_last_user_id(self):
+        Broadcast.objects.filter(pk=self.broadcast.pk).update(last_user_id=self.audience[2], sent_count=3)
+        broadcast.run(self.broadcast)
+        self.assertEqual(self.notified(), self.audience[3:])
+        self.broadcast.refresh_from_db()
+        self.assertEqual((self.broadcast.status, self.broadcast.sent_count), ('done', len(self.audience)))
+
+    def test_moved_checkpoint_rolls_the_chunk_back(self):
+        stale = Broadcast.objects.get(pk=self.broadcast.pk)
+        broadcast.send_chunk(self.broadcast)  # another runner wins the first chunk
+        with self.assertRaises(broadcast.CheckpointMoved):
+            broadcast.send_chunk(stale)
+        self.assertEqual(self.notified(), self.audience[:4])
+
+        with mock.patch.object(broadcast, 'send_chunk', side_effect=broadcast.CheckpointMoved):
+            broadcast.run(stale)  # stops quietly, leaving the broadcast to the other runner
+        self.broadcast.refresh_from_db()
+        self.assertEqual((self.broadcast.status, self.broadcast.error), ('running', ''))
+
+    def test_listing_owner_is_not_notified(self):
+        owner = self.users[0]
+        listing = Property.objects.create(
+            owner=owner, title='Tower', location='Pune', price=1, type='Apartment', listing_type='new_launch',
+        )
+        announcement = Broadcast.objects.get(property=listing)
+        broadcast.run(announcement)
+        self.assertEqual(
+            sorted(Notification.objects.filter(message=announcement.message).values_list('user_id', flat=True)),
+            self.audience[1:],
+        )
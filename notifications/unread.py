@@ -0,0 +1,91 @@
+"""
+Per-user unread-notification counter for the badge endpoint.
+
+The count lives in the cache under one key per user and is moved by
+INCR/DECR once the write that changed it commits: new unread
+notifications add, marking read or deleting unread ones subtracts. A
+missing key (never read, evicted, cache restarted) is recomputed with one
+COUNT on notification_unread_idx and re-seeded with `add`, so a
+concurrent increment is never overwritten.
+
+An adjustment that finds the key missing can't be applied, but it may
+have committed after a reader's COUNT and before that reader's `add`,
+which would seed a count missing it. So such writes (and invalidations)
+first bump a per-user write counter and then delete the key; the reader
+compares the write counter from before its COUNT with the one after its
+`add` and drops its own seed if they differ. Whichever order the steps
+interleave in, a seed that may have missed a write is deleted and the
+next read recomputes it.
+
+Coalesced activity notifications (notifications/coalesce.py) may create
+a row or re-mark an old one unread, which the upsert can't tell apart, so
+they invalidate the key instead.
+
+Writes the counter doesn't see (admin edits, raw SQL) are bounded by
+CACHE_TIMEOUT, after which the key is recomputed from the database.
+"""
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def writes_key(user_id):
+    return f'notifications:unread:{user_id}:writes'
+
+
+def get_unread_count(user_id):
+    key = cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        writes = cache.get(writes_key(user_id))
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(key, count, CACHE_TIMEOUT)
+        if cache.get(writes_key(user_id)) != writes:
+            cache.delete(key)  # a write landed while counting and may be missing from `count`
+    return max(count, 0)
+
+
+def adjust(user_id, delta):
+    """Move `user_id`'s cached count by `delta` once the current transaction commits."""
+    if delta:
+        transaction.on_commit(lambda: _apply(user_id, delta))
+
+
+def _apply(user_id, delta):
+    key = cache_key(user_id)
+    try:
+        count = cache.incr(key, delta) if delta > 0 else cache.decr(key, -delta)
+    except ValueError:
+        return _drop(user_id)  # not cached; a reader may be seeding it without this write
+    if count < 0:
+        cache.delete(key)
+
+
+def _drop(user_id):
+    key = writes_key(user_id)
+    cache.add(key, 0, CACHE_TIMEOUT)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass  # evicted in between; rare, and CACHE_TIMEOUT still bounds a stale seed
+    cache.delete(cache_key(user_id))
+
+
+def invalidate(user_id):
+    """Drop `user_id`'s cached count once the current transaction commits (the next read recomputes it)."""
+    transaction.on_commit(lambda: _drop(user_id))
+
+
+def record_created(notifications):
+    """Count new unread `notifications` (e.g. after bulk_create, which sends no signals)."""
+    for user_id, created in Counter(n.user_id for n in notifications if not n.is_read).items():
+        adjust(user_id, created)
@@ -1,8 +1,18 @@
 from django.urls import path
-from .views import NotificationListView, NotificationMarkReadView, NotificationMarkAllReadView
+from .views import (
+    NotificationListView,
+    UnreadNotificationCountView,
+    NotificationMarkReadView,
+    NotificationMarkAllReadView,
+    BroadcastListCreateView,
+    BroadcastDetailView,
+)
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
+    path('unread-count/', UnreadNotificationCountView.as_view(), name='notification-unread-count'),
     path('read-all/', NotificationMarkAllReadView.as_view(), name='notification-read-all'),
     path('<int:pk>/read/', NotificationMarkReadView.as_view(), name='notification-read'),
+    path('broadcasts/', BroadcastListCreateView.as_view(), name='broadcast-list-create'),
+    path('broadcasts/<int:pk>/', BroadcastDetailView.as_view(), name='broadcast-detail'),
 ]
@@ -2,17 +2,29 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Notification
-from .serializers import NotificationSerializer
+from hector25_backend.pagination import KeysetPagination
+
+from . import broadcast, unread
+from .models import Broadcast, Notification
+from .serializers import BroadcastSerializer, NotificationSerializer
 
 
 class NotificationListView(generics.ListAPIView):
     """GET /api/notifications/ — list current user's notifications."""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        return Notification.objects.filter(user=self.request.user).select_related('actor', 'previous_actor')
+
+
+class UnreadNotificationCountView(APIView):
+    """GET /api/notifications/unread-count/ — number of unread notifications (cached per user)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread_count': unread.get_unread_count(request.user.pk)})
 
 
 class NotificationMarkReadView(APIView):
@@ -21,11 +33,14 @@ class NotificationMarkReadView(APIView):
 
     def post(self, request, pk):
         try:
-            notification = Notification.objects.get(pk=pk, user=request.user)
+            notification = Notification.objects.select_related('actor', 'previous_actor').get(pk=pk, user=request.user)
         except Notification.DoesNotExist:
             return Response({'detail': 'Notification not found.'}, status=status.HTTP_404_NOT_FOUND)
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            # Conditional, so concurrent marks of the same row only count once.
+            if Notification.objects.filter(pk=pk, is_read=False).update(is_read=True):
+                unread.adjust(request.user.pk, -1)
+            notification.is_read = True
         return Response(NotificationSerializer(notification).data)
 
 
@@ -34,5 +49,38 @@ class NotificationMarkAllReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        marked = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        unread.adjust(request.user.pk, -marked)
         return Response({'detail': 'All notifications marked as read.'})
+
+
+class BroadcastListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/notifications/broadcasts/  — broadcasts with progress (staff only)
+    POST /api/notifications/broadcasts/  — send a message to an audience (staff only)
+
+    The broadcast is written in the background in chunks of `batch_size`
+    users; poll its detail URL for `sent_count` and throughput.
+    """
+    serializer_class = BroadcastSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Broadcast.objects.all()
+
+    def perform_create(self, serializer):
+        instance = serializer.save(
+            created_by=self.request.user,
+            batch_size=serializer.validated_data.get('batch_size') or broadcast.default_batch_size(),
+        )
+        broadcast.schedule(instance)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+
+class BroadcastDetailView(generics.RetrieveAPIView):
+    """GET /api/notifications/broadcasts/{id}/ — broadcast progress (staff only)."""
+    serializer_class = BroadcastSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Broadcast.objects.all()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Property, PropertyImage, Amenity, Favorite
+from .models import Property, PropertyImage, Amenity, Favorite, MarketStat, SavedSearch
 
 
 class PropertyImageInline(admin.TabularInline):
@@ -26,3 +26,23 @@ class PropertyAdmin(admin.ModelAdmin):
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('user', 'property', 'created_at')
     list_filter = ('created_at',)
+
+
+@admin.register(MarketStat)
+class MarketStatAdmin(admin.ModelAdmin):
+    list_display = ('location', 'type', 'listing_type', 'listing_count', 'median_price', 'median_price_per_sqft', 'refreshed_at')
+    list_filter = ('type', 'listing_type')
+    search_fields = ('location',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('user', 'name', 'criteria_key', 'price_min', 'price_max', 'created_at')
+    search_fields = ('user__email', 'name')
+    readonly_fields = ('criteria_key', 'price_min', 'price_max', 'bedrooms_min', 'bedrooms_max', 'location_token_count')
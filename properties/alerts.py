@@ -0,0 +1,100 @@
+"""
+Saved-search alerts: notify buyers when a new listing matches a SavedSearch.
+
+Saved searches are never re-run against the listings table. Instead each
+SavedSearch stores its criteria as indexed columns and its location words
+as SavedSearchToken rows, and a new listing is looked up *in* them:
+
+* `criteria_key IN (4 keys)` — the listing's listing_type/type paired
+  with the "any" wildcard — is an index range on saved_search_criteria_idx,
+  as is `price_min <= price` within each key;
+* price_max and the bedrooms interval are checked on those candidates;
+* location is a posting-list lookup: the number of the search's tokens
+  found among the listing's location words (via the unique
+  (saved_search, token) index) must equal the search's token count, i.e.
+  every saved word is present.
+
+So matching one listing costs one query whose work grows with the number
+of candidate searches, not with the number of saved searches. All
+notifications produced for a batch of listings are written with one
+bulk_create inside one transaction, then pushed to open notification
+streams and unread counters (notifications/signals.py).
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from notifications.models import Notification
+from notifications.signals import notifications_created
+
+from .models import SavedSearch, SavedSearchToken
+from .search import tokenize
+
+# PropertyFilter parameters a saved search may use.
+ALERT_PARAMS = ('type', 'listing_type', 'price_min', 'price_max', 'bedrooms', 'bedrooms_min', 'location')
+MAX_SAVED_SEARCHES = 20
+
+
+def sync_tokens(search):
+    """Rewrite the search's location posting list after it's saved."""
+    SavedSearchToken.objects.filter(saved_search=search).delete()
+    SavedSearchToken.objects.bulk_create([
+        SavedSearchToken(saved_search=search, token=token) for token in search.location_terms()
+    ])
+
+
+def matching_searches(listing):
+    """SavedSearch rows (of other users) that `listing` satisfies."""
+    keys = [
+        f'{listing_type}:{type_}'
+        for listing_type in (listing.listing_type, '*')
+        for type_ in (listing.type, '*')
+    ]
+    qs = (
+        SavedSearch.objects
+        .filter(criteria_key__in=keys, price_min__lte=listing.price)
+        .filter(Q(price_max__isnull=True) | Q(price_max__gte=listing.price))
+        .filter(bedrooms_min__lte=listing.bedrooms)
+        .filter(Q(bedrooms_max__isnull=True) | Q(bedrooms_max__gte=listing.bedrooms))
+        .exclude(user_id=listing.owner_id)
+    )
+    terms = set(tokenize(listing.location))
+    if not terms:
+        return qs.filter(location_token_count=0)
+    found = (
+        SavedSearchToken.objects
+        .filter(saved_search=OuterRef('pk'), token__in=terms)
+        .values('saved_search')
+        .annotate(found=Count('*'))
+        .values('found')
+    )
+    return qs.annotate(
+        tokens_found=Coalesce(Subquery(found, output_field=IntegerField()), Value(0)),
+    ).filter(Q(location_token_count=0) | Q(location_token_count=F('tokens_found')))
+
+
+def notify_matches(listings):
+    """Create one Notification per (user, listing) matched by any of the user's saved searches."""
+    notifications = []
+    for listing in listings:
+        matched = {}
+        for user_id, name in matching_searches(listing).order_by().values_list('user_id', 'name'):
+            matched.setdefault(user_id, name)
+        for user_id, name in matched.items():
+            label = f'“{name}”' if name else 'your saved search'
+            notifications.append(Notification(
+                user_id=user_id,
+                message=f'New listing matching {label}: {listing.title} — {listing.location}'[:500],
+            ))
+    if notifications:
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=1000)
+            notifications_created(notifications)
+    return len(notifications)
+
+
+def schedule_matches(listings):
+    """Match `listings` against saved searches once the current transaction commits."""
+    listings = list(listings)
+    if listings:
+        transaction.on_commit(lambda: notify_matches(listings))
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'properties'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals  # noqa: F401
+        post_migrate.connect(_repair_search_schema, sender=self)
+
+
+def _repair_search_schema(sender, using, **kwargs):
+    from django.db import connections
+    from .search import repair_search_schema
+    repair_search_schema(connections[using])
@@ -0,0 +1,112 @@
+"""
+Generation-versioned cache for property read paths.
+
+Every cached entry embeds the current property "generation" in its key.
+Writes bump the generation (one cache INCR), which orphans every older
+entry at once — nothing is ever scanned or deleted, stale entries simply
+age out of the cache.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .serializers import get_favorited_ids
+
+GENERATION_KEY = 'properties:generation'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a counter lost to eviction/restart never
+        # goes backwards onto keys that are still cached.
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Invalidate every versioned entry once the current transaction commits."""
+    transaction.on_commit(_incr_generation)
+
+
+def _incr_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_generation()
+
+
+def normalize_params(query_params, allowed, casefold=True):
+    """Sorted, non-empty (name, value) pairs restricted to `allowed`."""
+    return sorted(
+        (name, value.strip().lower() if casefold else value.strip())
+        for name in set(allowed)
+        for value in query_params.getlist(name)
+        if value.strip()
+    )
+
+
+def versioned_key(prefix, params):
+    digest = hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+    return f'{prefix}:{get_generation()}:{digest}'
+
+
+class VersionedResponseCacheMixin:
+    """
+    Cache GET list responses under the property generation.
+
+    The payload is cached once for every viewer: `is_favorited` is stored
+    as False and re-applied per request with a single Favorite lookup for
+    the page. Responses carry `X-Cache: HIT|MISS|BYPASS`.
+    """
+    cache_prefix = None
+    cache_params = ()
+    cache_timeout = 300
+    cache_header = 'X-Cache'
+
+    def get_cache_params(self):
+        return self.cache_params
+
+    def list(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().list(request, *args, **kwargs)
+
+        params = normalize_params(request.query_params, self.get_cache_params(), casefold=False)
+        # Payloads hold absolute URLs, so the host is part of the key.
+        key = versioned_key(self.cache_prefix, [request.build_absolute_uri('/'), *params])
+        data = cache.get(key)
+        if data is not None:
+            response = Response(_apply_viewer_state(data, request))
+            response[self.cache_header] = 'HIT'
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, _strip_viewer_state(response.data), self.cache_timeout)
+            response[self.cache_header] = 'MISS'
+        else:
+            response[self.cache_header] = 'BYPASS'
+        return response
+
+
+def _map_rows(data, fn):
+    """Apply `fn` to every row of a (possibly paginated) list payload."""
+    if isinstance(data, dict):
+        return {**data, 'results': [fn(row) for row in data['results']]}
+    return [fn(row) for row in data]
+
+
+def _strip_viewer_state(data):
+    return _map_rows(data, lambda row: {**row, 'is_favorited': False})
+
+
+def _apply_viewer_state(data, request):
+    if not request.user.is_authenticated:
+        return data
+    rows = data['results'] if isinstance(data, dict) else data
+    favorited = get_favorited_ids({'request': request}, [row['id'] for row in rows])
+    return _map_rows(data, lambda row: {**row, 'is_favorited': row['id'] in favorited})
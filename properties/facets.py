@@ -0,0 +1,69 @@
+"""
+Facet counts for the property browser, computed in a single aggregate pass.
+
+Each bucket is a conditional COUNT(*) FILTER (WHERE ...) (CASE WHEN on
+SQLite) over the already-filtered queryset, so the database reads the
+matching rows once no matter how many buckets there are.
+"""
+from django.db.models import Count, Q
+
+from .models import Property
+
+# (min inclusive, max exclusive) in INR; None means unbounded.
+PRICE_BUCKETS = [
+    (0, 1000000),
+    (1000000, 5000000),
+    (5000000, 10000000),
+    (10000000, 50000000),
+    (50000000, None),
+]
+# Bedroom counts up to MAX_BEDROOM_BUCKET are listed individually, the rest as "N+".
+MAX_BEDROOM_BUCKET = 5
+
+
+def _price_q(low, high):
+    q = Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+def _bedroom_buckets():
+    for bedrooms in range(MAX_BEDROOM_BUCKET):
+        yield str(bedrooms), Q(bedrooms=bedrooms)
+    yield f'{MAX_BEDROOM_BUCKET}+', Q(bedrooms__gte=MAX_BEDROOM_BUCKET)
+
+
+def facet_counts(queryset):
+    """Return total plus per-type, listing_type, bedrooms and price bucket counts."""
+    aggregates = {'total': Count('pk')}
+    for i, (key, _) in enumerate(Property.TYPE_CHOICES):
+        aggregates[f'type_{i}'] = Count('pk', filter=Q(type=key))
+    for i, (key, _) in enumerate(Property.LISTING_TYPE_CHOICES):
+        aggregates[f'listing_type_{i}'] = Count('pk', filter=Q(listing_type=key))
+    for i, (_, q) in enumerate(_bedroom_buckets()):
+        aggregates[f'bedrooms_{i}'] = Count('pk', filter=q)
+    for i, (low, high) in enumerate(PRICE_BUCKETS):
+        aggregates[f'price_{i}'] = Count('pk', filter=_price_q(low, high))
+
+    row = queryset.order_by().aggregate(**aggregates)
+
+    return {
+        'total': row['total'],
+        'type': [
+            {'value': key, 'label': label, 'count': row[f'type_{i}']}
+            for i, (key, label) in enumerate(Property.TYPE_CHOICES)
+        ],
+        'listing_type': [
+            {'value': key, 'label': label, 'count': row[f'listing_type_{i}']}
+            for i, (key, label) in enumerate(Property.LISTING_TYPE_CHOICES)
+        ],
+        'bedrooms': [
+            {'value': value, 'count': row[f'bedrooms_{i}']}
+            for i, (value, _) in enumerate(_bedroom_buckets())
+        ],
+        'price': [
+            {'min': low, 'max': high, 'count': row[f'price_{i}']}
+            for i, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+    }
@@ -1,18 +1,122 @@
 import django_filters
+from django_filters.constants import EMPTY_VALUES
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from . import geo, search
 from .models import Property
 
 
+def canonical_choice(model, field_name, value):
+    """Map `value` case-insensitively onto one of the field's choice keys (or None)."""
+    choices = model._meta.get_field(field_name).choices
+    return {key.lower(): key for key, _ in choices}.get(str(value).lower())
+
+
+class ChoiceIExactFilter(django_filters.CharFilter):
+    """
+    Case-insensitive match against a choices field, resolved to an exact lookup.
+
+    `iexact` compiles to UPPER(col) = UPPER(%s) / LIKE, which a plain B-tree
+    index can't serve. Choices are a closed set, so resolve the value to its
+    canonical key up front and let the composite indexes do the work.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        canonical = canonical_choice(qs.model, self.field_name, value)
+        if canonical is None:
+            return qs.none()
+        return super().filter(qs, canonical)
+
+
 class PropertyFilter(django_filters.FilterSet):
     """Filter properties by type, listing_type, price range, bedrooms, and location."""
-    type = django_filters.CharFilter(field_name='type', lookup_expr='iexact')
-    listing_type = django_filters.CharFilter(field_name='listing_type', lookup_expr='iexact')
+    type = ChoiceIExactFilter(field_name='type')
+    listing_type = ChoiceIExactFilter(field_name='listing_type')
     price_min = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
     price_max = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
     bedrooms = django_filters.NumberFilter(field_name='bedrooms')
     bedrooms_min = django_filters.NumberFilter(field_name='bedrooms', lookup_expr='gte')
     location = django_filters.CharFilter(field_name='location', lookup_expr='icontains')
     featured = django_filters.BooleanFilter(field_name='is_featured')
+    near = django_filters.CharFilter(method='filter_near', help_text='"lat,lng"; see radius_km')
+    radius_km = django_filters.NumberFilter(method='filter_noop', help_text='Radius for `near`')
+    bbox = django_filters.CharFilter(method='filter_bbox', help_text='"min_lat,min_lng,max_lat,max_lng"')
 
     class Meta:
         model = Property
         fields = ['type', 'listing_type', 'price_min', 'price_max', 'bedrooms', 'location']
+
+    def filter_noop(self, queryset, name, value):
+        return queryset
+
+    def filter_near(self, queryset, name, value):
+        latitude, longitude = _parse_coordinates(name, value, 2)
+        _check_latitude(name, latitude)
+        radius_km = float(self.form.cleaned_data.get('radius_km') or geo.DEFAULT_RADIUS_KM)
+        if not 0 < radius_km <= geo.MAX_RADIUS_KM:
+            raise ValidationError({'radius_km': f'Must be between 0 and {geo.MAX_RADIUS_KM}.'})
+        return geo.within_radius(queryset, latitude, longitude, radius_km)
+
+    def filter_bbox(self, queryset, name, value):
+        min_lat, min_lng, max_lat, max_lng = _parse_coordinates(name, value, 4)
+        _check_latitude(name, min_lat, max_lat)
+        if min_lat > max_lat:
+            raise ValidationError({name: 'min_lat must not exceed max_lat.'})
+        return geo.within_box(queryset, min_lat, min_lng, max_lat, max_lng)
+
+
+def _parse_coordinates(name, value, count):
+    try:
+        numbers = [float(part) for part in value.split(',')]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(-360 <= n <= 360 for n in numbers):
+        raise ValidationError({name: f'Expected {count} comma-separated coordinates.'})
+    return numbers
+
+
+def _check_latitude(name, *latitudes):
+    if not all(-90 <= latitude <= 90 for latitude in latitudes):
+        raise ValidationError({name: 'Latitude must be between -90 and 90.'})
+
+
+class PropertySearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text `?search=` backed by properties.search (prefix matching).
+
+    List it after OrderingFilter: unless the client passed an explicit
+    `?ordering=`, matches are ordered by relevance, newest first on ties.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search.tokenize(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        queryset = search.search_properties(queryset, terms)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
+
+
+class PropertyDistanceOrdering(filters.BaseFilterBackend):
+    """
+    Nearest-first ordering for `?near=` queries.
+
+    List it after OrderingFilter. Applies when the client asks for
+    `?ordering=distance`, or by default when there is no explicit ordering
+    and no `?search=` relevance ranking to preserve.
+    """
+    ordering_value = 'distance'
+
+    def filter_queryset(self, request, queryset, view):
+        if 'distance_km' not in queryset.query.annotations:
+            return queryset
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM)
+        searching = request.query_params.get(api_settings.SEARCH_PARAM)
+        if ordering == self.ordering_value or not (ordering or searching):
+            queryset = queryset.order_by('distance_km', 'id')
+        return queryset
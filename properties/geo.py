@@ -0,0 +1,148 @@
+"""
+Radius and bounding-box search over Property.latitude / longitude without PostGIS.
+
+Every geolocated Property stores a geohash of its coordinates in an indexed
+column. A query box is covered by a handful of geohash cells, and each cell
+becomes a B-tree range scan (`geohash >= 'u0' AND geohash < 'u1'`),
+which narrows the candidates on both PostgreSQL and SQLite. The survivors
+are then checked against the exact box and an exact haversine distance,
+computed by the database over the whole candidate set in one expression,
+which is also what distance ordering sorts on.
+"""
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 32
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, value, bits, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (bounds[0] + bounds[1]) / 2
+        if coordinate >= mid:
+            value = value * 2 + 1
+            bounds[0] = mid
+        else:
+            value *= 2
+            bounds[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            value, bits = 0, 0
+    return ''.join(chars)
+
+
+def next_cell(cell):
+    """
+    The smallest geohash prefix sorting after every hash inside `cell`
+    ('u0' -> 'u1', 'uz' -> 'v'), or None past the last cell. Only digits and
+    lowercase letters are compared, so this holds under any DB collation.
+    """
+    while cell and cell[-1] == _BASE32[-1]:
+        cell = cell[:-1]
+    if not cell:
+        return None
+    return cell[:-1] + _BASE32[_BASE32.index(cell[-1]) + 1]
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at `precision`."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def cover(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """
+    The finest set of at most `max_cells` geohash cells covering the box.
+    Longitudes must not cross the antimeridian (see `split_box`).
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        first_row, first_col = math.floor((min_lat + 90) / height), math.floor((min_lng + 180) / width)
+        rows = math.floor((max_lat + 90) / height) - first_row + 1
+        cols = math.floor((max_lng + 180) / width) - first_col + 1
+        if rows * cols <= max_cells:
+            break
+    return sorted({
+        encode(
+            min(90.0, (first_row + r + 0.5) * height - 90),
+            min(180.0, (first_col + c + 0.5) * width - 180),
+            precision,
+        )
+        for r in range(rows)
+        for c in range(cols)
+    })
+
+
+def split_box(min_lat, min_lng, max_lat, max_lng):
+    """Clamp a box to valid latitudes and split it where it crosses the antimeridian."""
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    if max_lng - min_lng >= 360:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    if min_lng < -180:
+        min_lng += 360
+    if max_lng > 180:
+        max_lng -= 360
+    if min_lng > max_lng:
+        return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, max_lng)]
+
+
+def radius_box(latitude, longitude, radius_km):
+    """Bounding box (possibly crossing the antimeridian) of a circle."""
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    if latitude + dlat >= 90 or latitude - dlat <= -90:
+        # The circle contains a pole, so it spans every longitude.
+        return latitude - dlat, -180.0, latitude + dlat, 180.0
+    dlng = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(latitude)))))
+    return latitude - dlat, longitude - dlng, latitude + dlat, longitude + dlng
+
+
+def box_q(min_lat, min_lng, max_lat, max_lng):
+    """Cell-range prefilter plus the exact coordinate box, antimeridian-safe."""
+    condition = Q()
+    for box in split_box(min_lat, min_lng, max_lat, max_lng):
+        cells = Q()
+        for cell in cover(*box):
+            upper = next_cell(cell)
+            cells |= Q(geohash__gte=cell, geohash__lt=upper) if upper else Q(geohash__gte=cell)
+        condition |= cells & Q(
+            latitude__gte=box[0], latitude__lte=box[2],
+            longitude__gte=box[1], longitude__lte=box[3],
+        )
+    return condition
+
+
+def haversine_km(latitude, longitude):
+    """Great-circle distance in km from the given point to each row, as an ORM expression."""
+    lat1 = math.radians(latitude)
+    dlat = (Radians(F('latitude')) - Value(lat1)) / 2
+    dlng = (Radians(F('longitude')) - Value(math.radians(longitude))) / 2
+    a = Power(Sin(dlat), 2) + Value(math.cos(lat1)) * Cos(Radians(F('latitude'))) * Power(Sin(dlng), 2)
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)), output_field=FloatField())
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Rows within `radius_km` of the point, annotated with `distance_km`."""
+    return (
+        queryset.filter(box_q(*radius_box(latitude, longitude, radius_km)))
+        .annotate(distance_km=haversine_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+    )
+
+
+def within_box(queryset, min_lat, min_lng, max_lat, max_lng):
+    return queryset.filter(box_q(min_lat, min_lng, max_lat, max_lng))
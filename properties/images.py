@@ -0,0 +1,114 @@
+"""
+Responsive variants for PropertyImage uploads.
+
+Each upload is rendered into every VARIANT_SIZES width in both WebP and
+JPEG and the resulting storage paths are recorded on
+`PropertyImage.variants`:
+
+    {
+        'source': 'properties/house.jpg',
+        'thumb': {'width': 320, 'height': 213, 'webp': '...', 'jpeg': '...'},
+        'card':  {...},
+        'full':  {...},
+    }
+
+Rendering happens after the upload's transaction commits, on a small
+background thread pool, so requests never wait on Pillow. Existing images
+are backfilled with `manage.py generate_image_variants`.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> max width in px (aspect ratio kept, never upscaled)
+VARIANT_SIZES = {
+    'thumb': 320,
+    'card': 640,
+    'full': 1600,
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANTS_DIR = 'properties/variants'
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+def render_variants(source_name, storage=default_storage):
+    """Render and store every variant of `source_name`; returns the variants map."""
+    with storage.open(source_name, 'rb') as source:
+        original = ImageOps.exif_transpose(Image.open(source))
+        original = original.convert('RGB')
+
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    variants = {'source': source_name}
+    for size_name, max_width in VARIANT_SIZES.items():
+        image = original.copy()
+        image.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+        entry = {'width': image.width, 'height': image.height}
+        for extension, (pil_format, options) in FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **options)
+            path = f'{VARIANTS_DIR}/{stem}_{size_name}.{extension}'
+            if storage.exists(path):
+                storage.delete(path)
+            entry[extension] = storage.save(path, ContentFile(buffer.getvalue()))
+        variants[size_name] = entry
+    return variants
+
+
+def delete_variants(variants, storage=default_storage):
+    for size_name in VARIANT_SIZES:
+        for extension in FORMATS:
+            path = variants.get(size_name, {}).get(extension)
+            if path and storage.exists(path):
+                storage.delete(path)
+
+
+def needs_variants(image):
+    return bool(image.image) and image.variants.get('source') != image.image.name
+
+
+def generate_variants(image_id):
+    """Render variants for one PropertyImage and record them (safe to re-run)."""
+    from .cache import bump_generation
+    from .models import PropertyImage
+    from .signals import touch_property
+
+    image = PropertyImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image:
+        return
+    stale = image.variants
+    variants = render_variants(image.image.name)
+    PropertyImage.objects.filter(pk=image_id).update(variants=variants)
+    touch_property(image.property_id)
+    if stale and stale.get('source') != image.image.name:
+        delete_variants(stale)
+    bump_generation()
+
+
+def schedule_variants(image):
+    """Queue variant generation for `image` once the current transaction commits."""
+    if getattr(settings, 'PROPERTY_IMAGE_VARIANTS_SYNC', False):
+        transaction.on_commit(lambda: generate_variants(image.pk))
+    else:
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, image.pk))
+
+
+def _run_in_background(image_id):
+    try:
+        generate_variants(image_id)
+    except Exception:
+        logger.exception('Failed to generate variants for PropertyImage %s', image_id)
+    finally:
+        connections.close_all()  # only this worker thread's connections
@@ -0,0 +1,175 @@
+"""
+Streaming bulk import of Property listings (plus their amenities).
+
+Input is read row by row from CSV or NDJSON, validated with the same
+rules as PropertyWriteSerializer, and inserted with bulk_create in
+batches, each batch in its own transaction. A bad row is reported and
+skipped; it never aborts the rest of the file. Only one batch is held in
+memory at a time, so memory stays flat however large the input is.
+
+CSV columns match PropertyWriteSerializer fields; `amenities` is a
+"|"-separated list of names. NDJSON rows may give `amenities` as a list
+of names or of {"name", "icon"} objects, or as a "|"-separated string.
+
+Input must be UTF-8. Undecodable bytes stop the import: batches already
+committed stay, and the summary's `aborted` says where it stopped.
+"""
+import csv
+import io
+import json
+
+from django.db import DatabaseError, transaction
+
+from notifications import broadcast
+
+from . import alerts, stats
+from .cache import bump_generation
+from .models import Property, Amenity
+from .serializers import AmenitySerializer, PropertyWriteSerializer
+
+FORMATS = ('csv', 'ndjson')
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename, default='ndjson'):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+def split_amenities(value):
+    return [name.strip() for name in value.split('|') if name.strip()]
+
+
+def iter_records(fileobj, fmt):
+    """Yield (row_number, record_or_None, parse_error_or_None) from a binary file."""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            row = {key: value for key, value in row.items() if key and value != ''}
+            if 'amenities' in row:
+                row['amenities'] = split_amenities(row['amenities'])
+            yield number, row, None
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+            continue
+        if not isinstance(record, dict):
+            yield number, None, {'non_field_errors': ['Each line must be a JSON object.']}
+            continue
+        yield number, record, None
+
+
+class PropertyImporter:
+    """
+    Validates and inserts records for `owner` in batches of `batch_size`.
+
+    `on_error(row_number, errors)` is called for every rejected row; the
+    first MAX_REPORTED_ERRORS are also kept on the summary.
+    """
+
+    def __init__(self, owner, batch_size=DEFAULT_BATCH_SIZE, on_error=None, on_batch=None):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.on_batch = on_batch
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.aborted = None
+
+    def run(self, records):
+        batch, number = [], 0
+        try:
+            for number, record, parse_error in records:
+                if parse_error:
+                    self._reject(number, parse_error)
+                    continue
+                row = self._validate(number, record)
+                if row is not None:
+                    batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+        except UnicodeDecodeError as exc:
+            self.aborted = f'Input is not valid UTF-8 after row {number} ({exc.reason}); import stopped.'
+        self._flush(batch)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'aborted': self.aborted,
+        }
+
+    def _validate(self, number, record):
+        amenities = record.pop('amenities', None) or []
+        if isinstance(amenities, str):
+            amenities = split_amenities(amenities)
+        elif not isinstance(amenities, list):
+            self._reject(number, {'amenities': ['Expected a list of names or a "|"-separated string.']})
+            return None
+        amenities = [{'name': item} if isinstance(item, str) else item for item in amenities]
+        serializer = PropertyWriteSerializer(data=record)
+        amenity_serializer = AmenitySerializer(data=amenities, many=True)
+        property_ok, amenities_ok = serializer.is_valid(), amenity_serializer.is_valid()
+        if not (property_ok and amenities_ok):
+            errors = dict(serializer.errors)
+            if not amenities_ok:
+                errors['amenities'] = amenity_serializer.errors
+            self._reject(number, errors)
+            return None
+        listing = Property(owner=self.owner, **serializer.validated_data)
+        listing.geohash = listing.compute_geohash()  # bulk_create skips save()
+        return number, listing, amenity_serializer.validated_data
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            with transaction.atomic():
+                listings = Property.objects.bulk_create([listing for _, listing, _ in batch])
+                Amenity.objects.bulk_create([
+                    Amenity(property=listing, **amenity)
+                    for listing, (_, _, amenities) in zip(listings, batch)
+                    for amenity in amenities
+                ])
+                self.after_batch(listings)
+        except DatabaseError as exc:
+            for number, _, _ in batch:
+                self._reject(number, {'non_field_errors': [f'Database error: {exc}']})
+            return
+        self.created += len(batch)
+        if self.on_batch:
+            self.on_batch(self.created, self.failed)
+
+    def after_batch(self, listings):
+        """Runs inside each batch's transaction; bulk_create fires no post_save signals."""
+        bump_generation()
+        stats.schedule_refresh(stats.market_key(listing) for listing in listings)
+        alerts.schedule_matches(listings)
+        for listing in listings:
+            if listing.listing_type == 'new_launch':
+                broadcast.announce_new_launch(listing)
+
+    def _reject(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': errors})
+        if self.on_error:
+            self.on_error(number, errors)
@@ -0,0 +1,80 @@
+"""
+Benchmark the "similar listings" index (properties/similar.py).
+
+Usage:
+    venv\Scripts\python manage.py benchmark_similar
+    venv\Scripts\python manage.py benchmark_similar --listings 250000 --queries 1000
+
+Builds the index from synthetic in-memory listings (the database is not
+touched), then reports build time, memory held by the matrix, latency of
+incremental upserts, and p50/p95/p99 top-k query latency.
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from properties.similar import LISTING_TYPES, TYPES, SimilarityIndex
+
+LOCATIONS = [f'Locality {i}' for i in range(400)]
+
+
+def synthetic_rows(count, rng, start_id=1):
+    now = datetime.now(timezone.utc)
+    for i in range(start_id, start_id + count):
+        bedrooms = rng.randint(0, 6)
+        area = rng.randint(300, 800) * max(bedrooms, 1)
+        yield (
+            i, Decimal(area * rng.randint(2000, 30000)), bedrooms, rng.randint(1, 4), area,
+            rng.choice(TYPES), rng.choice(LISTING_TYPES), rng.choice(LOCATIONS),
+            now + timedelta(microseconds=i),
+        )
+
+
+class Command(BaseCommand):
+    help = 'Measure build, update and top-k query latency of the similar-listings index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=100000, help='Synthetic listings to index.')
+        parser.add_argument('--queries', type=int, default=500, help='Top-k queries to time.')
+        parser.add_argument('--limit', type=int, default=10, help='k for each query.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(14)
+        count = options['listings']
+        rows = list(synthetic_rows(count, rng))
+
+        started = time.perf_counter()
+        index = SimilarityIndex(rows)
+        build = time.perf_counter() - started
+        matrix_mb = sum(
+            array.nbytes for array in (index.ids, index.features, index.listing_types, index.locations, index.alive)
+        ) / 2 ** 20
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ built index of {len(index)} listings in {build:.2f}s ({matrix_mb:.1f} MiB)'
+        ))
+
+        updates = list(synthetic_rows(1000, rng, start_id=count - 500))
+        started = time.perf_counter()
+        for row in updates:
+            index.upsert([row])
+        per_update = (time.perf_counter() - started) / len(updates) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ incremental upsert: {per_update:.3f} ms/listing (500 updates, 500 inserts)'
+        ))
+
+        timings = []
+        for _ in range(options['queries']):
+            pk = rng.randint(1, count)
+            started = time.perf_counter()
+            index.query(pk, options['limit'])
+            timings.append((time.perf_counter() - started) * 1000)
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✔ top-{options["limit"]} query over {len(index)} listings: '
+            f'p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms'
+        ))
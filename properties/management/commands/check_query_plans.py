@@ -0,0 +1,73 @@
+"""
+Query-plan regression check for PropertyFilter.
+
+Runs EXPLAIN on the SQL that /api/properties/ generates for each common
+filter/ordering combination and fails if any of them falls back to a
+sequential scan of properties_property. The same combinations are
+asserted by properties/tests.py in CI; this command runs them against
+the configured database, e.g. a production-sized copy.
+
+Usage:
+    venv\Scripts\python manage.py check_query_plans
+    venv\Scripts\python manage.py check_query_plans --seed 50000
+
+With --seed, synthetic listings are inserted (and ANALYZEd) inside a
+transaction that is rolled back afterwards, so plans reflect a realistic
+table size even on an empty development database. Exits non-zero on any
+sequential scan.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from properties import query_plans
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every PropertyFilter combination and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Insert this many synthetic listings (rolled back afterwards).',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full plan for every combination.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+
+        with transaction.atomic():
+            if options['seed']:
+                query_plans.seed(options['seed'])
+                self.stdout.write(self.style.SUCCESS(f'  ✔ seeded {options["seed"]} synthetic listings'))
+            rows = Property.objects.count()
+            if rows < 10000:
+                self.stdout.write(self.style.WARNING(
+                    f'  ! only {rows} listings — plans may not be representative (use --seed)'
+                ))
+
+            failures = 0
+            for params, ordering in query_plans.FILTER_COMBINATIONS:
+                plan = query_plans.explain(params, ordering)
+                seq_scan = query_plans.has_seq_scan(plan)
+                failures += seq_scan
+                label = ' '.join(f'{k}={v}' for k, v in params.items()) or '(no filters)'
+                label = f'{label} ordering={ordering}'
+                if seq_scan:
+                    self.stdout.write(self.style.ERROR(f'  ✘ {label}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'  ✔ {label}'))
+                if seq_scan or options['verbose_plans']:
+                    self.stdout.write(f'      {plan}' if isinstance(plan, str) else json.dumps(plan, indent=2))
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{failures} filter combination(s) fell back to a sequential scan')
@@ -0,0 +1,93 @@
+"""
+Backfill responsive variants (thumb/card/full × WebP/JPEG) for PropertyImage.
+
+Usage:
+    venv\Scripts\python manage.py generate_image_variants
+    venv\Scripts\python manage.py generate_image_variants --force --workers 8
+
+Images are rendered in parallel in a process pool (Pillow work is CPU
+bound); workers only touch storage and hand the variants map back, and
+the parent process writes the results to the database in batches.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from properties.cache import bump_generation
+from properties.images import render_variants, needs_variants
+from properties.models import Property, PropertyImage
+
+
+def _init_worker():
+    # Needed under the "spawn" start method (Windows/macOS); a no-op after fork.
+    django.setup()
+
+
+def _render(image_id, source_name):
+    return image_id, render_variants(source_name)
+
+
+class Command(BaseCommand):
+    help = 'Generate missing thumbnail/card/full variants for property images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 2,
+            help='Number of worker processes (default: CPU count).',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Re-render variants even for images that already have them.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Rows written per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        images = PropertyImage.objects.exclude(image='').only('id', 'image', 'variants').order_by('pk')
+        pending = [
+            (image.pk, image.image.name)
+            for image in images.iterator(chunk_size=1000)
+            if options['force'] or needs_variants(image)
+        ]
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('  ✔ All property images already have variants'))
+            return
+
+        # Forked workers must not inherit the parent's open DB connection.
+        connections.close_all()
+
+        done, failed, batch = 0, 0, []
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            futures = {pool.submit(_render, pk, name): pk for pk, name in pending}
+            for future in as_completed(futures):
+                try:
+                    batch.append(future.result())
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(self.style.ERROR(f'  ✘ PropertyImage {futures[future]}: {exc}'))
+                    continue
+                if len(batch) >= options['batch_size']:
+                    done += self._save(batch)
+                    batch = []
+                    self.stdout.write(f'  … {done}/{len(pending)}')
+        done += self._save(batch)
+
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(f'  ✔ Generated variants for {done} image(s), {failed} failed'))
+
+    def _save(self, batch):
+        with transaction.atomic():
+            for image_id, variants in batch:
+                PropertyImage.objects.filter(pk=image_id).update(variants=variants)
+            # Keep detail ETags / export `since=` in step with the new variants.
+            Property.objects.filter(
+                images__in=[image_id for image_id, _ in batch]
+            ).update(updated_at=timezone.now())
+        return len(batch)
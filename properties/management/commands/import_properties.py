@@ -0,0 +1,59 @@
+"""
+Stream a CSV or NDJSON file of listings into the database.
+
+Usage:
+    venv\Scripts\python manage.py import_properties listings.csv --owner agent@hector25.com
+    venv\Scripts\python manage.py import_properties - --format ndjson --owner agent@hector25.com < feed.ndjson
+
+Rows are validated like POST /api/properties/ and inserted with
+bulk_create in batched transactions. Rejected rows are reported on
+stderr as NDJSON ({"row": n, "errors": {...}}) without aborting the import.
+"""
+
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.importer import DEFAULT_BATCH_SIZE, FORMATS, PropertyImporter, detect_format, iter_records
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Bulk import property listings from CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or "-" for stdin.')
+        parser.add_argument('--owner', required=True, help='Email of the user who will own the listings.')
+        parser.add_argument('--format', choices=FORMATS, help='Input format (default: from the file extension).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(email=options['owner'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}")
+
+        fmt = options['format'] or detect_format(options['path'])
+        importer = PropertyImporter(
+            owner,
+            batch_size=options['batch_size'],
+            on_error=lambda row, errors: self.stderr.write(json.dumps({'row': row, 'errors': errors})),
+            on_batch=lambda created, failed: self.stdout.write(f'  … {created} imported, {failed} rejected'),
+        )
+
+        if options['path'] == '-':
+            summary = importer.run(iter_records(sys.stdin.buffer, fmt))
+        else:
+            with open(options['path'], 'rb') as fileobj:
+                summary = importer.run(iter_records(fileobj, fmt))
+
+        if summary['aborted']:
+            raise CommandError(
+                f"{summary['aborted']} {summary['created']} properties imported, {summary['failed']} rows rejected."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"  ✔ {summary['created']} properties imported, {summary['failed']} rows rejected"
+        ))
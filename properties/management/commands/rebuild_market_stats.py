@@ -0,0 +1,28 @@
+"""
+Rebuild the MarketStat rollup (median/quartile price, price per sqft and
+listing counts per location × type × listing_type) from scratch.
+
+Usage:
+    venv\Scripts\python manage.py rebuild_market_stats
+
+Migration 0010 fills the rollup once for listings that predate it, and
+property saves, deletes and imports keep it current from then on; run
+this after bulk changes that bypass them (raw SQL, queryset.update()) or
+to repair drift.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.stats import rebuild_market_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the MarketStat rollup table from all listings'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        groups = rebuild_market_stats()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'  ✔ Rebuilt {groups} market stat group(s) in {elapsed:.1f}s'))
@@ -12,6 +12,7 @@ Creates:
   - 3 notifications
 """
 
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from properties.models import Property, Amenity, Favorite
@@ -217,6 +218,9 @@ class Command(BaseCommand):
             defaults={'content': "Thane is definitely hot right now. The Ghodbunder Road corridor is seeing massive development."}
         )
 
+        # Likes/comments above bypass the views, so sync the denormalized counters
+        call_command('repair_post_counters', stdout=self.stdout)
+
         self.stdout.write(self.style.SUCCESS(f'  ✔ {len(posts_data)} community posts created with likes & comments'))
 
         # ── Notifications ──────────────────────────────────────────────────────
@@ -0,0 +1,24 @@
+# Full-text search index for Property — see properties/search.py
+
+from django.db import migrations
+
+from properties.search import install_search_schema, uninstall_search_schema
+
+
+def install(apps, schema_editor):
+    install_search_schema(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_schema(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+# PostgreSQL only: `location__icontains` compiles to UPPER(location::text) LIKE UPPER(%s),
+# which a trigram GIN index over the same expression can serve.
+def add_location_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS property_location_trgm_idx ON properties_property '
+        'USING gin ((UPPER(location::text)) gin_trgm_ops)'
+    )
+
+
+def drop_location_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS property_location_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_property_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at', 'id'], name='property_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['listing_type', 'type', 'price'], name='property_listing_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['is_featured', 'listing_type', 'created_at'], name='property_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['type', 'price'], name='property_type_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['price'], name='property_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['bedrooms', 'price'], name='property_beds_price_idx'),
+        ),
+        migrations.RunPython(add_location_trigram_index, drop_location_trigram_index),
+    ]
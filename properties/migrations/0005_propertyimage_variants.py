@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_property_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnail/card/full renditions — see properties/images.py'),
+        ),
+    ]
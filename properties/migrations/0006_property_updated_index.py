@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_propertyimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['updated_at', 'id'], name='property_updated_idx'),
+        ),
+    ]
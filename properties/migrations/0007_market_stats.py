@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_property_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(max_length=200)),
+                ('type', models.CharField(choices=[('House', 'House'), ('Apartment', 'Apartment'), ('Villa', 'Villa'), ('Office', 'Office')], max_length=20)),
+                ('listing_type', models.CharField(choices=[('buy', 'Buy'), ('rent', 'Rent'), ('new_launch', 'New Launch')], max_length=20)),
+                ('listing_count', models.PositiveIntegerField(default=0)),
+                ('median_price', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('p25_price', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('p75_price', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('median_price_per_sqft', models.DecimalField(blank=True, decimal_places=2, help_text='Over listings with a known area only', max_digits=14, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['location', 'type', 'listing_type'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='marketstat',
+            constraint=models.UniqueConstraint(fields=('location', 'type', 'listing_type'), name='market_stat_group_unique'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('properties', '0008_favorite_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('params', models.JSONField(default=dict)),
+                ('criteria_key', models.CharField(editable=False, help_text='"listing_type:type", * = any', max_length=50)),
+                ('price_min', models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14)),
+                ('price_max', models.DecimalField(decimal_places=2, editable=False, max_digits=14, null=True)),
+                ('bedrooms_min', models.PositiveIntegerField(default=0, editable=False)),
+                ('bedrooms_max', models.PositiveIntegerField(editable=False, null=True)),
+                ('location_token_count', models.PositiveSmallIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_tokens', to='properties.savedsearch')),
+            ],
+            options={
+                'unique_together': {('saved_search', 'token')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['criteria_key', 'price_min'], name='saved_search_criteria_idx'),
+        ),
+    ]
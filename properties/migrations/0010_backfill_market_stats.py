@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def backfill_market_stats(apps, schema_editor):
+    # Saves only refresh the groups they touch, so existing listings need one full pass.
+    from properties.stats import GROUP_FIELDS, compute_market_stats
+
+    Property = apps.get_model('properties', 'Property')
+    MarketStat = apps.get_model('properties', 'MarketStat')
+    rows = Property.objects.order_by().values_list(*GROUP_FIELDS, 'price', 'area_sqft').iterator(chunk_size=5000)
+    MarketStat.objects.all().delete()
+    MarketStat.objects.bulk_create(compute_market_stats(rows, model=MarketStat), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0009_saved_searches'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_market_stats, migrations.RunPython.noop),
+    ]
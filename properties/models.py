@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
 
+from . import geo
+from .search import tokenize
+
 
 class Property(models.Model):
     """A property listing (house, apartment, villa, office)."""
@@ -24,6 +27,12 @@ class Property(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     location = models.CharField(max_length=200)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(
+        max_length=12, blank=True, default='', editable=False, db_index=True,
+        help_text='Derived from latitude/longitude on save; drives radius/bbox search',
+    )
     price = models.DecimalField(max_digits=14, decimal_places=2)
     type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     listing_type = models.CharField(max_length=20, choices=LISTING_TYPE_CHOICES, default='buy')
@@ -36,16 +45,43 @@ class Property(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Shaped after PropertyFilter / FeaturedPropertiesView / keyset ordering.
+        # Asserted by QueryPlanTests in properties/tests.py (`manage.py check_query_plans` for a real database).
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='property_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='property_updated_idx'),
+            models.Index(fields=['listing_type', 'type', 'price'], name='property_listing_price_idx'),
+            models.Index(fields=['is_featured', 'listing_type', 'created_at'], name='property_featured_idx'),
+            models.Index(fields=['type', 'price'], name='property_type_price_idx'),
+            models.Index(fields=['price'], name='property_price_idx'),
+            models.Index(fields=['bedrooms', 'price'], name='property_beds_price_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.location}"
 
+    def save(self, *args, **kwargs):
+        self.geohash = self.compute_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            return ''
+        return geo.encode(self.latitude, self.longitude)
+
 
 class PropertyImage(models.Model):
     """Images associated with a property."""
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='properties/')
     order = models.PositiveIntegerField(default=0)
+    variants = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text='Generated thumbnail/card/full renditions — see properties/images.py',
+    )
 
     class Meta:
         ordering = ['order']
@@ -73,7 +109,98 @@ class Favorite(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        ordering = ['-created_at']
         unique_together = ('user', 'property')
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='favorite_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} ♡ {self.property.title}"
+
+
+class MarketStat(models.Model):
+    """
+    Rollup of listings per location × type × listing_type for the market
+    insights screen. Maintained by properties/stats.py — never edit by hand.
+    """
+    location = models.CharField(max_length=200)
+    type = models.CharField(max_length=20, choices=Property.TYPE_CHOICES)
+    listing_type = models.CharField(max_length=20, choices=Property.LISTING_TYPE_CHOICES)
+    listing_count = models.PositiveIntegerField(default=0)
+    median_price = models.DecimalField(max_digits=14, decimal_places=2)
+    p25_price = models.DecimalField(max_digits=14, decimal_places=2)
+    p75_price = models.DecimalField(max_digits=14, decimal_places=2)
+    median_price_per_sqft = models.DecimalField(
+        max_digits=14, decimal_places=2, null=True, blank=True,
+        help_text='Over listings with a known area only',
+    )
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['location', 'type', 'listing_type']
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'type', 'listing_type'], name='market_stat_group_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.location} / {self.type} / {self.listing_type}"
+
+
+class SavedSearch(models.Model):
+    """
+    A buyer's saved PropertyFilter query; new matching listings trigger a
+    Notification (see properties/alerts.py).
+
+    `params` holds the query as submitted. The columns below it are derived
+    from `params` on save and form the inverted index new listings are
+    matched against; location words live in SavedSearchToken.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches'
+    )
+    name = models.CharField(max_length=100, blank=True)
+    params = models.JSONField(default=dict)
+    criteria_key = models.CharField(max_length=50, editable=False, help_text='"listing_type:type", * = any')
+    price_min = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+    price_max = models.DecimalField(max_digits=14, decimal_places=2, null=True, editable=False)
+    bedrooms_min = models.PositiveIntegerField(default=0, editable=False)
+    bedrooms_max = models.PositiveIntegerField(null=True, editable=False)
+    location_token_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['criteria_key', 'price_min'], name='saved_search_criteria_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email}: {self.name or self.params}"
+
+    def save(self, *args, **kwargs):
+        self.apply_criteria()
+        super().save(*args, **kwargs)
+
+    def apply_criteria(self):
+        """Derive the indexed columns from `params` (already validated by SavedSearchSerializer)."""
+        params = self.params
+        self.criteria_key = f"{params.get('listing_type') or '*'}:{params.get('type') or '*'}"
+        self.price_min = params.get('price_min') or 0
+        self.price_max = params.get('price_max')
+        bedrooms = params.get('bedrooms')
+        self.bedrooms_min = max(bedrooms or 0, params.get('bedrooms_min') or 0)
+        self.bedrooms_max = bedrooms
+        self.location_token_count = len(self.location_terms())
+
+    def location_terms(self):
+        return sorted(set(tokenize(self.params.get('location'))))
+
+
+class SavedSearchToken(models.Model):
+    """One word of a SavedSearch's `location` — the location posting list."""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='location_tokens')
+    token = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ('saved_search', 'token')
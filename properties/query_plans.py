@@ -0,0 +1,117 @@
+"""
+EXPLAIN helpers for the PropertyFilter query-plan regression checks.
+
+`explain()` returns the plan of the page query /api/properties/ issues
+for a filter/ordering combination — a JSON tree on PostgreSQL, the
+EXPLAIN QUERY PLAN text on SQLite — and `has_seq_scan()` /
+`indexes_used()` inspect it. Shared by properties/tests.py, which runs
+every FILTER_COMBINATIONS entry in CI, and the `check_query_plans`
+command for checking a real database.
+"""
+import json
+import random
+import re
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.settings import api_settings
+
+from .filters import PropertyFilter
+from .models import Property
+
+TABLE = Property._meta.db_table
+
+# (PropertyFilter params, ordering) pairs mirroring real client traffic.
+FILTER_COMBINATIONS = [
+    ({}, '-created_at'),
+    ({'type': 'apartment'}, '-created_at'),
+    ({'listing_type': 'rent'}, '-created_at'),
+    ({'listing_type': 'buy', 'type': 'villa'}, '-created_at'),
+    ({'listing_type': 'buy', 'type': 'house', 'price_min': 5000000, 'price_max': 9000000}, '-created_at'),
+    ({'listing_type': 'rent', 'price_max': 50000}, 'price'),
+    ({'price_min': 1000000, 'price_max': 2000000}, '-created_at'),
+    ({'type': 'office', 'price_max': 3000000}, 'price'),
+    ({'bedrooms': 3}, '-created_at'),
+    ({'bedrooms_min': 4, 'price_max': 10000000}, '-created_at'),
+    ({'featured': 'true'}, '-created_at'),
+    ({'featured': 'true', 'listing_type': 'new_launch'}, '-created_at'),
+    ({'location': 'mumbai'}, '-created_at'),
+    ({'near': '19.0760,72.8777', 'radius_km': 5}, '-created_at'),
+    ({'bbox': '18.9,72.7,19.3,73.1', 'listing_type': 'rent'}, '-created_at'),
+    ({}, '-price'),
+    ({}, 'bedrooms'),
+]
+
+LOCATIONS = [
+    ('Bandra West, Mumbai', 19.0596, 72.8295),
+    ('Powai, Mumbai', 19.1176, 72.9060),
+    ('Thane West', 19.2183, 72.9781),
+    ('Koregaon Park, Pune', 18.5362, 73.8940),
+    ('Whitefield, Bangalore', 12.9698, 77.7500),
+]
+
+_SQLITE_FULL_SCAN = re.compile(rf'\bSCAN (TABLE )?{TABLE}\b(?! USING)')
+_SQLITE_INDEX = re.compile(r'\bUSING (?:COVERING )?INDEX (\w+)')
+
+
+def explain(params, ordering):
+    queryset = PropertyFilter(data=params, queryset=Property.objects.all()).qs
+    queryset = queryset.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+    queryset = queryset[:api_settings.PAGE_SIZE]
+    if connection.vendor == 'postgresql':
+        return json.loads(queryset.explain(format='json'))[0]['Plan']
+    return queryset.explain()
+
+
+def has_seq_scan(plan):
+    if isinstance(plan, str):
+        return bool(_SQLITE_FULL_SCAN.search(plan))
+    if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name') == TABLE:
+        return True
+    return any(has_seq_scan(child) for child in plan.get('Plans', []))
+
+
+def indexes_used(plan):
+    """Names of the indexes `plan` reads."""
+    if isinstance(plan, str):
+        return set(_SQLITE_INDEX.findall(plan))
+    names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        names |= indexes_used(child)
+    return names
+
+
+def seed(count):
+    """Insert `count` synthetic listings and ANALYZE (callers roll back)."""
+    owner, _ = get_user_model().objects.get_or_create(
+        email='plan-check@hector25.invalid', defaults={'username': 'plan_check'},
+    )
+    types = [key for key, _ in Property.TYPE_CHOICES]
+    listing_types = [key for key, _ in Property.LISTING_TYPE_CHOICES]
+    rng = random.Random(25)
+    batch = []
+    for i in range(count):
+        location, latitude, longitude = rng.choice(LOCATIONS)
+        listing = Property(
+            owner=owner,
+            title=f'Synthetic listing {i}',
+            location=location,
+            latitude=latitude + rng.uniform(-0.05, 0.05),
+            longitude=longitude + rng.uniform(-0.05, 0.05),
+            price=Decimal(rng.randrange(10000, 50000000, 1000)),
+            type=rng.choice(types),
+            listing_type=rng.choice(listing_types),
+            bedrooms=rng.randint(0, 6),
+            bathrooms=rng.randint(1, 4),
+            area_sqft=rng.randint(300, 6000),
+            is_featured=rng.random() < 0.02,
+        )
+        listing.geohash = listing.compute_geohash()  # bulk_create skips save()
+        batch.append(listing)
+        if len(batch) == 5000:
+            Property.objects.bulk_create(batch)
+            batch = []
+    Property.objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {TABLE}')
@@ -0,0 +1,170 @@
+"""
+Full-text search over Property title, location and description.
+
+PostgreSQL
+    A STORED generated ``search_vector`` tsvector column (title weighted A,
+    location B, description C) with a GIN index. Queries use ``to_tsquery``
+    prefix terms and are ranked with ``ts_rank``.
+
+SQLite
+    An external-content FTS5 shadow table (``properties_property_fts``) kept
+    in sync by AFTER INSERT/UPDATE/DELETE triggers. Queries use FTS5 prefix
+    terms and are ranked with ``bm25``.
+
+Other backends fall back to the icontains OR-chain DRF's SearchFilter used.
+
+Both indexes are maintained by the database itself, so they stay in sync on
+Property save and delete as well as on bulk_create() and queryset.update().
+The schema objects live outside the Django model on purpose: the ORM never
+reads or writes them, it only filters and ranks through them.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'properties_property'
+FTS_TABLE = 'properties_property_fts'
+SEARCH_CONFIG = 'english'
+MAX_TERMS = 8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_search_gin ON {TABLE} USING gin (search_vector)",
+]
+POSTGRES_UNINSTALL = [
+    f"DROP INDEX IF EXISTS {TABLE}_search_gin",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"title, location, description, content='{TABLE}', content_rowid='id', "
+    f"tokenize='porter unicode61')"
+)
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+            VALUES (new.id, new.title, new.location, new.description);
+        END
+    """,
+    f'{FTS_TABLE}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+            VALUES ('delete', old.id, old.title, old.location, old.description);
+        END
+    """,
+    f'{FTS_TABLE}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, location, description)
+            VALUES ('delete', old.id, old.title, old.location, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, location, description)
+            VALUES (new.id, new.title, new.location, new.description);
+        END
+    """,
+}
+SQLITE_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_search_schema(connection):
+    """Create the search index for `connection`'s vendor (idempotent)."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRES_INSTALL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            cursor.execute(SQLITE_TABLE)
+            for sql in SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            cursor.execute(SQLITE_REBUILD)
+
+
+def uninstall_search_schema(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for sql in POSTGRES_UNINSTALL:
+                cursor.execute(sql)
+        elif connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def repair_search_schema(connection):
+    """
+    Re-create the SQLite sync triggers if a table rebuild dropped them.
+
+    Django's SQLite schema editor implements many ALTERs by copying the
+    table, which silently drops its triggers. This runs after every migrate
+    and re-syncs the FTS table whenever that happened.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = %s) "
+            "OR (type = 'trigger' AND tbl_name = %s)",
+            [FTS_TABLE, TABLE],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing or set(SQLITE_TRIGGERS) <= existing:
+            return
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(SQLITE_REBUILD)
+
+
+def tokenize(query):
+    """Split free text into at most MAX_TERMS lowercase word tokens."""
+    return _TOKEN_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+def search_properties(queryset, terms):
+    """
+    Restrict a Property queryset to rows matching every term (as a prefix)
+    and annotate each row with a `search_rank` (higher is more relevant).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        params = (SEARCH_CONFIG, tsquery)
+        match = RawSQL(
+            f'{TABLE}.search_vector @@ to_tsquery(%s::regconfig, %s)', params,
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f'ts_rank({TABLE}.search_vector, to_tsquery(%s::regconfig, %s))', params,
+            output_field=FloatField(),
+        )
+        return queryset.filter(match).annotate(search_rank=rank)
+
+    if vendor == 'sqlite':
+        fts_query = ' '.join(f'"{term}"*' for term in terms)
+        matching_ids = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (fts_query,),
+        )
+        # bm25() is lower-is-better; weights mirror the A/B/C Postgres weights.
+        rank = RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}, 10.0, 4.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TABLE}.id)', (fts_query,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matching_ids).annotate(search_rank=rank)
+
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term) | Q(location__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
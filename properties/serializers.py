@@ -1,5 +1,99 @@
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models import F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from rest_framework import serializers
-from .models import Property, PropertyImage, Amenity, Favorite
+from .alerts import ALERT_PARAMS, MAX_SAVED_SEARCHES
+from .filters import PropertyFilter, canonical_choice
+from .images import FORMATS, VARIANT_SIZES
+from .models import Property, PropertyImage, Amenity, Favorite, MarketStat, SavedSearch
+
+
+def get_favorited_ids(context, property_ids):
+    """
+    Return the subset of `property_ids` favorited by the requesting user.
+
+    Lookups are memoised in the serializer context, so a whole page is
+    resolved with a single Favorite query no matter how many serializers
+    (list, detail or nested) ask for it.
+    """
+    request = context.get('request')
+    if not (request and request.user.is_authenticated):
+        return set()
+    resolved = context.setdefault('_favorites_resolved', set())
+    favorited = context.setdefault('_favorited_ids', set())
+    missing = set(property_ids) - resolved
+    if missing:
+        favorited.update(
+            Favorite.objects.filter(user=request.user, property_id__in=missing)
+            .values_list('property_id', flat=True)
+        )
+        resolved.update(missing)
+    return favorited
+
+
+def mark_favorited(context, property_ids):
+    """Record `property_ids` as favorited by the viewer without querying (e.g. their own favorites list)."""
+    context.setdefault('_favorites_resolved', set()).update(property_ids)
+    context.setdefault('_favorited_ids', set()).update(property_ids)
+
+
+def prefetch_primary_image(lookup='images'):
+    """
+    Prefetch only each property's first image (by `order`, then id), which is
+    all PropertyListSerializer reads, instead of every image.
+    """
+    ranked = PropertyImage.objects.annotate(
+        image_rank=Window(RowNumber(), partition_by=[F('property_id')], order_by=[F('order'), F('id')]),
+    ).filter(image_rank=1)
+    return Prefetch(lookup, queryset=ranked)
+
+
+def get_variant_urls(image, request):
+    """`{size: {width, height, webp, jpeg}}` with absolute URLs, for srcset/<picture>."""
+    if image is None or not request:
+        return {}
+    urls = {}
+    for size_name in VARIANT_SIZES:
+        entry = image.variants.get(size_name)
+        if entry:
+            urls[size_name] = {
+                'width': entry['width'],
+                'height': entry['height'],
+                **{
+                    extension: request.build_absolute_uri(default_storage.url(entry[extension]))
+                    for extension in FORMATS
+                },
+            }
+    return urls
+
+
+class FavoritedListSerializer(serializers.ListSerializer):
+    """Primes the favorites lookup for every row of the page before serializing."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        get_favorited_ids(self.context, [self.child.get_favorite_property_id(item) for item in items])
+        return super().to_representation(items)
+
+
+class OwnFavoritesListSerializer(serializers.ListSerializer):
+    """The viewer's own Favorite rows: every property on the page is favorited by definition."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        mark_favorited(self.context, [item.property_id for item in items])
+        return super().to_representation(items)
+
+
+class IsFavoritedMixin:
+    """Shared `is_favorited` resolution for property serializers."""
+
+    def get_favorite_property_id(self, obj):
+        return obj.pk
+
+    def get_is_favorited(self, obj):
+        return obj.pk in get_favorited_ids(self.context, [obj.pk])
 
 
 class AmenitySerializer(serializers.ModelSerializer):
@@ -10,10 +104,11 @@ class AmenitySerializer(serializers.ModelSerializer):
 
 class PropertyImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PropertyImage
-        fields = ('id', 'image_url', 'order')
+        fields = ('id', 'image_url', 'variants', 'order')
 
     def get_image_url(self, obj):
         request = self.context.get('request')
@@ -21,19 +116,25 @@ class PropertyImageSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.image.url)
         return None
 
+    def get_variants(self, obj):
+        return get_variant_urls(obj, self.context.get('request'))
+
 
-class PropertyListSerializer(serializers.ModelSerializer):
+class PropertyListSerializer(IsFavoritedMixin, serializers.ModelSerializer):
     """Compact serializer for list views."""
     primary_image = serializers.SerializerMethodField()
+    primary_image_variants = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Property
         fields = (
-            'id', 'title', 'location', 'price', 'type', 'listing_type',
+            'id', 'title', 'location', 'latitude', 'longitude', 'price', 'type', 'listing_type',
             'bedrooms', 'bathrooms', 'area_sqft', 'is_featured',
-            'primary_image', 'is_favorited', 'created_at',
+            'primary_image', 'primary_image_variants', 'is_favorited', 'distance_km', 'created_at',
         )
+        list_serializer_class = FavoritedListSerializer
 
     def get_primary_image(self, obj):
         request = self.context.get('request')
@@ -42,14 +143,16 @@ class PropertyListSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(img.image.url)
         return None
 
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
+    def get_primary_image_variants(self, obj):
+        return get_variant_urls(obj.images.first(), self.context.get('request'))
+
+    def get_distance_km(self, obj):
+        """Only present on `?near=` queries."""
+        distance = getattr(obj, 'distance_km', None)
+        return round(distance, 3) if distance is not None else None
 
 
-class PropertyDetailSerializer(serializers.ModelSerializer):
+class PropertyDetailSerializer(IsFavoritedMixin, serializers.ModelSerializer):
     """Full serializer for detail view."""
     images = PropertyImageSerializer(many=True, read_only=True)
     amenities = AmenitySerializer(many=True, read_only=True)
@@ -59,7 +162,7 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Property
         fields = (
-            'id', 'title', 'description', 'location', 'price', 'type',
+            'id', 'title', 'description', 'location', 'latitude', 'longitude', 'price', 'type',
             'listing_type', 'bedrooms', 'bathrooms', 'area_sqft', 'is_featured',
             'images', 'amenities', 'owner_name', 'is_favorited',
             'created_at', 'updated_at',
@@ -68,21 +171,19 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     def get_owner_name(self, obj):
         return obj.owner.name or obj.owner.email
 
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.favorited_by.filter(user=request.user).exists()
-        return False
-
 
 class PropertyWriteSerializer(serializers.ModelSerializer):
     """Used for creating/updating properties."""
     class Meta:
         model = Property
         fields = (
-            'title', 'description', 'location', 'price', 'type',
+            'title', 'description', 'location', 'latitude', 'longitude', 'price', 'type',
             'listing_type', 'bedrooms', 'bathrooms', 'area_sqft', 'is_featured',
         )
+        extra_kwargs = {
+            'latitude': {'min_value': -90, 'max_value': 90},
+            'longitude': {'min_value': -180, 'max_value': 180},
+        }
 
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
@@ -95,3 +196,58 @@ class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = ('id', 'property', 'created_at')
+        list_serializer_class = OwnFavoritesListSerializer
+
+
+class MarketStatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MarketStat
+        fields = (
+            'location', 'type', 'listing_type', 'listing_count',
+            'median_price', 'p25_price', 'p75_price', 'median_price_per_sqft',
+            'refreshed_at',
+        )
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """`params` uses the same names and values as the /api/properties/ query string."""
+
+    class Meta:
+        model = SavedSearch
+        fields = ('id', 'name', 'params', 'created_at')
+        read_only_fields = ('id', 'created_at')
+
+    def validate_params(self, params):
+        if not isinstance(params, dict):
+            raise serializers.ValidationError('Must be an object of property filters.')
+        unknown = set(params) - set(ALERT_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unsupported filter(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(ALERT_PARAMS)}."
+            )
+        params = {key: value for key, value in params.items() if value not in (None, '')}
+        if not params:
+            raise serializers.ValidationError('At least one filter is required.')
+
+        form = PropertyFilter(data=params, queryset=Property.objects.none()).form
+        if not form.is_valid():
+            raise serializers.ValidationError(form.errors)
+        cleaned = {}
+        for key in params:
+            value = form.cleaned_data[key]
+            if key in ('type', 'listing_type'):
+                value = canonical_choice(Property, key, value)
+                if value is None:
+                    raise serializers.ValidationError({key: 'Not a valid choice.'})
+            elif key in ('price_min', 'price_max'):
+                value = str(value)
+            elif key in ('bedrooms', 'bedrooms_min'):
+                value = int(value)
+            cleaned[key] = value
+        return cleaned
+
+    def validate(self, attrs):
+        request = self.context['request']
+        if self.instance is None and request.user.saved_searches.count() >= MAX_SAVED_SEARCHES:
+            raise serializers.ValidationError(f'You can keep at most {MAX_SAVED_SEARCHES} saved searches.')
+        return attrs
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from notifications import broadcast
+
+from . import alerts, images, similar, stats
+from .cache import bump_generation
+from .models import Property, PropertyImage, Amenity, SavedSearch
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def invalidate_property_cache(sender, **kwargs):
+    bump_generation()
+
+
+@receiver(post_save, sender=PropertyImage)
+def queue_image_variants(sender, instance, **kwargs):
+    if images.needs_variants(instance):
+        images.schedule_variants(instance)
+
+
+@receiver(post_delete, sender=PropertyImage)
+def delete_image_variants(sender, instance, **kwargs):
+    if instance.variants:
+        transaction.on_commit(lambda: images.delete_variants(instance.variants))
+
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+def touch_parent_property(sender, instance, **kwargs):
+    """Child rows have no version of their own; bump the listing's updated_at (ETag/export sync)."""
+    touch_property(instance.property_id)
+
+
+def touch_property(property_id):
+    Property.objects.filter(pk=property_id).update(updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Property)
+def remember_market_key(sender, instance, **kwargs):
+    if instance.pk:
+        previous = Property.objects.filter(pk=instance.pk).values_list(*stats.GROUP_FIELDS).first()
+        instance._previous_market_key = previous
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def refresh_market_stats(sender, instance, **kwargs):
+    """Recompute the listing's MarketStat group (and its old one, if it moved)."""
+    keys = {stats.market_key(instance)}
+    previous = getattr(instance, '_previous_market_key', None)
+    if previous:
+        keys.add(previous)
+    stats.schedule_refresh(keys)
+
+
+@receiver(post_save, sender=Property)
+def refresh_similarity_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: similar.refresh(instance))
+
+
+@receiver(post_delete, sender=Property)
+def discard_from_similarity_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: similar.discard([pk]))
+
+
+@receiver(post_save, sender=Property)
+def match_saved_searches(sender, instance, created, **kwargs):
+    if created:
+        alerts.schedule_matches([instance])
+
+
+@receiver(post_save, sender=Property)
+def broadcast_new_launch(sender, instance, created, **kwargs):
+    if created and instance.listing_type == 'new_launch':
+        broadcast.announce_new_launch(instance)
+
+
+@receiver(post_save, sender=SavedSearch)
+def index_saved_search(sender, instance, **kwargs):
+    alerts.sync_tokens(instance)
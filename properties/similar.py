@@ -0,0 +1,213 @@
+"""
+"Similar listings" over an in-memory NumPy feature matrix.
+
+Each listing becomes one row of standardized features — log price,
+bedrooms, bathrooms, log area and a one-hot property type, pre-scaled by
+FEATURE_WEIGHTS — and a query is a single vectorized squared-distance pass
+over the whole matrix, plus a penalty for a different location. Only
+listings with the same listing_type are candidates (rent and sale prices
+aren't comparable). The top k come from argpartition, so a query costs
+O(n) with no Python loop over rows.
+
+The index lives per process and is built lazily on first use. It is kept
+current incrementally:
+
+* saves and deletes in this process update it directly (signals.py);
+* before each query, rows changed in other processes are pulled in with
+  one `updated_at >= watermark` query (served by property_updated_idx).
+  Only rows read by that pull advance the watermark: a local save may
+  commit with a later updated_at than another worker's concurrent one,
+  and must not make the next pull skip it;
+* deletions made elsewhere are dropped when the top-k ids are loaded and
+  turn out to be gone.
+
+Normalization statistics are fixed at build time, so the index is rebuilt
+from scratch every REBUILD_INTERVAL seconds to follow the market.
+"""
+import math
+import threading
+import time
+
+import numpy as np
+
+from .models import Property
+
+# Relative importance of each feature (applied as sqrt to the matrix columns).
+FEATURE_WEIGHTS = {
+    'price': 3.0,
+    'bedrooms': 1.0,
+    'bathrooms': 0.5,
+    'area_sqft': 1.0,
+    'type': 2.0,
+}
+LOCATION_PENALTY = 1.5
+REBUILD_INTERVAL = 60 * 60
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+TYPES = [key for key, _ in Property.TYPE_CHOICES]
+LISTING_TYPES = [key for key, _ in Property.LISTING_TYPE_CHOICES]
+ROW_FIELDS = ('id', 'price', 'bedrooms', 'bathrooms', 'area_sqft', 'type', 'listing_type', 'location', 'updated_at')
+_NUMERIC = ('price', 'bedrooms', 'bathrooms', 'area_sqft')
+_DIMENSIONS = len(_NUMERIC) + len(TYPES)
+
+
+def _raw_numeric(rows):
+    """(n, 4) array of the numeric features before standardization."""
+    raw = np.array([(float(r[1]), r[2], r[3], r[4]) for r in rows], dtype=np.float64).reshape(-1, len(_NUMERIC))
+    raw[:, 0] = np.log1p(raw[:, 0])
+    raw[:, 3] = np.log1p(raw[:, 3])
+    return raw
+
+
+class SimilarityIndex:
+    """Growable feature matrix with id lookup; safe to share between threads."""
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        raw = _raw_numeric(rows)
+        self.mean = raw.mean(axis=0) if len(rows) else np.zeros(len(_NUMERIC))
+        std = raw.std(axis=0) if len(rows) else np.ones(len(_NUMERIC))
+        self.std = np.where(std > 1e-9, std, 1.0)
+        self.scale = np.sqrt(np.array(
+            [FEATURE_WEIGHTS[name] for name in _NUMERIC] + [FEATURE_WEIGHTS['type']] * len(TYPES)
+        ))
+
+        capacity = max(len(rows), 1024)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.features = np.zeros((capacity, _DIMENSIONS), dtype=np.float32)
+        self.listing_types = np.full(capacity, -1, dtype=np.int8)
+        self.locations = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.positions = {}
+        self.location_codes = {}
+        self.watermark = None
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+        self._write(rows, raw, advance_watermark=True)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def upsert(self, rows, advance_watermark=False):
+        """Write `rows`; `advance_watermark` only for rows pulled from the database."""
+        rows = list(rows)
+        if rows:
+            with self.lock:
+                self._write(rows, _raw_numeric(rows), advance_watermark)
+
+    def remove(self, ids):
+        with self.lock:
+            for pk in ids:
+                row = self.positions.pop(pk, None)
+                if row is not None:
+                    self.alive[row] = False
+
+    def query(self, pk, k=DEFAULT_LIMIT):
+        """Ids of the `k` nearest listings to `pk`, nearest first (None if `pk` isn't indexed)."""
+        with self.lock:
+            row = self.positions.get(pk)
+            if row is None:
+                return None
+            n = self.size
+            diff = self.features[:n] - self.features[row]
+            distance = np.einsum('ij,ij->i', diff, diff)
+            distance += LOCATION_PENALTY * (self.locations[:n] != self.locations[row])
+            candidate = self.alive[:n] & (self.listing_types[:n] == self.listing_types[row])
+            candidate[row] = False
+            distance[~candidate] = np.inf
+            ids = self.ids[:n]
+
+        k = min(k, int(candidate.sum()))
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distance, k - 1)[:k]
+        nearest = nearest[np.argsort(distance[nearest], kind='stable')]
+        return ids[nearest].tolist()
+
+    def _write(self, rows, raw, advance_watermark):
+        features = np.zeros((len(rows), _DIMENSIONS), dtype=np.float64)
+        features[:, :len(_NUMERIC)] = (raw - self.mean) / self.std
+        for i, r in enumerate(rows):
+            if r[5] in TYPES:
+                features[i, len(_NUMERIC) + TYPES.index(r[5])] = 1.0
+        features *= self.scale
+
+        for i, r in enumerate(rows):
+            row = self.positions.get(r[0])
+            if row is None:
+                row = self._append_slot()
+                self.positions[r[0]] = row
+            location = r[7].strip().casefold()
+            self.ids[row] = r[0]
+            self.features[row] = features[i]
+            self.listing_types[row] = LISTING_TYPES.index(r[6]) if r[6] in LISTING_TYPES else -1
+            self.locations[row] = self.location_codes.setdefault(location, len(self.location_codes))
+            self.alive[row] = True
+            if advance_watermark and (self.watermark is None or r[8] > self.watermark):
+                self.watermark = r[8]
+
+    def _append_slot(self):
+        if self.size == len(self.ids):
+            capacity = max(1024, math.ceil(len(self.ids) * 1.5))
+            self.ids = np.resize(self.ids, capacity)
+            self.features = np.resize(self.features, (capacity, _DIMENSIONS))
+            self.listing_types = np.resize(self.listing_types, capacity)
+            self.locations = np.resize(self.locations, capacity)
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self.size] = self.alive[:self.size]
+            self.alive = alive
+        self.size += 1
+        return self.size - 1
+
+
+_index = None
+_build_lock = threading.Lock()
+
+
+def _rows(queryset):
+    return queryset.order_by().values_list(*ROW_FIELDS).iterator(chunk_size=5000)
+
+
+def get_index():
+    """The process-wide index, built or rebuilt as needed and synced with the DB."""
+    global _index
+    index = _index
+    if index is None or time.monotonic() - index.built_at > REBUILD_INTERVAL:
+        with _build_lock:
+            if _index is None or _index is index:
+                _index = SimilarityIndex(_rows(Property.objects.all()))
+            index = _index
+    elif index.watermark is not None:
+        index.upsert(_rows(Property.objects.filter(updated_at__gte=index.watermark)), advance_watermark=True)
+    else:
+        index.upsert(_rows(Property.objects.all()), advance_watermark=True)
+    return index
+
+
+def refresh(listing):
+    """Apply one saved listing to this process's index (no-op until it's built)."""
+    if _index is not None:
+        _index.upsert([tuple(getattr(listing, field) for field in ROW_FIELDS)])
+
+
+def discard(ids):
+    if _index is not None:
+        _index.remove(ids)
+
+
+def similar_properties(pk, queryset, limit=DEFAULT_LIMIT):
+    """
+    Listings from `queryset` most similar to `pk`, nearest first, or None if
+    `pk` doesn't exist.
+    """
+    index = get_index()
+    ids = index.query(pk, limit)
+    if ids is None:
+        return None
+    found = {listing.pk: listing for listing in queryset.filter(pk__in=ids)}
+    gone = [pk for pk in ids if pk not in found]
+    if gone:
+        index.remove(gone)
+    return [found[pk] for pk in ids if pk in found]
@@ -0,0 +1,138 @@
+"""
+Market statistics rollups (MarketStat) per location × type × listing_type.
+
+Percentiles are computed with NumPy in one vectorized pass: every row is
+tagged with its group number, the rows are sorted by (group, value), and
+each group's percentile is read straight out of its slice of the sorted
+array — no Python loop over groups or rows.
+
+`rebuild_market_stats()` recomputes the whole table (`manage.py
+rebuild_market_stats`, and once by migration 0010 for existing databases);
+`refresh_market_stats(keys)` recomputes only the groups touched by a
+Property save/delete or an import batch.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .models import MarketStat, Property
+
+GROUP_FIELDS = ('location', 'type', 'listing_type')
+_CHUNK_SIZE = 5000
+
+
+def market_key(listing):
+    return tuple(getattr(listing, field) for field in GROUP_FIELDS)
+
+
+def group_percentile(group_ids, values, n_groups, q):
+    """
+    The q-th percentile (0–1, linear interpolation) of `values` within each
+    group; NaN for groups without values.
+    """
+    counts = np.bincount(group_ids, minlength=n_groups)
+    order = np.lexsort((values, group_ids))
+    ordered = values[order]
+    starts = np.cumsum(counts) - counts
+    position = starts + q * np.maximum(counts - 1, 0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    result = np.full(n_groups, np.nan)
+    present = counts > 0
+    if ordered.size:
+        fraction = position[present] - lower[present]
+        result[present] = ordered[lower[present]] * (1 - fraction) + ordered[upper[present]] * fraction
+    return result
+
+
+def compute_market_stats(rows, model=MarketStat):
+    """
+    Build (unsaved) MarketStat objects from `(location, type, listing_type,
+    price, area_sqft)` rows. `model` lets migrations pass the historical
+    MarketStat.
+    """
+    groups, group_ids, prices, areas = {}, [], [], []
+    for location, type_, listing_type, price, area_sqft in rows:
+        group_ids.append(groups.setdefault((location, type_, listing_type), len(groups)))
+        prices.append(float(price))
+        areas.append(area_sqft)
+    if not groups:
+        return []
+
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    areas = np.asarray(areas, dtype=np.float64)
+    n_groups = len(groups)
+
+    counts = np.bincount(group_ids, minlength=n_groups)
+    p25, median, p75 = (group_percentile(group_ids, prices, n_groups, q) for q in (0.25, 0.5, 0.75))
+    has_area = areas > 0
+    per_sqft = group_percentile(group_ids[has_area], prices[has_area] / areas[has_area], n_groups, 0.5)
+
+    return [
+        model(
+            location=location, type=type_, listing_type=listing_type,
+            listing_count=int(counts[i]),
+            median_price=_money(median[i]),
+            p25_price=_money(p25[i]),
+            p75_price=_money(p75[i]),
+            median_price_per_sqft=_money(per_sqft[i]),
+        )
+        for (location, type_, listing_type), i in groups.items()
+    ]
+
+
+def _money(value):
+    return None if np.isnan(value) else Decimal(f'{value:.2f}')
+
+
+def _rows(queryset):
+    return queryset.values_list(*GROUP_FIELDS, 'price', 'area_sqft').iterator(chunk_size=_CHUNK_SIZE)
+
+
+def _upsert(stats):
+    MarketStat.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=list(GROUP_FIELDS),
+        update_fields=['listing_count', 'median_price', 'p25_price', 'p75_price',
+                       'median_price_per_sqft', 'refreshed_at'],
+    )
+
+
+def rebuild_market_stats():
+    """Recompute every group from scratch; returns the number of groups."""
+    stats = compute_market_stats(_rows(Property.objects.order_by()))
+    with transaction.atomic():
+        MarketStat.objects.all().delete()
+        MarketStat.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+def refresh_market_stats(keys):
+    """Recompute only the given (location, type, listing_type) groups."""
+    keys = set(keys)
+    if not keys:
+        return
+    condition = Q()
+    for key in keys:
+        condition |= Q(**dict(zip(GROUP_FIELDS, key)))
+    stats = compute_market_stats(_rows(Property.objects.filter(condition).order_by()))
+    with transaction.atomic():
+        emptied = keys - {market_key(stat) for stat in stats}
+        if emptied:
+            gone = Q()
+            for key in emptied:
+                gone |= Q(**dict(zip(GROUP_FIELDS, key)))
+            MarketStat.objects.filter(gone).delete()
+        if stats:
+            _upsert(stats)
+
+
+def schedule_refresh(keys):
+    """Refresh the groups once the current transaction commits."""
+    keys = set(keys)
+    if keys:
+        transaction.on_commit(lambda: refresh_market_stats(keys))
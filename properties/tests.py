@@ -0,0 +1,298 @@
+import json
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from notifications.models import Broadcast, Notification
+
+from . import alerts, query_plans, similar, stats
+from .models import Amenity, Favorite, MarketStat, Property, SavedSearch
+
+User = get_user_model()
+
+
+class FavoritedQueryCountTests(TestCase):
+    """Listing pages resolve `is_favorited` once per page, not once per row."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        self.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def make_listings(self, count):
+        listings = [
+            Property.objects.create(
+                owner=self.owner, title=f'Listing {i}', location='Pune', price=1000 + i, type='Apartment',
+            )
+            for i in range(count)
+        ]
+        for listing in listings[::2]:
+            Favorite.objects.create(user=self.viewer, property=listing)
+        return listings
+
+    def assert_list_queries(self, count):
+        self.make_listings(count)
+        # COUNT, page (with owner), images, amenities, and one favorites lookup for the page
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/properties/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), count)
+        self.assertEqual(sum(row['is_favorited'] for row in response.data['results']), (count + 1) // 2)
+
+    def assert_favorites_queries(self, count):
+        self.make_listings(count * 2)
+        # COUNT, page of favorites joined to their properties, primary images
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/properties/favorites/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), count)
+        self.assertTrue(all(row['property']['is_favorited'] for row in response.data['results']))
+
+    def test_list_one(self):
+        self.assert_list_queries(1)
+
+    def test_list_twenty(self):
+        self.assert_list_queries(20)
+
+    def test_favorites_one(self):
+        self.assert_favorites_queries(1)
+
+    def test_favorites_twenty(self):
+        self.assert_favorites_queries(20)
+
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAIN the /api/properties/ page query for each common filter combination.
+
+    The assertions assume a table of SEED_ROWS listings with query_plans.seed()'s
+    distribution (five cities, every type and listing type, ~2% featured) and
+    fresh planner statistics: seed() runs ANALYZE after inserting. On a
+    near-empty table a scan is legitimately cheapest, so don't shrink it.
+    """
+    SEED_ROWS = 50000
+
+    # Combinations whose index is the obvious fit; the planner may pick any listed one.
+    EXPECTED_INDEXES = [
+        ({}, '-created_at', {'property_created_idx'}),
+        ({'listing_type': 'buy', 'type': 'house', 'price_min': 5000000, 'price_max': 9000000}, '-created_at',
+         {'property_listing_price_idx'}),
+        ({'type': 'office', 'price_max': 3000000}, 'price', {'property_type_price_idx', 'property_price_idx'}),
+        ({'bedrooms': 3}, '-created_at', {'property_beds_price_idx'}),
+        ({}, '-price', {'property_price_idx'}),
+        # Django's name for the geohash db_index (and its PostgreSQL prefix-search twin).
+        ({'near': '19.0760,72.8777', 'radius_km': 5}, '-created_at',
+         {'properties_property_geohash_16a8ea04', 'properties_property_geohash_16a8ea04_like'}),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        query_plans.seed(cls.SEED_ROWS)
+
+    def test_no_sequential_scans(self):
+        for params, ordering in query_plans.FILTER_COMBINATIONS:
+            with self.subTest(params=params, ordering=ordering):
+                plan = query_plans.explain(params, ordering)
+                self.assertFalse(query_plans.has_seq_scan(plan), plan)
+
+    def test_named_indexes(self):
+        for params, ordering, expected in self.EXPECTED_INDEXES:
+            with self.subTest(params=params, ordering=ordering):
+                plan = query_plans.explain(params, ordering)
+                self.assertTrue(query_plans.indexes_used(plan) & expected, plan)
+
+
+class PropertyImportTests(TestCase):
+    ROW = '{"title": "Flat %d", "location": "Pune", "price": "100", "type": "Apartment"%s}\n'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='agent', email='agent@example.com', password='pw')
+        )
+
+    def upload(self, content):
+        return self.client.post(
+            '/api/properties/import/', {'file': SimpleUploadedFile('feed.ndjson', content)}, format='multipart',
+        )
+
+    def test_amenities_string_is_split(self):
+        response = self.upload((self.ROW % (1, ', "amenities": "Gym | Pool"')).encode())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(Amenity.objects.values_list('name', flat=True)), ['Gym', 'Pool'])
+
+    def test_amenities_of_another_type_reject_the_row(self):
+        content = (self.ROW % (1, ', "amenities": 5') + self.ROW % (2, '')).encode()
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 1)
+        self.assertIn('amenities', response.data['errors'][0]['errors'])
+
+    def test_non_utf8_input_stops_with_400(self):
+        content = (self.ROW % (1, '')).encode() + (self.ROW % (2, '')).replace('Flat', 'Fl\xe4t').encode('latin-1')
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['aborted'])
+        self.assertEqual(response.data['created'], Property.objects.count())
+
+    def test_new_launches_are_announced(self):
+        content = (self.ROW % (1, ', "listing_type": "new_launch"') + self.ROW % (2, '')).encode()
+        self.assertEqual(self.upload(content).status_code, 201)  # bulk_create: no post_save
+        launch = Property.objects.get(listing_type='new_launch')
+        self.assertEqual(list(Broadcast.objects.values_list('property', flat=True)), [launch.pk])
+
+
+class PropertyExportTests(TestCase):
+    def test_since_is_inclusive(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        listing = Property.objects.create(owner=owner, title='Flat', location='Pune', price=100, type='Apartment')
+        client = APIClient()
+        client.force_authenticate(owner)
+        response = client.get('/api/properties/export/', {'since': listing.updated_at.isoformat()})
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [listing.pk])
+
+
+class SimilarityIndexSyncTests(TestCase):
+    def setUp(self):
+        similar._index = None
+        self.addCleanup(setattr, similar, '_index', None)
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+
+    def make_listing(self, title):
+        return Property.objects.create(owner=self.owner, title=title, location='Pune', price=100, type='Apartment')
+
+    def test_local_saves_do_not_advance_the_watermark(self):
+        first = self.make_listing('First')
+        index = similar.get_index()
+        self.assertEqual(index.watermark, first.updated_at)
+
+        local = self.make_listing('Saved here')
+        similar.refresh(local)
+        self.assertEqual(index.watermark, first.updated_at)
+
+        # Committed by another worker with an earlier updated_at than the local save.
+        elsewhere = self.make_listing('Saved elsewhere')
+        Property.objects.filter(pk=elsewhere.pk).update(updated_at=local.updated_at - timedelta(microseconds=1))
+        self.assertIn(elsewhere.pk, similar.get_index().positions)
+
+
+class MarketStatTests(TestCase):
+    GROUPS = [('Pune', 'Apartment', 'buy'), ('Pune', 'Villa', 'buy'), ('Thane West', 'Apartment', 'rent')]
+
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        rng = np.random.default_rng(13)
+        self.listings = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for location, type_, listing_type in self.GROUPS:
+                for price, area in zip(rng.integers(1_000_000, 90_000_000, 37), rng.integers(0, 4000, 37)):
+                    self.listings.append(Property.objects.create(
+                        owner=owner, title='Listing', location=location, type=type_,
+                        listing_type=listing_type, price=int(price), area_sqft=int(area),
+                    ))
+
+    def assert_matches_numpy(self):
+        self.assertEqual(MarketStat.objects.count(), len(self.GROUPS))
+        for stat in MarketStat.objects.all():
+            rows = [
+                listing for listing in self.listings
+                if stats.market_key(listing) == (stat.location, stat.type, stat.listing_type)
+            ]
+            prices = np.array([float(listing.price) for listing in rows])
+            per_sqft = np.array([float(listing.price) / listing.area_sqft for listing in rows if listing.area_sqft])
+            with self.subTest(group=stats.market_key(stat)):
+                self.assertEqual(stat.listing_count, len(rows))
+                p25, median, p75 = np.percentile(prices, [25, 50, 75])
+                self.assertAlmostEqual(float(stat.p25_price), p25, delta=0.01)
+                self.assertAlmostEqual(float(stat.median_price), median, delta=0.01)
+                self.assertAlmostEqual(float(stat.p75_price), p75, delta=0.01)
+                self.assertAlmostEqual(float(stat.median_price_per_sqft), np.median(per_sqft), delta=0.01)
+
+    def test_incremental_refresh_matches_numpy(self):
+        self.assert_matches_numpy()
+
+    def test_rebuild_matches_numpy(self):
+        MarketStat.objects.all().delete()
+        self.assertEqual(stats.rebuild_market_stats(), len(self.GROUPS))
+        self.assert_matches_numpy()
+
+
+class SavedSearchAlertTests(TestCase):
+    """Each criterion of alerts.matching_searches, looked up from the listing's side."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pw')
+        self.listing = Property(
+            owner=self.owner, title='Listing', location='Baner, Pune', price=5_000_000,
+            type='Apartment', listing_type='buy', bedrooms=2,
+        )
+
+    def save_search(self, user=None, **params):
+        search = SavedSearch.objects.create(user=user or self.buyer, params=params)
+        alerts.sync_tokens(search)
+        return search
+
+    def assert_matches(self, params, expected):
+        search = self.save_search(**params)
+        with self.subTest(params=params), self.assertNumQueries(1):
+            self.assertEqual(search in list(alerts.matching_searches(self.listing)), expected)
+        search.delete()
+
+    def test_criteria_keys(self):
+        self.assert_matches({}, True)
+        self.assert_matches({'listing_type': 'buy'}, True)
+        self.assert_matches({'listing_type': 'rent'}, False)
+        self.assert_matches({'type': 'Apartment'}, True)
+        self.assert_matches({'type': 'Villa'}, False)
+        self.assert_matches({'listing_type': 'buy', 'type': 'Apartment'}, True)
+        self.assert_matches({'listing_type': 'buy', 'type': 'Villa'}, False)
+
+    def test_price_range(self):
+        self.assert_matches({'price_min': 4_000_000}, True)
+        self.assert_matches({'price_min': 6_000_000}, False)
+        self.assert_matches({'price_max': 5_000_000}, True)
+        self.assert_matches({'price_max': 4_000_000}, False)
+
+    def test_bedrooms(self):
+        self.assert_matches({'bedrooms': 2}, True)
+        self.assert_matches({'bedrooms': 3}, False)
+        self.assert_matches({'bedrooms_min': 2}, True)
+        self.assert_matches({'bedrooms_min': 3}, False)
+
+    def test_location_words(self):
+        self.assert_matches({'location': 'pune'}, True)
+        self.assert_matches({'location': 'Pune Baner'}, True)
+        self.assert_matches({'location': 'Pun'}, False)          # whole words only
+        self.assert_matches({'location': 'Wakad, Pune'}, False)  # every word must be present
+
+    def test_own_listing_is_skipped(self):
+        search = self.save_search(user=self.owner)
+        self.assertNotIn(search, alerts.matching_searches(self.listing))
+
+    def test_one_query_per_listing(self):
+        for i in range(30):
+            self.save_search(location=f'Area{i} Pune', price_min=10_000_000)
+        listings = [
+            Property(owner=self.owner, title=f'Listing {i}', location=f'Area{i} Pune', price=1_000_000, type='Villa')
+            for i in range(5)
+        ]
+        with self.assertNumQueries(len(listings)):
+            self.assertEqual(alerts.notify_matches(listings), 0)
+
+    def test_notify_matches_once_per_user(self):
+        self.save_search(name='Pune flats', location='pune', type='Apartment')
+        self.save_search(name='Baner', location='baner')
+        self.save_search(listing_type='rent')
+        self.assertEqual(alerts.notify_matches([self.listing]), 1)
+        self.assertIn('Listing — Baner, Pune', Notification.objects.get(user=self.buyer).message)
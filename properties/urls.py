@@ -1,16 +1,30 @@
 from django.urls import path
 from .views import (
     PropertyListCreateView,
+    PropertyFacetsView,
+    MarketStatsView,
+    PropertyImportView,
+    PropertyExportView,
     PropertyDetailView,
+    SimilarPropertiesView,
     FeaturedPropertiesView,
     FavoriteToggleView,
     UserFavoritesView,
+    SavedSearchListCreateView,
+    SavedSearchDetailView,
 )
 
 urlpatterns = [
     path('', PropertyListCreateView.as_view(), name='property-list-create'),
+    path('facets/', PropertyFacetsView.as_view(), name='property-facets'),
+    path('stats/', MarketStatsView.as_view(), name='property-stats'),
+    path('import/', PropertyImportView.as_view(), name='property-import'),
+    path('export/', PropertyExportView.as_view(), name='property-export'),
     path('featured/', FeaturedPropertiesView.as_view(), name='property-featured'),
     path('favorites/', UserFavoritesView.as_view(), name='property-favorites'),
+    path('saved-searches/', SavedSearchListCreateView.as_view(), name='saved-search-list-create'),
+    path('saved-searches/<int:pk>/', SavedSearchDetailView.as_view(), name='saved-search-detail'),
     path('<int:pk>/', PropertyDetailView.as_view(), name='property-detail'),
+    path('<int:pk>/similar/', SimilarPropertiesView.as_view(), name='property-similar'),
     path('<int:pk>/favorite/', FavoriteToggleView.as_view(), name='property-favorite-toggle'),
 ]
@@ -1,14 +1,31 @@
 from rest_framework import generics, status, permissions, filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Property, Favorite
+from hector25_backend.conditional import ConditionalRetrieveMixin, weak_etag
+from hector25_backend.pagination import KeysetPagination
+from hector25_backend.toggles import toggle
+from notifications import coalesce
+
+from .models import Property, Favorite, MarketStat, SavedSearch
 from .serializers import (
     PropertyListSerializer, PropertyDetailSerializer,
-    PropertyWriteSerializer, FavoriteSerializer,
+    PropertyWriteSerializer, FavoriteSerializer, MarketStatSerializer, SavedSearchSerializer,
+    prefetch_primary_image,
 )
-from .filters import PropertyFilter
+from .filters import PropertyFilter, PropertySearchFilter, PropertyDistanceOrdering, canonical_choice
+from .cache import VersionedResponseCacheMixin, normalize_params, versioned_key
+from .facets import facet_counts
+from .similar import DEFAULT_LIMIT as SIMILAR_DEFAULT_LIMIT, MAX_LIMIT as SIMILAR_MAX_LIMIT, similar_properties
+from .importer import FORMATS as IMPORT_FORMATS, PropertyImporter, detect_format, iter_records
+from . import exporter
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -19,17 +36,33 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
         return obj.owner == request.user
 
 
-class PropertyListCreateView(generics.ListCreateAPIView):
+class FileFormatNegotiation(DefaultContentNegotiation):
+    """Leave `?format=` to the view (csv/ndjson file format) instead of picking a renderer."""
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class PropertyListCreateView(VersionedResponseCacheMixin, generics.ListCreateAPIView):
     """
     GET  /api/properties/         — list all properties (with filters)
     POST /api/properties/         — create a new property
+
+    ?near=lat,lng&radius_km=5 — radius search, nearest first (or ?ordering=distance)
+    ?bbox=min_lat,min_lng,max_lat,max_lng — bounding-box search
+    ?paginate=cursor — keyset pagination (no COUNT, flat cost for deep pages)
     """
     queryset = Property.objects.select_related('owner').prefetch_related('images', 'amenities')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [
+        DjangoFilterBackend, filters.OrderingFilter, PropertySearchFilter, PropertyDistanceOrdering,
+    ]
     filterset_class = PropertyFilter
-    search_fields = ['title', 'location', 'description']
     ordering_fields = ['price', 'created_at', 'bedrooms']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    cache_prefix = 'property-list'
+    cache_params = [
+        *PropertyFilter.base_filters, 'search', 'ordering', 'page', 'paginate', 'cursor',
+    ]
 
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -51,9 +84,118 @@ class PropertyListCreateView(generics.ListCreateAPIView):
         )
 
 
-class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PropertyFacetsView(generics.GenericAPIView):
+    """
+    GET /api/properties/facets/ — facet counts for the current filter state
+
+    Accepts the same query parameters as the property list (PropertyFilter
+    plus ?search=). Results are cached per normalized filter set and
+    invalidated whenever a Property changes.
+    """
+    queryset = Property.objects.all()
+    permission_classes = [permissions.AllowAny]
+    filter_backends = [DjangoFilterBackend, PropertySearchFilter]
+    filterset_class = PropertyFilter
+    cache_timeout = 300
+
+    def get(self, request):
+        allowed = [*PropertyFilter.base_filters, PropertySearchFilter.search_param]
+        key = versioned_key('property-facets', normalize_params(request.query_params, allowed))
+        data = cache.get(key)
+        if data is None:
+            data = facet_counts(self.filter_queryset(self.get_queryset()))
+            cache.set(key, data, self.cache_timeout)
+        return Response(data)
+
+
+class MarketStatsView(generics.ListAPIView):
+    """
+    GET /api/properties/stats/ — market insights per location × type × listing_type
+
+    Served from the MarketStat rollup (see properties/stats.py), so the cost
+    is proportional to the number of groups, not listings. Optional filters:
+    ?location= (contains), ?type=, ?listing_type=.
+    """
+    serializer_class = MarketStatSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        params = self.request.query_params
+        qs = MarketStat.objects.all()
+        if params.get('location'):
+            qs = qs.filter(location__icontains=params['location'])
+        for field in ('type', 'listing_type'):
+            if params.get(field):
+                qs = qs.filter(**{field: canonical_choice(Property, field, params[field])})
+        return qs
+
+
+class PropertyImportView(APIView):
+    """
+    POST /api/properties/import/ — bulk import listings (multipart `file`)
+
+    Accepts a CSV or NDJSON upload (format from `?format=` or the file
+    extension). Rows are validated like POST /api/properties/ and inserted
+    in batches owned by the caller; rejected rows are reported per row
+    without aborting the rest of the file. A non-UTF-8 file stops at the
+    first undecodable chunk with a 400 whose `created` counts the rows
+    already imported.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    content_negotiation_class = FileFormatNegotiation
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'detail': 'No file provided.'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get('format') or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response({'detail': f'Unsupported format: {fmt}.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = PropertyImporter(request.user).run(iter_records(upload, fmt))
+        if summary['aborted'] or not summary['created']:
+            code = status.HTTP_400_BAD_REQUEST
+        else:
+            code = status.HTTP_201_CREATED
+        return Response(summary, status=code)
+
+
+class PropertyExportView(generics.GenericAPIView):
+    """
+    GET /api/properties/export/ — stream the inventory as NDJSON (default) or CSV
+
+    Accepts any PropertyFilter query plus:
+      ?format=ndjson|csv
+      ?since=<ISO datetime> — only rows with updated_at at or after it (incremental
+        sync; inclusive, so clients upsert by id)
+
+    Rows are ordered by (updated_at, id) and streamed from a server-side
+    cursor, with no pagination, COUNT or per-row queries.
+    """
+    queryset = Property.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PropertyFilter
+    content_negotiation_class = FileFormatNegotiation
+
+    def get(self, request):
+        fmt = request.query_params.get('format', 'ndjson')
+        if fmt not in exporter.FORMATS:
+            raise ValidationError({'format': f'Expected one of: {", ".join(exporter.FORMATS)}.'})
+        since = exporter.parse_since(request.query_params.get('since'))
+
+        queryset = exporter.export_queryset(self.filter_queryset(self.get_queryset()), since)
+        response = StreamingHttpResponse(
+            exporter.iter_export(queryset, fmt), content_type=exporter.CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="properties.{fmt}"'
+        return response
+
+
+class PropertyDetailView(ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    GET    /api/properties/{id}/  — property detail
+    GET    /api/properties/{id}/  — property detail (supports If-None-Match / If-Modified-Since)
     PATCH  /api/properties/{id}/  — update (owner only)
     DELETE /api/properties/{id}/  — delete (owner only)
     """
@@ -74,17 +216,60 @@ class PropertyDetailView(generics.RetrieveUpdateDestroyAPIView):
         kwargs['partial'] = True
         return super().update(request, *args, **kwargs)
 
+    def get_conditional_state(self, request):
+        # Image/amenity changes touch Property.updated_at (see signals.py), so it
+        # versions the whole payload; owner and viewer state are folded in too.
+        qs = Property.objects.filter(pk=self.kwargs['pk'])
+        fields = ['updated_at', 'owner__name', 'owner__email']
+        if request.user.is_authenticated:
+            qs = qs.annotate(viewer_favorited=Exists(
+                Favorite.objects.filter(property=OuterRef('pk'), user=request.user)
+            ))
+            fields.append('viewer_favorited')
+        row = qs.values_list(*fields).first()
+        if row is None:
+            return None, None
+        # is_favorited isn't covered by updated_at, so only anonymous reads get Last-Modified.
+        last_modified = None if request.user.is_authenticated else row[0]
+        return weak_etag(*row), last_modified
+
+
+class SimilarPropertiesView(generics.GenericAPIView):
+    """
+    GET /api/properties/{id}/similar/ — listings most like this one (?limit=, max 50)
+
+    Nearest neighbours by price, size, rooms, type and location among
+    listings with the same listing_type; see properties/similar.py.
+    """
+    queryset = Property.objects.all()
+    serializer_class = PropertyListSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        listing = self.get_object()
+        try:
+            limit = int(request.query_params.get('limit', SIMILAR_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        if not 1 <= limit <= SIMILAR_MAX_LIMIT:
+            raise ValidationError({'limit': f'Must be between 1 and {SIMILAR_MAX_LIMIT}.'})
+
+        results = similar_properties(listing.pk, Property.objects.prefetch_related('images'), limit) or []
+        return Response(self.get_serializer(results, many=True).data)
 
-class FeaturedPropertiesView(generics.ListAPIView):
+
+class FeaturedPropertiesView(VersionedResponseCacheMixin, generics.ListAPIView):
     """GET /api/properties/featured/ — featured and new launch properties."""
     serializer_class = PropertyListSerializer
     permission_classes = [permissions.AllowAny]
+    cache_prefix = 'property-featured'
+    cache_params = ['listing_type', 'page']
 
     def get_queryset(self):
         listing_type = self.request.query_params.get('listing_type', None)
-        qs = Property.objects.filter(is_featured=True)
+        qs = Property.objects.filter(is_featured=True).prefetch_related('images')
         if listing_type:
-            qs = qs.filter(listing_type__iexact=listing_type)
+            qs = qs.filter(listing_type=canonical_choice(Property, 'listing_type', listing_type))
         return qs
 
 
@@ -94,23 +279,67 @@ class FavoriteToggleView(APIView):
 
     def post(self, request, pk):
         try:
-            property_obj = Property.objects.get(pk=pk)
+            result = toggle(Favorite, request.user, 'property', pk)
         except Property.DoesNotExist:
             return Response({'detail': 'Property not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        favorite, created = Favorite.objects.get_or_create(
-            user=request.user, property=property_obj
-        )
-        if not created:
-            favorite.delete()
+        if not result.active:
             return Response({'favorited': False}, status=status.HTTP_200_OK)
+        if result.changed:
+            listing = Property.objects.only('id', 'owner_id', 'title').get(pk=pk)
+            coalesce.record(listing.owner_id, request.user, 'property_favorited', 'property', listing.pk, listing.title)
         return Response({'favorited': True}, status=status.HTTP_201_CREATED)
 
 
 class UserFavoritesView(generics.ListAPIView):
-    """GET /api/properties/favorites/ — list current user's favorited properties."""
+    """
+    GET /api/properties/favorites/             — current user's favorites, newest first
+    GET /api/properties/favorites/?ids_only=1  — just the favorited property ids (for heart icons)
+
+    Supports `?paginate=cursor` (keyset on Favorite.created_at).
+    """
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return (
+            Favorite.objects.filter(user=self.request.user)
+            .select_related('property')
+            .prefetch_related(prefetch_primary_image('property__images'))
+            .order_by('-created_at', '-id')
+        )
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('ids_only') in ('1', 'true'):
+            ids = Favorite.objects.filter(user=request.user).values_list('property_id', flat=True)
+            return Response({'property_ids': sorted(ids)})
+        return super().list(request, *args, **kwargs)
+
+
+class SavedSearchListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/properties/saved-searches/  — current user's saved searches
+    POST /api/properties/saved-searches/  — save a search; new matching listings send a notification
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class SavedSearchDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    GET    /api/properties/saved-searches/{id}/  — saved search detail
+    PATCH  /api/properties/saved-searches/{id}/  — rename or change filters
+    DELETE /api/properties/saved-searches/{id}/  — stop alerts
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user).select_related('property')
+        return SavedSearch.objects.filter(user=self.request.user)